@@ -0,0 +1,205 @@
+import sqlite3
+from datetime import datetime
+import pandas as pd
+
+# Fleet Aggregates: One Row per Analyzed Flight Plus Small per-Type Tables, so Cross-Flight
+# Comparisons Are SQL Aggregates Instead of Reloading Every Analysis
+FLEET_DB_FILE = 'fleet.sqlite'
+
+# Flight Metrics That Can Be Charted Across the Fleet
+FLIGHT_METRICS = ['duration_seconds', 'total_messages', 'message_rate', 'rlog_share', 'p50_gap', 'p99_gap',
+                  'max_gap', 'total_errors', 'anomaly_events']
+
+def fleet_connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA foreign_keys=ON;")
+    fleet_init(conn)
+    return conn
+
+def fleet_init(conn):
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS flights (
+            flight_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_name TEXT NOT NULL,
+            fingerprint TEXT,
+            analyzed_at TEXT NOT NULL,
+            start_time REAL,
+            end_time REAL,
+            duration_seconds REAL,
+            total_messages INTEGER NOT NULL,
+            unique_message_types INTEGER NOT NULL,
+            message_rate REAL,
+            tlog_messages INTEGER NOT NULL,
+            rlog_messages INTEGER NOT NULL,
+            rlog_share REAL,
+            p50_gap REAL,
+            p99_gap REAL,
+            max_gap REAL,
+            mean_gap REAL,
+            total_errors INTEGER NOT NULL,
+            total_heartbeats INTEGER NOT NULL,
+            anomaly_events INTEGER NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_flights_file ON flights(file_name);
+        CREATE INDEX IF NOT EXISTS idx_flights_start ON flights(start_time);
+
+        CREATE TABLE IF NOT EXISTS flight_types (
+            flight_id INTEGER NOT NULL REFERENCES flights(flight_id) ON DELETE CASCADE,
+            msgtype TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            tlog_count INTEGER NOT NULL,
+            rlog_count INTEGER NOT NULL,
+            error_count INTEGER NOT NULL,
+            rate REAL,
+            p50_gap REAL,
+            p99_gap REAL,
+            max_gap REAL,
+            PRIMARY KEY (flight_id, msgtype)
+        );
+        CREATE INDEX IF NOT EXISTS idx_flight_types_msgtype ON flight_types(msgtype);
+
+        CREATE TABLE IF NOT EXISTS flight_anomalies (
+            flight_id INTEGER NOT NULL REFERENCES flights(flight_id) ON DELETE CASCADE,
+            anomaly_type TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (flight_id, anomaly_type)
+        );
+        """
+    )
+    conn.commit()
+
+def flight_is_current(conn, file_name, fingerprint):
+    row = conn.execute("SELECT fingerprint FROM flights WHERE file_name = ?", (file_name,)).fetchone()
+    return row is not None and fingerprint is not None and row[0] == fingerprint
+
+def record_flight(conn, file_name, analysis, fingerprint=None):
+    # Replaces Any Earlier Row for the Same File; Unchanged Flights Are Left Alone
+    if flight_is_current(conn, file_name, fingerprint):
+        return False
+
+    md = analysis['message_distribution']
+    ta = analysis.get('timing_analysis') or {}
+    gaps = ta.get('timestamp_gaps', {})
+    sources = analysis['communication_stats'].get('source_distribution', {})
+    rates = analysis['communication_stats'].get('message_rates', {})
+    type_gaps = ta.get('type_gaps', {})
+    error_types = analysis['error_analysis'].get('error_types', {})
+    anomalies = analysis.get('anomalies') or {}
+    total = md.get('total_messages', 0)
+
+    with conn:
+        conn.execute("DELETE FROM flights WHERE file_name = ?", (file_name,))
+        cursor = conn.execute(
+            """
+            INSERT INTO flights (file_name, fingerprint, analyzed_at, start_time, end_time, duration_seconds,
+                                 total_messages, unique_message_types, message_rate, tlog_messages, rlog_messages,
+                                 rlog_share, p50_gap, p99_gap, max_gap, mean_gap, total_errors, total_heartbeats,
+                                 anomaly_events)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (file_name, fingerprint, datetime.now().isoformat(timespec='seconds'),
+             ta.get('start_time'), ta.get('end_time'), ta.get('duration_seconds'),
+             total, md.get('unique_message_types', 0), ta.get('message_rate'),
+             sources.get('tlog', 0), sources.get('rlog', 0), sources.get('rlog', 0) / total if total else None,
+             gaps.get('p50_gap'), gaps.get('p99_gap'), gaps.get('max_gap'), gaps.get('mean_gap'),
+             analysis['error_analysis'].get('total_errors', 0),
+             (analysis.get('system_status') or {}).get('total_heartbeats', 0),
+             anomalies.get('total_events', 0))
+        )
+        flight_id = cursor.lastrowid
+
+        type_rows = []
+        for msgtype, info in md.get('message_types', {}).items():
+            gap = type_gaps.get(msgtype, {})
+            rate = rates.get(msgtype)
+            type_rows.append((flight_id, msgtype, info['count'], info['sources'].get('tlog', 0),
+                              info['sources'].get('rlog', 0), error_types.get(msgtype, 0),
+                              None if rate is None else float(rate),
+                              gap.get('p50_gap'), gap.get('p99_gap'), gap.get('max_gap')))
+        conn.executemany("INSERT INTO flight_types VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", type_rows)
+        conn.executemany("INSERT INTO flight_anomalies VALUES (?, ?, ?)",
+                         [(flight_id, kind, count) for kind, count in anomalies.get('event_counts', {}).items()])
+    return True
+
+def remove_flight(conn, file_name):
+    with conn:
+        conn.execute("DELETE FROM flights WHERE file_name = ?", (file_name,))
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def fleet_flights(conn, file_names=None):
+    # One Row per Flight, Oldest Flight First
+    q = "SELECT * FROM flights"
+    params = []
+    if file_names is not None:
+        q += f" WHERE file_name IN ({','.join(['?'] * len(file_names))})"
+        params = list(file_names)
+    return pd.read_sql_query(q + " ORDER BY start_time, file_name", conn, params=params)
+
+def fleet_summary(conn):
+    return pd.read_sql_query(
+        """
+        SELECT COUNT(*) AS flights,
+               SUM(total_messages) AS total_messages,
+               SUM(duration_seconds) AS total_duration_seconds,
+               AVG(message_rate) AS mean_message_rate,
+               MAX(p99_gap) AS worst_p99_gap,
+               SUM(total_errors) AS total_errors,
+               SUM(anomaly_events) AS anomaly_events
+        FROM flights
+        """,
+        conn,
+    ).iloc[0].to_dict()
+
+def fleet_top_types(conn, limit=10):
+    return pd.read_sql_query(
+        """
+        SELECT msgtype, SUM(count) AS count, COUNT(*) AS flights, AVG(rate) AS mean_rate,
+               MAX(p99_gap) AS worst_p99_gap
+        FROM flight_types
+        GROUP BY msgtype
+        ORDER BY count DESC
+        LIMIT ?
+        """,
+        conn,
+        params=[limit],
+    )
+
+def fleet_metric(conn, metric):
+    # (file_name, value) per Flight in Flight Order, for Trend Charts
+    if metric not in FLIGHT_METRICS:
+        raise ValueError(f"Unknown Flight Metric: {metric}")
+    return pd.read_sql_query(
+        f"SELECT file_name, {metric} AS value FROM flights ORDER BY start_time, file_name",
+        conn,
+    )
+
+def fleet_type_trend(conn, msgtype, metric='rate'):
+    # One Message Type's Rate or Gap Percentile Across Flights
+    if metric not in ('count', 'rate', 'p50_gap', 'p99_gap', 'max_gap'):
+        raise ValueError(f"Unknown Message Type Metric: {metric}")
+    return pd.read_sql_query(
+        f"""
+        SELECT f.file_name, t.{metric} AS value
+        FROM flight_types t JOIN flights f ON f.flight_id = t.flight_id
+        WHERE t.msgtype = ?
+        ORDER BY f.start_time, f.file_name
+        """,
+        conn,
+        params=[msgtype],
+    )
+
+def fleet_anomaly_totals(conn):
+    return pd.read_sql_query(
+        """
+        SELECT anomaly_type, SUM(count) AS count, SUM(count > 0) AS flights
+        FROM flight_anomalies
+        GROUP BY anomaly_type
+        ORDER BY count DESC
+        """,
+        conn,
+    )
@@ -0,0 +1,322 @@
+import os
+import socket
+import threading
+import time
+import math
+from collections import defaultdict
+
+from Logs import MavlinkStreamParser, iter_tlog_frames, new_frame_stats, print_frame_stats
+from UASReport import ERROR_KEYWORDS, generate_report
+
+# Live Sources Are Addressed Like mavutil Connection Strings:
+#   udp:HOST:PORT   Listen for Datagrams on HOST:PORT
+#   tcp:HOST:PORT   Connect to a Streaming Server
+RECV_SIZE = 65536
+RECV_TIMEOUT = 0.5
+UDP_RECV_BUFFER = 4 * 1024 * 1024  # Absorbs Bursts While a Report is Being Printed
+
+# Rolling Rates Are Counted in Fixed Time Buckets Covering the Last RATE_WINDOW Seconds
+RATE_WINDOW = 10.0
+RATE_BUCKETS = 10
+
+REPORT_INTERVAL = 5.0
+LIVE_SOURCE = 'live'
+
+def parse_address(address):
+    protocol, host, port = address.split(':')
+    if protocol not in ('udp', 'tcp'):
+        raise ValueError(f"Unsupported Protocol: {protocol}")
+    return protocol, host, int(port)
+
+def open_stream(address):
+    # Returns a Socket Ready to recv(); UDP Binds, TCP Connects
+    protocol, host, port = parse_address(address)
+    if protocol == 'udp':
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECV_BUFFER)
+        sock.bind((host, port))
+    else:
+        sock = socket.create_connection((host, port))
+    sock.settimeout(RECV_TIMEOUT)
+    return sock
+
+class RateWindow:
+    # Ring of Per-Bucket Counts; add() is O(1), Memory is Fixed at RATE_BUCKETS Slots
+    def __init__(self, window=RATE_WINDOW, buckets=RATE_BUCKETS):
+        self.width = window / buckets
+        self.counts = [0] * buckets
+        self.epochs = [-1] * buckets
+
+    def add(self, timestamp):
+        epoch = int(timestamp // self.width)
+        slot = epoch % len(self.counts)
+        if self.epochs[slot] != epoch:
+            self.epochs[slot] = epoch
+            self.counts[slot] = 0
+        self.counts[slot] += 1
+
+    def rate(self, now):
+        # Messages per Second Over the Buckets Still Inside the Window
+        current = int(now // self.width)
+        oldest = current - len(self.counts) + 1
+        total = sum(count for count, epoch in zip(self.counts, self.epochs) if oldest <= epoch <= current)
+        return total / (self.width * len(self.counts))
+
+class RunningGaps:
+    # Welford Mean/Variance of Gaps Between Consecutive Timestamps
+    def __init__(self):
+        self.last = None
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min_gap = math.inf
+        self.max_gap = 0.0
+
+    def add(self, timestamp):
+        if self.last is not None:
+            gap = timestamp - self.last
+            self.count += 1
+            delta = gap - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (gap - self.mean)
+            self.min_gap = min(self.min_gap, gap)
+            self.max_gap = max(self.max_gap, gap)
+        self.last = timestamp
+
+    def summary(self):
+        if not self.count:
+            return {'max_gap': 0, 'min_gap': 0, 'mean_gap': 0, 'std_gap': 0}
+        return {
+            'max_gap': self.max_gap,
+            'min_gap': self.min_gap,
+            'mean_gap': self.mean,
+            'std_gap': math.sqrt(self.m2 / self.count)
+        }
+
+class RollingStats:
+    # Incremental Counterpart of UASReport.analyze_log_data: O(1) Work per Message, and Memory
+    # Bounded by the Number of Distinct Message Types, Sources and Vehicles, Not Messages
+    def __init__(self, window=RATE_WINDOW, buckets=RATE_BUCKETS):
+        self.window = window
+        self.buckets = buckets
+        self.total = 0
+        self.start_time = None
+        self.end_time = None
+        self.type_counts = defaultdict(lambda: defaultdict(int))
+        self.source_counts = defaultdict(int)
+        self.rates = {}
+        self.overall_rate = RateWindow(window, buckets)
+        self.gaps = RunningGaps()
+        self.status_counts = defaultdict(int)
+        self.mode_counts = defaultdict(int)
+        self.heartbeats = 0
+        self.last_heartbeat = {}
+        self.error_types = defaultdict(int)
+        self.error_flags = {}
+
+    def add(self, record):
+        msgtype, source, timestamp = record[0], record[1], record[2]
+        self.total += 1
+        self.type_counts[msgtype][source] += 1
+        self.source_counts[source] += 1
+
+        if timestamp is not None:
+            if self.start_time is None:
+                self.start_time = timestamp
+            self.end_time = timestamp
+            self.gaps.add(timestamp)
+            self.overall_rate.add(timestamp)
+            rate = self.rates.get(msgtype)
+            if rate is None:
+                rate = self.rates[msgtype] = RateWindow(self.window, self.buckets)
+            rate.add(timestamp)
+
+        if msgtype == 'HEARTBEAT':
+            self.heartbeats += 1
+            fields = dict(zip(record[7] or (), record[8] or ()))
+            if 'system_status' in fields:
+                self.status_counts[fields['system_status']] += 1
+            if 'custom_mode' in fields:
+                self.mode_counts[fields['custom_mode']] += 1
+            self.last_heartbeat[(record[3], record[4])] = timestamp
+
+        # Keyword Match Cached per Message Type
+        is_error = self.error_flags.get(msgtype)
+        if is_error is None:
+            is_error = self.error_flags[msgtype] = any(err in msgtype.upper() for err in ERROR_KEYWORDS)
+        if is_error:
+            self.error_types[msgtype] += 1
+
+    def snapshot(self, now=None):
+        # Analysis Dict in the Layout generate_report Expects, Plus Live-Only Fields
+        now = self.end_time if now is None else now
+        message_types = {msgtype: {'count': sum(sources.values()), 'sources': dict(sources)}
+                         for msgtype, sources in self.type_counts.items()}
+        analysis = {
+            'message_distribution': {
+                'message_types': message_types,
+                'total_messages': self.total,
+                'unique_message_types': len(message_types)
+            },
+            'timing_analysis': {},
+            'system_status': {},
+            'communication_stats': {
+                'source_distribution': dict(self.source_counts),
+                'message_rates': {msgtype: rate.rate(now) for msgtype, rate in self.rates.items()}
+                if now is not None else {}
+            },
+            'error_analysis': {
+                'total_errors': sum(self.error_types.values()),
+                'error_types': dict(self.error_types)
+            },
+            'live': {
+                'window_seconds': self.window,
+                'current_rate': self.overall_rate.rate(now) if now is not None else 0,
+                'heartbeat_age': {f"{sysid}/{compid}": now - seen
+                                  for (sysid, compid), seen in self.last_heartbeat.items()
+                                  if now is not None and seen is not None}
+            }
+        }
+
+        if self.start_time is not None and self.end_time > self.start_time:
+            duration = self.end_time - self.start_time
+            analysis['timing_analysis'] = {
+                'start_time': self.start_time,
+                'end_time': self.end_time,
+                'duration_seconds': duration,
+                'message_rate': self.total / duration,
+                'timestamp_gaps': self.gaps.summary()
+            }
+
+        if self.heartbeats:
+            analysis['system_status'] = {
+                'status_distribution': dict(self.status_counts),
+                'mode_distribution': dict(self.mode_counts),
+                'total_heartbeats': self.heartbeats
+            }
+
+        return analysis
+
+def generate_live_report(analysis):
+    report = [generate_report(analysis)]
+    live = analysis['live']
+    report.append(f"\nLive ({live['window_seconds']:.0f} s Window):")
+    report.append(f"- Current Message Rate: {live['current_rate']:.2f} msgs/sec")
+    rates = sorted(analysis['communication_stats']['message_rates'].items(), key=lambda x: x[1], reverse=True)
+    for msg_type, rate in rates[:10]:
+        report.append(f"  - {msg_type}: {rate:.2f} msgs/sec")
+    for vehicle, age in sorted(live['heartbeat_age'].items()):
+        report.append(f"- Last Heartbeat From {vehicle}: {age:.1f} s Ago")
+    return "\n".join(report)
+
+def replay_tlog(file_path, address, speed=1.0, stop_event=None, server=None, start_delay=0.0):
+    # Local Stand-In for a Vehicle: Plays a tlog Back Over UDP (sendto) or TCP (Serves One Client)
+    # speed Scales the Recorded Timing; speed=0 Sends as Fast as Possible
+    protocol, host, port = parse_address(address)
+    stop_event = stop_event or threading.Event()
+
+    if protocol == 'udp':
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        send = lambda frame: sock.sendto(frame, (host, port))
+        # Give the Listener Time to Bind; Datagrams Sent Earlier Are Lost
+        stop_event.wait(start_delay)
+    else:
+        server = server or socket.create_server((host, port))
+        server.settimeout(RECV_TIMEOUT)
+        conn = None
+        while conn is None and not stop_event.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+        server.close()
+        if conn is None:
+            return 0
+        sock = conn
+        send = conn.sendall
+
+    sent = 0
+    try:
+        first_usec = None
+        started = time.monotonic()
+        for usec, frame in iter_tlog_frames(file_path):
+            if stop_event.is_set():
+                break
+            if speed:
+                if first_usec is None:
+                    first_usec = usec
+                delay = (usec - first_usec) / 1e6 / speed - (time.monotonic() - started)
+                if delay > 0:
+                    stop_event.wait(delay)
+            send(frame)
+            sent += 1
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+    finally:
+        sock.close()
+    return sent
+
+def start_replay(file_path, address, speed=1.0, start_delay=0.5):
+    # TCP Listens Before Returning so the Monitor Can Connect Straight Away
+    protocol, host, port = parse_address(address)
+    server = socket.create_server((host, port)) if protocol == 'tcp' else None
+    stop_event = threading.Event()
+    thread = threading.Thread(target=replay_tlog, args=(file_path, address, speed, stop_event, server, start_delay),
+                              daemon=True)
+    thread.start()
+    return thread, stop_event
+
+def run_live_monitor(address, duration=None, report_interval=REPORT_INTERVAL, msgtypes=None,
+                     idle_timeout=None, stats=None, log=print):
+    # Reads the Stream Until duration Elapses (or No Data for idle_timeout), Printing a Report
+    # Every report_interval Seconds; Returns the Final Snapshot
+    stats = RollingStats() if stats is None else stats
+    frame_stats = new_frame_stats()
+    parser = MavlinkStreamParser(frame_stats, msgtypes)
+    protocol, _, _ = parse_address(address)
+    sock = open_stream(address)
+
+    started = time.monotonic()
+    next_report = started + report_interval
+    last_data = started
+    add = stats.add
+    log(f"Monitoring {address}...")
+
+    try:
+        while duration is None or time.monotonic() - started < duration:
+            try:
+                data = sock.recv(RECV_SIZE)
+                if not data and protocol == 'tcp':
+                    log("Stream Closed")
+                    break
+                last_data = time.monotonic()
+                for record in parser.feed(data, source=LIVE_SOURCE):
+                    add(record)
+            except socket.timeout:
+                if idle_timeout is not None and time.monotonic() - last_data > idle_timeout:
+                    log("No Data Received, Stopping")
+                    break
+
+            now = time.monotonic()
+            if now >= next_report:
+                log(generate_live_report(stats.snapshot(time.time())))
+                next_report = now + report_interval
+    except KeyboardInterrupt:
+        log("Stopped")
+    finally:
+        sock.close()
+
+    snapshot = stats.snapshot(time.time())
+    log(generate_live_report(snapshot))
+    print_frame_stats(frame_stats, log)
+    return snapshot
+
+if __name__ == '__main__':
+    # Replay a Recorded Flight Into the Monitor When No Vehicle is Attached
+    address = 'udp:127.0.0.1:14550'
+    replay_file = '/content/sample_data/flight.tlog'
+
+    if os.path.exists(replay_file):
+        start_replay(replay_file, address, speed=1.0)
+    run_live_monitor(address, idle_timeout=10.0)
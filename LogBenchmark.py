@@ -0,0 +1,450 @@
+import os
+import io
+import re
+import sys
+import json
+import time
+import heapq
+import random
+import struct
+import platform
+import resource
+import tempfile
+import multiprocessing
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from Logs import (mavlink_dialect, MAVLINK_V2_MARKER, V2_HEADER, CHECKSUM, TLOG_TIMESTAMP, x25_crc, parse_rlog_binary,
+                  iter_rlog_frames, read_rlog_frame_array, process_tlog_file, iter_tlog_messages,
+                  iter_tlog_messages_mavutil, merge_log_files, merged_output_path, merged_index_path)
+from UASReport import analyze_merged_log
+
+# Synthetic Flights: Every Vehicle Sends Each Message Type at Its Rate (Hz), as MAVLink 2 Frames
+DEFAULT_MESSAGE_RATES = {
+    'HEARTBEAT': 1,
+    'SYS_STATUS': 2,
+    'SYSTEM_TIME': 1,
+    'ATTITUDE': 50,
+    'GLOBAL_POSITION_INT': 10,
+    'GPS_RAW_INT': 5,
+    'VFR_HUD': 10,
+    'SERVO_OUTPUT_RAW': 20,
+    'RC_CHANNELS': 10,
+    'STATUSTEXT': 0.1,
+}
+DEFAULT_START_USEC = 1_700_000_000_000_000
+COMPONENT_ID = 1
+LINK_LATENCY_USEC = (2000, 20000)  # tlog Receive Time Trails the Onboard Send Time
+WRITE_BUFFER = 1 << 20
+PROGRESS_INTERVAL = 1000000
+
+# Fixed Field Values So Reports on Synthetic Flights Look Like a Vehicle
+FIELD_VALUES = {
+    'HEARTBEAT': {'type': 2, 'autopilot': 3, 'base_mode': 81, 'custom_mode': 0, 'system_status': 4,
+                  'mavlink_version': 3},
+    'STATUSTEXT': {'severity': 6, 'text': b'Synthetic Flight'},
+    'SYS_STATUS': {'voltage_battery': 12600, 'battery_remaining': 80},
+    'GPS_RAW_INT': {'fix_type': 3, 'satellites_visible': 12},
+}
+# Time Fields Patched per Frame: Milliseconds Since Boot or Unix Microseconds
+TIME_FIELDS = {'time_boot_ms': 'boot_ms', 'time_usec': 'unix_usec', 'time_unix_usec': 'unix_usec'}
+
+BENCHMARK_RESULTS_FILE = 'benchmark_results.json'
+REGRESSION_TOLERANCE = 0.2  # Fractional Throughput Drop (or Peak RSS Growth) Reported as a Regression
+
+class MessageTemplate:
+    # Pre-Packed Payload for One Message Type; Only the Time Fields Change per Frame
+    def __init__(self, msg_class):
+        self.msgid = msg_class.id
+        self.crc_extra = bytes((msg_class.crc_extra,))
+        self.payload = bytearray(msg_class.unpacker.size)
+        self.time_fields = []
+
+        # Wire Format Tokens Line Up With ordered_fieldnames; Arrays Carry a Count Prefix
+        tokens = re.findall(r'\d*[a-zA-Z?]', msg_class.unpacker.format.lstrip('<>=!@'))
+        values = FIELD_VALUES.get(msg_class.msgname, {})
+        offset = 0
+        for name, token in zip(msg_class.ordered_fieldnames, tokens):
+            token_format = '<' + token
+            if name in values:
+                struct.pack_into(token_format, self.payload, offset, values[name])
+            if name in TIME_FIELDS:
+                self.time_fields.append((struct.Struct(token_format), offset, TIME_FIELDS[name]))
+            offset += struct.calcsize(token_format)
+
+    def frame(self, seq, sysid, usec, boot_usec):
+        payload = self.payload
+        for packer, offset, clock in self.time_fields:
+            value = boot_usec // 1000 if clock == 'boot_ms' else usec
+            packer.pack_into(payload, offset, value & ((1 << (8 * packer.size)) - 1))
+        # MAVLink 2 Senders Trim Trailing Zero Bytes (Keeping at Least One)
+        body = bytes(payload).rstrip(b'\x00') or b'\x00'
+        header = V2_HEADER.pack(len(body), 0, 0, seq, sysid, COMPONENT_ID, self.msgid & 0xFFFF, self.msgid >> 16)
+        return MAVLINK_V2_MARKER + header + body + CHECKSUM.pack(x25_crc(header + body + self.crc_extra))
+
+def message_templates(rates):
+    classes = {msg_class.msgname: msg_class for msg_class in mavlink_dialect.mavlink_map.values()}
+    unknown = [msgtype for msgtype in rates if msgtype not in classes]
+    if unknown:
+        raise ValueError(f"Unknown Message Types: {', '.join(unknown)}")
+    return {msgtype: MessageTemplate(classes[msgtype]) for msgtype in rates}
+
+def generate_flight_logs(directory, name='synthetic', duration=600.0, rates=None, vehicles=(1,), seed=0,
+                         link_loss_rate=0.0, corruption_rate=0.0, noise_rate=0.0, max_bytes=None,
+                         start_usec=DEFAULT_START_USEC):
+    # Writes <name>.tlog and <name>.rlog for One Flight and Returns What Was Written
+    #   rlog: Every Frame as Recorded Onboard, With Garbage Bytes (Frame Markers Included) After a
+    #         noise_rate Fraction of Frames
+    #   tlog: Frames as Received by the Ground Station, in Receive Order; link_loss_rate of Frames Never
+    #         Arrive and corruption_rate Arrive With a Flipped Byte (Failing CRC)
+    # duration is in Seconds; max_bytes Stops Early Once the rlog Reaches That Size
+    rates = DEFAULT_MESSAGE_RATES if rates is None else rates
+    templates = message_templates(rates)
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    tlog_path = os.path.join(directory, f"{name}.tlog")
+    rlog_path = os.path.join(directory, f"{name}.rlog")
+
+    # Emission Schedule: One Heap Entry per (Vehicle, Message Type), Staggered Within Its Period
+    schedule = []
+    for sysid in vehicles:
+        for msgtype, rate in rates.items():
+            if rate > 0:
+                period = 1e6 / rate
+                schedule.append((rng.uniform(0, period), sysid, msgtype, period))
+    heapq.heapify(schedule)
+    sequences = {sysid: 0 for sysid in vehicles}
+    end_usec = duration * 1e6
+    # Frames in Flight to the Ground Station, Keyed by Receive Time; Once the Send Clock Passes a Receive
+    # Time Less the Minimum Latency, No Later Frame Can Arrive Before It. Each Vehicle's Link Delivers
+    # Its Frames in Order, so Only Frames From Different Vehicles Interleave
+    in_flight = []
+    last_received = dict.fromkeys(vehicles, 0)
+
+    stats = {'frames': 0, 'tlog_frames': 0, 'lost': 0, 'corrupted': 0, 'noise_bursts': 0,
+             'tlog_bytes': 0, 'rlog_bytes': 0}
+    with open(tlog_path, 'wb', buffering=WRITE_BUFFER) as tlog, open(rlog_path, 'wb', buffering=WRITE_BUFFER) as rlog:
+        while schedule and schedule[0][0] < end_usec:
+            boot_usec, sysid, msgtype, period = schedule[0]
+            heapq.heapreplace(schedule, (boot_usec + period, sysid, msgtype, period))
+
+            boot_usec = int(boot_usec)
+            usec = start_usec + boot_usec
+            frame = templates[msgtype].frame(sequences[sysid], sysid, usec, boot_usec)
+            sequences[sysid] = (sequences[sysid] + 1) % 256
+            stats['frames'] += 1
+
+            stats['rlog_bytes'] += rlog.write(frame)
+            if noise_rate and rng.random() < noise_rate:
+                stats['noise_bursts'] += 1
+                stats['rlog_bytes'] += rlog.write(rng.randbytes(rng.randint(1, 8)))
+
+            if link_loss_rate and rng.random() < link_loss_rate:
+                stats['lost'] += 1
+            else:
+                if corruption_rate and rng.random() < corruption_rate:
+                    stats['corrupted'] += 1
+                    position = rng.randrange(1, len(frame))
+                    frame = frame[:position] + bytes((frame[position] ^ 0xFF,)) + frame[position + 1:]
+                received = last_received[sysid] = max(usec + rng.randint(*LINK_LATENCY_USEC), last_received[sysid])
+                heapq.heappush(in_flight, (received, stats['frames'], TLOG_TIMESTAMP.pack(received) + frame))
+                stats['tlog_frames'] += 1
+            while in_flight and in_flight[0][0] <= usec + LINK_LATENCY_USEC[0]:
+                stats['tlog_bytes'] += tlog.write(heapq.heappop(in_flight)[2])
+
+            if stats['frames'] % PROGRESS_INTERVAL == 0:
+                print(f"Generated {stats['frames']} Frames ({stats['rlog_bytes'] / 1e6:.0f} MB rlog)...", end='\r')
+            if max_bytes and stats['rlog_bytes'] >= max_bytes:
+                break
+
+        while in_flight:
+            stats['tlog_bytes'] += tlog.write(heapq.heappop(in_flight)[2])
+
+    stats.update(tlog=tlog_path, rlog=rlog_path, duration=(schedule[0][0] if schedule else end_usec) / 1e6)
+    return stats
+
+# ============================================================
+# BENCHMARKS
+# ============================================================
+
+def peak_rss_mb():
+    # ru_maxrss is KB on Linux, Bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+def bench_parse_rlog(rlog_path):
+    return len(parse_rlog_binary(rlog_path))
+
+def bench_process_tlog(tlog_path):
+    return len(process_tlog_file(tlog_path))
+
+def bench_merge(directory, output_format):
+    merge_log_files(directory, workers=1, output_format=output_format, force=True)
+    return sum(merged_message_count(path) for path in merged_outputs(directory, output_format))
+
+def bench_analyze(directory, output_format):
+    total = 0
+    for path in merged_outputs(directory, output_format):
+        analysis, _, _ = analyze_merged_log(path, use_cache=False)
+        total += analysis['message_distribution']['total_messages']
+    return total
+
+def merged_outputs(directory, output_format):
+    output_dir = os.path.join(directory, 'merged_logs')
+    return [merged_output_path(output_dir, os.path.splitext(file_name)[0], output_format)
+            for file_name in sorted(os.listdir(directory)) if file_name.endswith('.tlog')]
+
+def merged_message_count(path):
+    # From the Block Index, so Counting Doesn't Load the Output Into the Measured Process
+    with open(merged_index_path(path)) as f:
+        return sum(block['rows'] for block in json.load(f)['blocks'])
+
+def run_measured(func, args):
+    # Child Process Entry Point: Returns (Seconds, Messages, Peak RSS MB) With Output Silenced
+    with redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        messages = func(*args)
+        elapsed = time.perf_counter() - start
+    return elapsed, messages, peak_rss_mb()
+
+def run_benchmark(func, *args, input_bytes=0):
+    # Each Benchmark Runs in a Fresh Spawned Process, so Peak RSS Is Its Own
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        seconds, messages, peak_rss = executor.submit(run_measured, func, args).result()
+    return {
+        'seconds': seconds,
+        'messages': messages,
+        'messages_per_second': messages / seconds if seconds > 0 else 0,
+        'mb_per_second': input_bytes / 1e6 / seconds if seconds > 0 else 0,
+        'peak_rss_mb': peak_rss
+    }
+
+def run_benchmarks(directory=None, duration=600.0, rates=None, vehicles=(1,), seed=0, link_loss_rate=0.01,
+                   corruption_rate=0.001, noise_rate=0.01, max_bytes=None, output_format='parquet',
+                   results_path=None):
+    # Generates One Synthetic Flight (in a Temporary Directory Unless directory is Given), Times the
+    # Parse, Merge and Analysis Stages and Returns the Results; results_path Also Saves Them as JSON
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        directory = directory or tmp_dir
+        started = time.perf_counter()
+        generated = generate_flight_logs(directory, duration=duration, rates=rates, vehicles=vehicles, seed=seed,
+                                         link_loss_rate=link_loss_rate, corruption_rate=corruption_rate,
+                                         noise_rate=noise_rate, max_bytes=max_bytes)
+        generated['seconds'] = time.perf_counter() - started
+        print(f"\nGenerated {generated['frames']} Frames: {generated['tlog_bytes']} Bytes tlog, "
+              f"{generated['rlog_bytes']} Bytes rlog in {generated['seconds']:.1f} s")
+
+        pair_bytes = generated['tlog_bytes'] + generated['rlog_bytes']
+        benchmarks = [
+            ('parse_rlog_binary', bench_parse_rlog, (generated['rlog'],), generated['rlog_bytes']),
+            ('process_tlog_file', bench_process_tlog, (generated['tlog'],), generated['tlog_bytes']),
+            ('merge_log_files', bench_merge, (directory, output_format), pair_bytes),
+            ('analyze_log_data', bench_analyze, (directory, output_format), pair_bytes),
+        ]
+        results = {}
+        for name, func, args, input_bytes in benchmarks:
+            results[name] = run_benchmark(func, *args, input_bytes=input_bytes)
+            result = results[name]
+            print(f"{name}: {result['seconds']:.2f} s, {result['messages']} msgs, "
+                  f"{result['messages_per_second']:.0f} msgs/s, {result['peak_rss_mb']:.0f} MB Peak RSS")
+
+    report = {
+        'run_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'config': {
+            'duration': duration,
+            'rates': rates or DEFAULT_MESSAGE_RATES,
+            'vehicles': list(vehicles),
+            'seed': seed,
+            'link_loss_rate': link_loss_rate,
+            'corruption_rate': corruption_rate,
+            'noise_rate': noise_rate,
+            'max_bytes': max_bytes,
+            'output_format': output_format
+        },
+        'generated': {key: value for key, value in generated.items() if key not in ('tlog', 'rlog')},
+        'results': results
+    }
+    if results_path:
+        with open(results_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+def parse_rlog_binary_bytewise(file_path):
+    # Original Byte-at-a-Time Parser, Kept as the Benchmark Baseline
+    messages = []
+    try:
+        with open(file_path, 'rb') as f:
+            msg_count = 0
+            while True:
+                byte = f.read(1)
+                if not byte:
+                    break
+
+                if byte[0] in [0xFD, 0xFE]:  # MAVLink Packet Markers
+                    try:
+                        if byte[0] == 0xFD:  # MAVLink v2
+                            length = int.from_bytes(f.read(1), 'little')
+                            if length > 280:  # Max MAVLink v2 Packet Size
+                                continue
+
+                            incompat_flags = int.from_bytes(f.read(1), 'little')
+                            compat_flags = int.from_bytes(f.read(1), 'little')
+                            seq = int.from_bytes(f.read(1), 'little')
+                            sysid = int.from_bytes(f.read(1), 'little')
+                            compid = int.from_bytes(f.read(1), 'little')
+                            msgid = int.from_bytes(f.read(3), 'little')
+                            payload = f.read(length)
+                            checksum = f.read(2)
+
+                            msg_data = {
+                                'msgtype': f'MSG_{msgid}',
+                                'system_id': sysid,
+                                'component_id': compid,
+                                'sequence': seq,
+                                'payload_length': length,
+                                'log_source': 'rlog'
+                            }
+
+                            # Extract Timestamp
+                            if length >= 8:
+                                try:
+                                    msg_data['timestamp'] = struct.unpack('<Q', payload[:8])[0]
+                                except:
+                                    pass
+
+                            messages.append(msg_data)
+                            msg_count += 1
+
+                        else:  # MAVLink v1
+                            length = int.from_bytes(f.read(1), 'little')
+                            if length > 255:
+                                continue
+
+                            seq = int.from_bytes(f.read(1), 'little')
+                            sysid = int.from_bytes(f.read(1), 'little')
+                            compid = int.from_bytes(f.read(1), 'little')
+                            msgid = int.from_bytes(f.read(1), 'little')
+                            payload = f.read(length)
+                            checksum = f.read(2)
+
+                            msg_data = {
+                                'msgtype': f'MSG_{msgid}',
+                                'system_id': sysid,
+                                'component_id': compid,
+                                'sequence': seq,
+                                'payload_length': length,
+                                'log_source': 'rlog'
+                            }
+
+                            if length >= 8:
+                                try:
+                                    msg_data['timestamp'] = struct.unpack('<Q', payload[:8])[0]
+                                except:
+                                    pass
+
+                            messages.append(msg_data)
+                            msg_count += 1
+
+                        if msg_count % 1000 == 0:
+                            print(f"Processed {msg_count} Messages From rlog...", end='\r')
+
+                    except Exception as e:
+                        continue
+
+        print(f"\nCompleted Processing rlog: {msg_count} Valid Messages")
+        return messages
+
+    except Exception as e:
+        print(f"\nError Processing rlog File: {e}")
+        return messages
+
+def time_parsers(file_path, parsers):
+    # In-Process Timings of Alternative Parsers Over One File; Each Parser Returns a Message Count
+    file_size = os.path.getsize(file_path)
+    results = {}
+    for name, parser in parsers:
+        start = time.perf_counter()
+        messages = parser(file_path)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            'seconds': elapsed,
+            'messages': messages,
+            'messages_per_second': messages / elapsed if elapsed > 0 else 0,
+            'mb_per_second': file_size / 1e6 / elapsed if elapsed > 0 else 0
+        }
+    return results
+
+def benchmark_rlog_parsers(duration=60.0, vehicles=(1,), seed=0, noise_rate=0.05):
+    # The Byte-at-a-Time Baseline Against the Buffered and Vectorized rlog Parsers
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        generated = generate_flight_logs(tmp_dir, duration=duration, vehicles=vehicles, seed=seed,
+                                         noise_rate=noise_rate)
+        results = time_parsers(generated['rlog'], [
+            ('bytewise', lambda path: len(parse_rlog_binary_bytewise(path))),
+            ('buffered', lambda path: sum(1 for _ in iter_rlog_frames(path))),
+            ('vectorized', lambda path: len(read_rlog_frame_array(path)))
+        ])
+
+    print(f"\nSynthetic rlog: {generated['frames']} Frames, {generated['rlog_bytes']} Bytes")
+    for name, result in results.items():
+        print(f"{name}: {result['seconds']:.3f} s, {result['messages_per_second']:.0f} msgs/s, "
+              f"{result['mb_per_second']:.1f} MB/s")
+    for name in ('buffered', 'vectorized'):
+        print(f"Speedup ({name}): {results['bytewise']['seconds'] / results[name]['seconds']:.1f}x")
+    return results
+
+def benchmark_tlog_parsers(duration=60.0, vehicles=(1,), seed=0, msgtypes=None):
+    # pymavlink's Reader Against the struct Decoder (and, With msgtypes, Its Allowlist Mode)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        generated = generate_flight_logs(tmp_dir, duration=duration, vehicles=vehicles, seed=seed)
+        parsers = [('mavutil', lambda path: sum(1 for _ in iter_tlog_messages_mavutil(path))),
+                   ('struct', lambda path: sum(1 for _ in iter_tlog_messages(path)))]
+        if msgtypes is not None:
+            parsers.append(('allowlist', lambda path: sum(1 for _ in iter_tlog_messages(path, msgtypes=msgtypes))))
+        results = time_parsers(generated['tlog'], parsers)
+
+    print(f"\nSynthetic tlog: {generated['tlog_frames']} Frames, {generated['tlog_bytes']} Bytes")
+    for name, result in results.items():
+        print(f"{name}: {result['seconds']:.3f} s, {result['messages']} msgs, "
+              f"{result['messages_per_second']:.0f} msgs/s, {result['mb_per_second']:.1f} MB/s")
+    print(f"Speedup: {results['mavutil']['seconds'] / results['struct']['seconds']:.1f}x")
+    return results
+
+def compare_benchmarks(baseline, current, tolerance=REGRESSION_TOLERANCE):
+    # Regressions of current Against baseline (Both run_benchmarks Reports), as Readable Lines
+    regressions = []
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        if result['messages_per_second'] < before['messages_per_second'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['messages_per_second']:.0f} msgs/s, "
+                               f"Was {before['messages_per_second']:.0f}")
+        if result['peak_rss_mb'] > before['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{name}: {result['peak_rss_mb']:.0f} MB Peak RSS, Was {before['peak_rss_mb']:.0f}")
+    return regressions
+
+if __name__ == '__main__':
+    # Ten-Minute Two-Vehicle Flight; Compare Against the Previous Run's Results When Present
+    baseline = None
+    if os.path.exists(BENCHMARK_RESULTS_FILE):
+        with open(BENCHMARK_RESULTS_FILE) as f:
+            baseline = json.load(f)
+
+    report = run_benchmarks(duration=600.0, vehicles=(1, 2))
+    print(json.dumps(report['results'], indent=2))
+
+    if baseline is not None:
+        regressions = compare_benchmarks(baseline, report)
+        for line in regressions:
+            print(f"Regression: {line}")
+        if regressions:
+            sys.exit(1)
+    with open(BENCHMARK_RESULTS_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+
+from Logs import (MERGED_MESSAGES_FILE, MERGED_TYPES_DIR, JSON_INDEX_BLOCK, INDEX_VERSION, index_block,
+                  merged_index_path, write_merged_index)
+
+# Columns Every Query Result Has, in Merged Output Order
+QUERY_COLUMNS = ['msgtype', 'log_source', 'timestamp', 'system_id', 'component_id', 'sequence', 'payload_length']
+# Per-Type Parquet Columns That Duplicate messages.parquet
+TYPE_KEY_COLUMNS = ['_message_index', '_timestamp', '_system_id', '_component_id']
+
+def build_parquet_index(output_path):
+    # Index for Outputs Written Before Merges Recorded One: Reads Only the msgtype/timestamp/source Columns
+    import pyarrow.parquet as pq
+
+    messages_file = pq.ParquetFile(os.path.join(output_path, MERGED_MESSAGES_FILE))
+    blocks = []
+    for row_group in range(messages_file.num_row_groups):
+        columns = messages_file.read_row_group(row_group, columns=['timestamp', 'msgtype', 'log_source']).to_pydict()
+        blocks.append(index_block({'row_group': row_group}, columns['timestamp'], columns['msgtype'],
+                                  columns['log_source']))
+
+    types = {}
+    types_dir = os.path.join(output_path, MERGED_TYPES_DIR)
+    for file_name in sorted(os.listdir(types_dir)) if os.path.isdir(types_dir) else []:
+        type_file = pq.ParquetFile(os.path.join(types_dir, file_name))
+        types[os.path.splitext(file_name)[0]] = {
+            'file': os.path.join(MERGED_TYPES_DIR, file_name),
+            'blocks': [index_block({'row_group': row_group},
+                                   type_file.read_row_group(row_group, columns=['_timestamp']).column(0).to_pylist())
+                       for row_group in range(type_file.num_row_groups)]
+        }
+    return {'format': 'parquet', 'blocks': blocks, 'types': types}
+
+def build_json_index(output_file):
+    # Same Layout write_merged_json Produces: One Record per Line Between the Brackets
+    blocks = []
+    timestamps = []
+    msgtypes = []
+    sources = []
+    block_start = block_end = 0
+    offset = 0
+    with open(output_file, 'rb') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith(b'{"'):
+                if not timestamps:
+                    block_start = offset + line.index(b'{')
+                block_end = offset + len(line.rstrip().rstrip(b','))
+                record = json.loads(stripped.rstrip(b','))
+                timestamps.append(record.get('timestamp'))
+                msgtypes.append(record.get('msgtype'))
+                sources.append(record.get('log_source'))
+                if len(timestamps) >= JSON_INDEX_BLOCK:
+                    blocks.append(index_block({'offset': block_start, 'length': block_end - block_start},
+                                              timestamps, msgtypes, sources))
+                    timestamps, msgtypes, sources = [], [], []
+            offset += len(line)
+    if timestamps:
+        blocks.append(index_block({'offset': block_start, 'length': block_end - block_start}, timestamps, msgtypes,
+                                  sources))
+    return {'format': 'json', 'blocks': blocks}
+
+def load_merged_index(path):
+    # Reads the Index Written at Merge Time, Building (and Saving) One for Older Outputs
+    index_path = merged_index_path(path)
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+        if index.get('version') == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+
+    print(f"Indexing {os.path.basename(os.path.normpath(path))}...")
+    index = build_parquet_index(path) if os.path.isdir(path) else build_json_index(path)
+    try:
+        write_merged_index(index_path, index)
+    except OSError as e:
+        print(f"Could not save index: {e}")
+    return dict(index, version=INDEX_VERSION)
+
+def entry_overlaps(entry, start=None, end=None, msgtype=None):
+    # Whether One Block (or One Source Within It) Can Hold Matches; With a Time Bound, Entries
+    # Without Timestamps Can't
+    if msgtype is not None and 'types' in entry and msgtype not in entry['types']:
+        return False
+    if start is not None or end is not None:
+        if entry['min_timestamp'] is None:
+            return False
+        if start is not None and entry['max_timestamp'] < start:
+            return False
+        if end is not None and entry['min_timestamp'] > end:
+            return False
+    return True
+
+def overlapping_blocks(blocks, start=None, end=None, msgtype=None, source=None):
+    # Blocks That Can Hold Matches; Blocks Indexed per Source Are Checked Against Each Source That Could
+    # Match, so rlog Payload "Timestamps" Only Widen the Range for rlog Rows
+    selected = []
+    for block in blocks:
+        entries = block.get('sources')
+        if entries is None:
+            entries = [block]
+        elif source is not None:
+            entries = [entries[source]] if source in entries else []
+        else:
+            entries = entries.values()
+        if any(entry_overlaps(entry, start, end, msgtype) for entry in entries):
+            selected.append(block)
+    return selected
+
+def block_row_starts(blocks):
+    # Message Index of Each Block's First Row
+    return np.concatenate([[0], np.cumsum([block['rows'] for block in blocks])[:-1]]).astype(np.int64)
+
+class MergedLogQuery:
+    # Random Access to One Merged Output Through Its Block Index; Keep One Open for Interactive
+    # Drill-Down so the Index and Parquet Footers Are Read Once
+    def __init__(self, path):
+        self.path = path
+        self.index = load_merged_index(path)
+        self.is_parquet = self.index['format'] == 'parquet'
+        self.row_starts = block_row_starts(self.index['blocks'])
+        self.files = {}
+        self.blocks_read = 0
+
+    def parquet_file(self, relative_path):
+        import pyarrow.parquet as pq
+        parquet_file = self.files.get(relative_path)
+        if parquet_file is None:
+            parquet_file = self.files[relative_path] = pq.ParquetFile(os.path.join(self.path, relative_path))
+        return parquet_file
+
+    def time_range(self):
+        timed = [block for block in self.index['blocks'] if block['min_timestamp'] is not None]
+        if not timed:
+            return None, None
+        return min(block['min_timestamp'] for block in timed), max(block['max_timestamp'] for block in timed)
+
+    def message_types(self):
+        counts = {}
+        for block in self.index['blocks']:
+            for msgtype, count in block.get('types', {}).items():
+                counts[msgtype] = counts.get(msgtype, 0) + count
+        return counts
+
+    def query(self, msgtype=None, start=None, end=None, sysid=None, compid=None, source=None, fields=True):
+        # Messages Matching Every Given Filter, Indexed by Message Index; start/end Are Inclusive and
+        # in the Merged Timestamp Units. fields Adds Decoded tlog Fields When msgtype is Given
+        blocks = overlapping_blocks(self.index['blocks'], start, end, msgtype, source)
+        self.blocks_read += len(blocks)
+        if self.is_parquet:
+            frame = self.read_parquet_blocks(blocks)
+        else:
+            frame = self.read_json_blocks(blocks, msgtype)
+
+        mask = np.ones(len(frame), dtype=bool)
+        if msgtype is not None:
+            mask &= (frame['msgtype'] == msgtype).to_numpy(dtype=bool)
+        if source is not None:
+            mask &= (frame['log_source'] == source).to_numpy(dtype=bool)
+        if start is not None or end is not None:
+            timestamps = frame['timestamp'].to_numpy(dtype=np.float64, na_value=np.nan)
+            if start is not None:
+                mask &= timestamps >= start
+            if end is not None:
+                mask &= timestamps <= end
+        for column, value in (('system_id', sysid), ('component_id', compid)):
+            if value is not None:
+                mask &= frame[column].to_numpy(dtype=np.float64, na_value=np.nan) == value
+        frame = frame[mask]
+        if not self.is_parquet:
+            # JSON Rows Carry Every Type's Fields; Keep Those the Matches Have
+            frame = frame[QUERY_COLUMNS + [column for column in frame.columns[len(QUERY_COLUMNS):]
+                                           if fields and frame[column].notna().any()]]
+
+        if fields and msgtype is not None and self.is_parquet and msgtype in self.index.get('types', {}):
+            frame = frame.join(self.read_type_fields(msgtype, start, end), how='left')
+        return frame
+
+    def read_parquet_blocks(self, blocks):
+        messages_file = self.parquet_file(MERGED_MESSAGES_FILE)
+        if not blocks:
+            return messages_file.schema_arrow.empty_table().to_pandas()[QUERY_COLUMNS]
+        frame = messages_file.read_row_groups([block['row_group'] for block in blocks],
+                                              columns=QUERY_COLUMNS).to_pandas()
+        frame.index = pd.Index(np.concatenate([
+            np.arange(self.row_starts[block['row_group']], self.row_starts[block['row_group']] + block['rows'])
+            for block in blocks]), name='message_index')
+        return frame
+
+    def read_type_fields(self, msgtype, start, end):
+        type_index = self.index['types'][msgtype]
+        type_file = self.parquet_file(type_index['file'])
+        blocks = overlapping_blocks(type_index['blocks'], start, end)
+        self.blocks_read += len(blocks)
+        if not blocks:
+            fields = type_file.schema_arrow.empty_table().to_pandas()
+        else:
+            fields = type_file.read_row_groups([block['row_group'] for block in blocks]).to_pandas()
+        fields = fields.set_index('_message_index')
+        fields.index.name = 'message_index'
+        return fields.drop(columns=[column for column in TYPE_KEY_COLUMNS if column in fields])
+
+    def read_json_blocks(self, blocks, msgtype=None):
+        # Each Block is a Byte Range of Whole Lines, One Record per Line; With msgtype, Lines
+        # Without It Are Skipped Before Parsing
+        needle = json.dumps({'msgtype': msgtype})[1:-1].encode() if msgtype is not None else None
+        records = []
+        message_index = []
+        positions = {id(block): position for position, block in enumerate(self.index['blocks'])}
+        with open(self.path, 'rb') as f:
+            for block in blocks:
+                f.seek(block['offset'])
+                data = f.read(block['length'])
+                row = self.row_starts[positions[id(block)]]
+                for line in data.split(b'\n'):
+                    if needle is None or needle in line:
+                        records.append(json.loads(line.strip().rstrip(b',')))
+                        message_index.append(row)
+                    row += 1
+        frame = pd.DataFrame.from_records(records, index=pd.Index(message_index, dtype=np.int64,
+                                                                   name='message_index'))
+        for column in QUERY_COLUMNS:
+            if column not in frame:
+                frame[column] = None
+        return frame[QUERY_COLUMNS + [column for column in frame.columns if column not in QUERY_COLUMNS]]
+
+def query_merged_log(path, msgtype=None, start=None, end=None, sysid=None, compid=None, source=None, fields=True):
+    # One-Off Query; Use MergedLogQuery Directly for Repeated Queries on the Same File
+    return MergedLogQuery(path).query(msgtype, start, end, sysid, compid, source, fields)
+
+if __name__ == '__main__':
+    # Drill Into a Window of One Merged Flight
+    merged_path = '/content/sample_data/merged_logs/flight_merged.parquet'
+    log = MergedLogQuery(merged_path)
+    first, last = log.time_range()
+    print(f"{merged_path}: {sum(log.message_types().values())} Messages, {first} to {last}")
+
+    started = time.perf_counter()
+    attitude = log.query('ATTITUDE', first + 60, first + 70, sysid=1)
+    print(f"{len(attitude)} ATTITUDE Messages in 10 s From sysid 1 "
+          f"({log.blocks_read} Blocks, {(time.perf_counter() - started) * 1000:.1f} ms)")
+    print(attitude.head())
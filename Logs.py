@@ -1,154 +1,1236 @@
 import os
 import glob
 from pymavlink import mavutil
+from pymavlink.dialects.v20 import ardupilotmega as mavlink_dialect
 import json
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
 import struct
+import binascii
+import mmap
+import time
+import tempfile
+import shutil
+import heapq
+import pickle
+import hashlib
+from operator import itemgetter
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from array import array
+import numpy as np
 
-def parse_rlog_binary(file_path):
-    messages = []
+# Message Definitions, CRC_EXTRA Seeds and Schemas All Come From mavlink_dialect; mavutil.mavlink
+# Is the v1.0 Dialect Until a Connection Switches It, So It Depends on What Ran Earlier
+
+# MAVLink Frame Layouts (Fields After the Start Marker)
+MAVLINK_V1_MARKER = b'\xfe'
+MAVLINK_V2_MARKER = b'\xfd'
+V1_HEADER = struct.Struct('<BBBBB')     # len, seq, sysid, compid, msgid
+V2_HEADER = struct.Struct('<BBBBBBHB')  # len, incompat, compat, seq, sysid, compid, msgid (24-bit)
+V1_HEADER_SIZE = 1 + V1_HEADER.size
+V2_HEADER_SIZE = 1 + V2_HEADER.size
+CHECKSUM_SIZE = 2
+SIGNATURE_SIZE = 13
+MAVLINK_IFLAG_SIGNED = 0x01
+CHECKSUM = struct.Struct('<H')
+TIMESTAMP = struct.Struct('<Q')
+
+# tlog Records: Big-Endian Microsecond Timestamp Followed by One MAVLink Frame
+TLOG_TIMESTAMP = struct.Struct('>Q')
+TLOG_TIMESTAMP_SIZE = TLOG_TIMESTAMP.size
+
+# Vectorized rlog Header Decode: One Row per Valid Frame
+RLOG_FRAME_DTYPE = np.dtype([
+    ('offset', '<i8'),
+    ('timestamp', '<u8'),
+    ('msgid', '<u4'),
+    ('length', 'u1'),
+    ('seq', 'u1'),
+    ('sysid', 'u1'),
+    ('compid', 'u1'),
+    ('has_timestamp', '?'),
+])
+HEADER_DECODE_CHUNK = 1 << 20
+
+# MAVLink's X.25 CRC Is the Bit-Reflected CCITT CRC, so binascii.crc_hqx
+# Computes it in C Over Bit-Reversed Bytes (Result Compared Bit-Reversed)
+BIT_REVERSE = bytes(int(f'{i:08b}'[::-1], 2) for i in range(256))
+X25_INIT = 0xFFFF
+
+_crc_extra_table = None
+
+# check_frame Results; Rejections Share Their Names With the Frame Stats They Count Toward
+FRAME_VALID = 'valid'
+FRAME_CORRUPT = 'corrupt'
+FRAME_UNKNOWN = 'unknown_msgid'
+FRAME_INCOMPLETE = 'incomplete'  # Runs Past the End of the Buffer
+
+PROGRESS_INTERVAL = 100000
+
+LOG_SOURCES = ('tlog', 'rlog')
+MISSING = -1
+JSON_SCALARS = (str, int, float, bool, type(None))
+
+# Message Records Are Tuples:
+# (msgtype, source, timestamp, system_id, component_id, sequence, payload_length, field_names, field_values)
+RECORD_FIXED_FIELDS = (('system_id', 3), ('component_id', 4), ('sequence', 5), ('payload_length', 6))
+
+# Frames Held Back per Source to Re-Sort Slightly Out-of-Order Timestamps
+REORDER_BUFFER_SIZE = 4096
+
+# Sequence Gaps Are Counted per sysid/compid in Each Source's File Order, Before the Timestamp Merge
+SEQUENCE_MODULUS = 256
+SEQUENCE_RESYNC = 16  # Consecutive Backward Sequence Steps Before the Stream is Taken to Have Jumped
+MAX_SEQUENCE_EVENTS = 1000  # Gap Events Kept per Merge; Counts Cover All of Them
+
+# Records per Pickled Chunk When a Parser Spools to Disk for a Parallel Merge
+SPOOL_CHUNK_SIZE = 10000
+
+# Records Between Cooperative Timeout Checks
+DEADLINE_CHECK_INTERVAL = 10000
+# Seconds Past Its Timeout Before a Parallel Worker That Missed the Cooperative Check Is Killed
+HARD_TIMEOUT_GRACE = 10.0
+
+# Merged Output: Columnar Parquet Directory (Default) or the Legacy Indented JSON
+OUTPUT_FORMATS = ('parquet', 'json')
+PARQUET_ROW_GROUP_SIZE = 65536
+TYPE_ROW_GROUP_SIZE = 16384  # Smaller Blocks per Message Type for Time-Window Queries
+MERGED_MESSAGES_FILE = 'messages.parquet'
+MERGED_TYPES_DIR = 'types'
+SUMMARY_METADATA_KEY = 'summary'
+
+# Block Index Written Alongside Each Merged Output: Rows, Timestamp Range and Message Type Counts per
+# Parquet Row Group (or per JSON_INDEX_BLOCK Lines of a JSON File), so Queries Read Only Matching Blocks
+MERGED_INDEX_FILE = 'index.json'  # Inside a Parquet Output Directory
+JSON_INDEX_SUFFIX = '.index.json'  # Next to a JSON Output File
+JSON_INDEX_BLOCK = 8192
+INDEX_VERSION = 2
+# Sources Whose Timestamps Are Raw Payload Bytes Rather Than Times; Left Out of Block Timestamp Ranges
+RAW_TIMESTAMP_SOURCES = ('rlog',)
+
+# Incremental Runs: Pairs Whose Inputs, Output and Parser Version Match the Manifest Are Skipped
+# Bump PARSER_VERSION Whenever a Change Alters the Merged Output
+PARSER_VERSION = 6
+MANIFEST_FILE = 'manifest.json'
+FAST_HASH_BLOCK = 1 << 20
+
+def reverse_crc16(value):
+    return (BIT_REVERSE[value & 0xFF] << 8) | BIT_REVERSE[value >> 8]
+
+def x25_crc(data):
+    return reverse_crc16(binascii.crc_hqx(data.translate(BIT_REVERSE), X25_INIT))
+
+def get_crc_extra_table():
+    # msgid -> CRC_EXTRA Seed Byte From the MAVLink 2 Dialect (mavlink_dialect)
+    global _crc_extra_table
+    if _crc_extra_table is None:
+        _crc_extra_table = {msgid: msg_class.crc_extra
+                            for msgid, msg_class in mavlink_dialect.mavlink_map.items()}
+    return _crc_extra_table
+
+def new_frame_stats():
+    return {'valid': 0, 'corrupt': 0, 'unknown_msgid': 0, 'resynced': 0, 'skipped_bytes': 0}
+
+def reverse_crc_extra(crc_extra):
+    # Pre-Reverse Each CRC_EXTRA Byte Once Instead of Per Frame
+    return {msgid: BIT_REVERSE[extra:extra + 1] for msgid, extra in crc_extra.items()}
+
+def next_marker(buf, pos):
+    # Offset of the Nearest v1 or v2 Start Marker at or After pos, or -1
+    next_v2 = buf.find(MAVLINK_V2_MARKER, pos)
+    next_v1 = buf.find(MAVLINK_V1_MARKER, pos)
+    if next_v1 < 0 or 0 <= next_v2 < next_v1:
+        return next_v2
+    return next_v1
+
+def check_frame(buf, start, size, crc_extra=None, accept_unknown=False):
+    # Validates the Candidate Frame at buf[start] for the File Scanners and MavlinkStreamParser
+    # Returns (status, msgid, sysid, compid, seq, length, payload_start, end), Header Fields Only When Known
+    # crc_extra (From reverse_crc_extra) Enables the X.25 Check; accept_unknown Lets Message IDs
+    # Without a CRC_EXTRA Through Unchecked
+    marker = buf[start]
+    if marker == MAVLINK_V2_MARKER[0]:
+        if start + V2_HEADER_SIZE > size:
+            return FRAME_INCOMPLETE, None, None, None, None, None, None, None
+        length, incompat_flags, compat_flags, seq, sysid, compid, msgid_low, msgid_high = \
+            V2_HEADER.unpack_from(buf, start + 1)
+        msgid = msgid_low | (msgid_high << 16)
+        payload_start = start + V2_HEADER_SIZE
+        signature_size = SIGNATURE_SIZE if incompat_flags & MAVLINK_IFLAG_SIGNED else 0
+    elif marker == MAVLINK_V1_MARKER[0]:
+        if start + V1_HEADER_SIZE > size:
+            return FRAME_INCOMPLETE, None, None, None, None, None, None, None
+        length, seq, sysid, compid, msgid = V1_HEADER.unpack_from(buf, start + 1)
+        payload_start = start + V1_HEADER_SIZE
+        signature_size = 0
+    else:
+        return FRAME_CORRUPT, None, None, None, None, None, None, None
+
+    payload_end = payload_start + length
+    end = payload_end + CHECKSUM_SIZE + signature_size
+    if end > size:
+        return FRAME_INCOMPLETE, msgid, sysid, compid, seq, length, payload_start, end
+
+    if crc_extra is not None:
+        extra = crc_extra.get(msgid)
+        if extra is None:
+            if not accept_unknown:
+                return FRAME_UNKNOWN, msgid, sysid, compid, seq, length, payload_start, end
+        else:
+            # CRC Covers Header (Without Marker), Payload and the Message's CRC_EXTRA Byte
+            crc = binascii.crc_hqx(extra, binascii.crc_hqx(buf[start + 1:payload_end].translate(BIT_REVERSE),
+                                                           X25_INIT))
+            if crc != (BIT_REVERSE[buf[payload_end]] << 8) | BIT_REVERSE[buf[payload_end + 1]]:
+                return FRAME_CORRUPT, msgid, sysid, compid, seq, length, payload_start, end
+    return FRAME_VALID, msgid, sysid, compid, seq, length, payload_start, end
+
+def scan_mavlink_frames(buf, size, crc_extra=None, stats=None, accept_unknown=False, offsets_only=False):
+    # Yields (msgid, sysid, compid, seq, length, timestamp) For Each Frame in a Buffer or mmap
+    # With offsets_only, Yields Just Each Frame's Start Offset for decode_frame_headers
+    # With a crc_extra Table, Frames Must Pass X.25 CRC Validation; Rejected Candidates
+    # Resync One Byte After Their Marker Instead of Consuming a Bogus Length
+    valid = corrupt = unknown_msgid = resynced = skipped_bytes = 0
+    last_end = 0
+    pos = 0
+    if crc_extra is not None:
+        crc_extra = reverse_crc_extra(crc_extra)
+    next_v2 = buf.find(MAVLINK_V2_MARKER, 0)
+    next_v1 = buf.find(MAVLINK_V1_MARKER, 0)
+
+    try:
+        while True:
+            # Only Re-Scan the Marker That Fell Behind the Cursor
+            if 0 <= next_v2 < pos:
+                next_v2 = buf.find(MAVLINK_V2_MARKER, pos)
+            if 0 <= next_v1 < pos:
+                next_v1 = buf.find(MAVLINK_V1_MARKER, pos)
+
+            if next_v2 < 0 and next_v1 < 0:
+                break
+
+            start = next_v2 if next_v1 < 0 or 0 <= next_v2 < next_v1 else next_v1
+            status, msgid, sysid, compid, seq, length, payload_start, end = \
+                check_frame(buf, start, size, crc_extra, accept_unknown)
+            if status is not FRAME_VALID:
+                # Frames Running Past the End of the File Are Truncated, so Count as Corrupt
+                if status is FRAME_UNKNOWN:
+                    unknown_msgid += 1
+                else:
+                    corrupt += 1
+                pos = start + 1
+                continue
+
+            if start != last_end:
+                resynced += 1
+                skipped_bytes += start - last_end
+
+            valid += 1
+            if offsets_only:
+                yield start
+            else:
+                # Extract Timestamp Without Copying the Payload
+                timestamp = TIMESTAMP.unpack_from(buf, payload_start)[0] if length >= 8 else None
+                yield msgid, sysid, compid, seq, length, timestamp
+            pos = last_end = end
+
+        # Trailing Bytes After the Last Valid Frame
+        skipped_bytes += size - last_end
+    finally:
+        if stats is not None:
+            stats['valid'] += valid
+            stats['corrupt'] += corrupt
+            stats['unknown_msgid'] += unknown_msgid
+            stats['resynced'] += resynced
+            stats['skipped_bytes'] += skipped_bytes
+
+def iter_rlog_frames(file_path, stats=None, validate_crc=True, accept_unknown=False):
+    # Memory-Mapped Frame Generator, Avoids Per-Byte Reads
+    crc_extra = get_crc_extra_table() if validate_crc else None
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield from scan_mavlink_frames(buf, size, crc_extra, stats, accept_unknown)
+
+def decode_frame_headers(buf, offsets):
+    # Second Pass Over Known-Good Frame Offsets: Gathers Every Header Field and the Leading
+    # 8-Byte Timestamp With NumPy Fancy Indexing Over a Zero-Copy View of the Buffer
+    frames = np.zeros(len(offsets), dtype=RLOG_FRAME_DTYPE)
+    if not len(offsets):
+        return frames
+    data = np.frombuffer(buf, dtype=np.uint8)
     try:
-        with open(file_path, 'rb') as f:
-            msg_count = 0
+        for chunk_start in range(0, len(offsets), HEADER_DECODE_CHUNK):
+            starts = np.asarray(offsets[chunk_start:chunk_start + HEADER_DECODE_CHUNK], dtype=np.int64)
+            out = frames[chunk_start:chunk_start + len(starts)]
+            v2 = data[starts] == MAVLINK_V2_MARKER[0]
+
+            # v2: len, incompat, compat, seq, sysid, compid, msgid (3 Bytes); v1: len, seq, sysid, compid, msgid
+            seq_at = starts + np.where(v2, 4, 2)
+            out['offset'] = starts
+            out['length'] = data[starts + 1]
+            out['seq'] = data[seq_at]
+            out['sysid'] = data[seq_at + 1]
+            out['compid'] = data[seq_at + 2]
+            msgid = data[seq_at + 3].astype(np.uint32)
+            v2_starts = starts[v2]
+            msgid[v2] |= (data[v2_starts + 8].astype(np.uint32) << 8) | (data[v2_starts + 9].astype(np.uint32) << 16)
+            out['msgid'] = msgid
+
+            # Little-Endian uint64 Assembled Byte by Byte, Only for Payloads of at Least 8 Bytes
+            has_timestamp = out['length'] >= 8
+            payload_at = (starts + np.where(v2, V2_HEADER_SIZE, V1_HEADER_SIZE))[has_timestamp]
+            timestamp = np.zeros(len(payload_at), dtype=np.uint64)
+            for byte in range(8):
+                timestamp |= data[payload_at + byte].astype(np.uint64) << np.uint64(8 * byte)
+            out['timestamp'][has_timestamp] = timestamp
+            out['has_timestamp'] = has_timestamp
+    finally:
+        # Drop the View so the Caller Can Close the mmap
+        del data
+    return frames
+
+def iter_rlog_frame_chunks(file_path, stats=None, validate_crc=True, accept_unknown=False,
+                           chunk_size=HEADER_DECODE_CHUNK):
+    # RLOG_FRAME_DTYPE Arrays of up to chunk_size Valid Frames, so Memory Stays Bounded on Large Files
+    crc_extra = get_crc_extra_table() if validate_crc else None
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            offsets = scan_mavlink_frames(buf, size, crc_extra, stats, accept_unknown, offsets_only=True)
             while True:
-                byte = f.read(1)
-                if not byte:
+                chunk = array('q', islice(offsets, chunk_size))
+                if not chunk:
                     break
+                yield decode_frame_headers(buf, np.frombuffer(chunk, dtype=np.int64))
 
-                if byte[0] in [0xFD, 0xFE]:  # MAVLink Packet Markers
-                    try:
-                        if byte[0] == 0xFD:  # MAVLink v2
-                            length = int.from_bytes(f.read(1), 'little')
-                            if length > 280:  # Max MAVLink v2 Packet Size
-                                continue
-
-                            incompat_flags = int.from_bytes(f.read(1), 'little')
-                            compat_flags = int.from_bytes(f.read(1), 'little')
-                            seq = int.from_bytes(f.read(1), 'little')
-                            sysid = int.from_bytes(f.read(1), 'little')
-                            compid = int.from_bytes(f.read(1), 'little')
-                            msgid = int.from_bytes(f.read(3), 'little')
-                            payload = f.read(length)
-                            checksum = f.read(2)
-
-                            msg_data = {
-                                'msgtype': f'MSG_{msgid}',
-                                'system_id': sysid,
-                                'component_id': compid,
-                                'sequence': seq,
-                                'payload_length': length,
-                                'log_source': 'rlog'
-                            }
-
-                            # Extract Timestamp
-                            if length >= 8:
-                                try:
-                                    msg_data['timestamp'] = struct.unpack('<Q', payload[:8])[0]
-                                except:
-                                    pass
-
-                            messages.append(msg_data)
-                            msg_count += 1
-
-                        else:  # MAVLink v1
-                            length = int.from_bytes(f.read(1), 'little')
-                            if length > 255:
-                                continue
-
-                            seq = int.from_bytes(f.read(1), 'little')
-                            sysid = int.from_bytes(f.read(1), 'little')
-                            compid = int.from_bytes(f.read(1), 'little')
-                            msgid = int.from_bytes(f.read(1), 'little')
-                            payload = f.read(length)
-                            checksum = f.read(2)
-
-                            msg_data = {
-                                'msgtype': f'MSG_{msgid}',
-                                'system_id': sysid,
-                                'component_id': compid,
-                                'sequence': seq,
-                                'payload_length': length,
-                                'log_source': 'rlog'
-                            }
-
-                            if length >= 8:
-                                try:
-                                    msg_data['timestamp'] = struct.unpack('<Q', payload[:8])[0]
-                                except:
-                                    pass
-
-                            messages.append(msg_data)
-                            msg_count += 1
-
-                        if msg_count % 1000 == 0:
-                            print(f"Processed {msg_count} Messages From rlog...", end='\r')
+def read_rlog_frame_array(file_path, stats=None, validate_crc=True, accept_unknown=False):
+    # Structured Array of Every Valid Frame's Header Fields (RLOG_FRAME_DTYPE)
+    chunks = list(iter_rlog_frame_chunks(file_path, stats, validate_crc, accept_unknown))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=RLOG_FRAME_DTYPE)
 
-                    except Exception as e:
-                        continue
+def print_frame_stats(stats, log=print):
+    log(f"Frame Validation: {stats['valid']} Valid, {stats['corrupt']} Corrupt, "
+          f"{stats['unknown_msgid']} Unknown Message IDs, {stats['resynced']} Resyncs, "
+          f"{stats['skipped_bytes']} Bytes Skipped")
+    if stats.get('filtered'):
+        log(f"Skipped {stats['filtered']} tlog Messages Outside the Type Allowlist")
+
+def combine_frame_stats(stats, other):
+    for key, value in other.items():
+        stats[key] = stats.get(key, 0) + value
+    return stats
+
+def record_to_dict(record):
+    msgtype, source, timestamp = record[0], record[1], record[2]
+    data = {'msgtype': msgtype, 'log_source': source}
+    for name, index in RECORD_FIXED_FIELDS:
+        if record[index] != MISSING:
+            data[name] = record[index]
+    if record[7]:
+        for name, value in zip(record[7], record[8]):
+            if isinstance(value, JSON_SCALARS):
+                data[name] = value
+    if timestamp is not None:
+        data['timestamp'] = timestamp
+    return data
+
+def index_block(location, timestamps, msgtypes=None, sources=None):
+    # One Index Entry: Where the Block Is, Its Row Count, Timestamp Range and Type Counts
+    # With sources, Each Source Also Gets Its Own Entry Under 'sources', and the Block's Own Range
+    # Leaves Out RAW_TIMESTAMP_SOURCES, Whose Values Would Stretch It Over the Whole Flight
+    if sources is None:
+        timed = [timestamp for timestamp in timestamps if timestamp is not None]
+        block = dict(location, rows=len(timestamps),
+                     min_timestamp=min(timed) if timed else None, max_timestamp=max(timed) if timed else None)
+        if msgtypes is not None:
+            types = defaultdict(int)
+            for msgtype in msgtypes:
+                types[msgtype] += 1
+            block['types'] = dict(types)
+        return block
+
+    by_source = defaultdict(lambda: ([], []))
+    for timestamp, msgtype, source in zip(timestamps, msgtypes or [None] * len(timestamps), sources):
+        source_timestamps, source_types = by_source[source]
+        source_timestamps.append(timestamp)
+        source_types.append(msgtype)
+    entries = {source: index_block({}, source_timestamps, source_types if msgtypes is not None else None)
+               for source, (source_timestamps, source_types) in by_source.items()}
+    timed = [entry for source, entry in entries.items()
+             if source not in RAW_TIMESTAMP_SOURCES and entry['min_timestamp'] is not None]
+    block = dict(location, rows=len(timestamps),
+                 min_timestamp=min(entry['min_timestamp'] for entry in timed) if timed else None,
+                 max_timestamp=max(entry['max_timestamp'] for entry in timed) if timed else None)
+    if msgtypes is not None:
+        types = defaultdict(int)
+        for entry in entries.values():
+            for msgtype, count in entry['types'].items():
+                types[msgtype] += count
+        block['types'] = dict(types)
+    block['sources'] = entries
+    return block
+
+def merged_index_path(output_path):
+    if os.path.isdir(output_path):
+        return os.path.join(output_path, MERGED_INDEX_FILE)
+    return output_path + JSON_INDEX_SUFFIX
+
+def write_merged_index(index_path, index):
+    with open(index_path, 'w') as f:
+        json.dump(dict(index, version=INDEX_VERSION), f, default=str)
+
+def write_merged_json(output_file, records, get_summary):
+    # Streams One Record per Line Instead of Building the Full Message List
+    # The Summary Is Written Last, so It Can Be Accumulated While Streaming
+    # Byte Offsets of Every JSON_INDEX_BLOCK Lines Go to the Sidecar Index (json.dumps Output is ASCII)
+    blocks = []
+    timestamps = []
+    msgtypes = []
+    sources = []
+    block_start = None
+
+    def close_block(end):
+        if timestamps:
+            blocks.append(index_block({'offset': block_start, 'length': end - block_start}, timestamps, msgtypes,
+                                      sources))
+            timestamps.clear()
+            msgtypes.clear()
+            sources.clear()
 
-        print(f"\nCompleted Processing rlog: {msg_count} Valid Messages")
+    with open(output_file, 'w') as f:
+        offset = f.write('{\n  "messages": [')
+        first = True
+        for record in records:
+            offset += f.write('\n    ' if first else ',\n    ')
+            if not timestamps:
+                block_start = offset
+            offset += f.write(json.dumps(record, default=str))
+            timestamps.append(record.get('timestamp'))
+            msgtypes.append(record.get('msgtype'))
+            sources.append(record.get('log_source'))
+            if len(timestamps) >= JSON_INDEX_BLOCK:
+                close_block(offset)
+            first = False
+        close_block(offset)
+        f.write('\n  ],\n  "summary": ')
+        f.write(json.dumps(get_summary(), default=str))
+        f.write('\n}\n')
+
+    write_merged_index(output_file + JSON_INDEX_SUFFIX, {'format': 'json', 'blocks': blocks})
+
+def iter_rlog_messages(file_path, stats=None, validate_crc=True, chunk_size=HEADER_DECODE_CHUNK):
+    # Headers Are Decoded a Chunk at a Time by decode_frame_headers; Columns Convert to Python in Bulk
+    msgtypes = {}
+    for frames in iter_rlog_frame_chunks(file_path, stats, validate_crc, chunk_size=chunk_size):
+        for msgid in np.unique(frames['msgid']).tolist():
+            if msgid not in msgtypes:
+                msgtypes[msgid] = f'MSG_{msgid}'
+        for msgid, timestamp, has_timestamp, sysid, compid, seq, length in zip(
+                frames['msgid'].tolist(), frames['timestamp'].tolist(), frames['has_timestamp'].tolist(),
+                frames['sysid'].tolist(), frames['compid'].tolist(), frames['seq'].tolist(),
+                frames['length'].tolist()):
+            yield (msgtypes[msgid], 'rlog', timestamp if has_timestamp else None, sysid, compid, seq, length,
+                   None, None)
+
+def parse_rlog_binary(file_path, stats=None, validate_crc=True):
+    messages = []
+    if stats is None:
+        stats = new_frame_stats()
+    try:
+        append = messages.append
+        for record in iter_rlog_messages(file_path, stats, validate_crc):
+            append(record)
+
+            if len(messages) % PROGRESS_INTERVAL == 0:
+                print(f"Processed {len(messages)} Messages From rlog...", end='\r')
+
+        print(f"\nCompleted Processing rlog: {len(messages)} Valid Messages")
+        print_frame_stats(stats)
         return messages
 
     except Exception as e:
         print(f"\nError Processing rlog File: {e}")
         return messages
 
-def process_tlog_file(file_path):
-    messages = []
+def merged_output_path(output_dir, base_name, output_format):
+    suffix = '_merged.parquet' if output_format == 'parquet' else '_merged.json'
+    return os.path.join(output_dir, f"{os.path.basename(base_name)}{suffix}")
+
+# Arrow Types for MAVLink Scalar Field Types; Floats Stay Double to Match the Decoded Python Values
+ARROW_FIELD_TYPES = {
+    'int8_t': 'int8', 'uint8_t': 'uint8', 'int16_t': 'int16', 'uint16_t': 'uint16',
+    'int32_t': 'int32', 'uint32_t': 'uint32', 'int64_t': 'int64', 'uint64_t': 'uint64',
+    'float': 'float64', 'double': 'float64', 'char': 'string',
+}
+
+def type_file_schema(msgtype, pa):
+    # Schema of types/<MSGTYPE>.parquet From the Message Definition (Scalar Fields, as TlogDecoder
+    # Decodes Them), so It Doesn't Depend on Which Values the First Chunk Happened to Hold
+    msg_class = next((msg_class for msg_class in mavlink_dialect.mavlink_map.values()
+                      if msg_class.msgname == msgtype), None)
+    if msg_class is None:
+        return None
+    fields = [('_message_index', pa.int64()), ('_timestamp', pa.float64()),
+              ('_system_id', pa.int16()), ('_component_id', pa.int16())]
+    for i, (name, order) in enumerate(zip(msg_class.fieldnames, msg_class.orders)):
+        if msg_class.lengths[order] == 1:
+            fields.append((name, getattr(pa, ARROW_FIELD_TYPES.get(msg_class.fieldtypes[i], 'float64'))()))
+    return pa.schema(fields)
+
+def coerce_arrow_column(values, arrow_type, pa):
+    # Later Chunks Must Match the Type Inferred From the First; Non-Conforming Values Become Null
     try:
-        mlog = mavutil.mavlink_connection(file_path)
-        msg_count = 0
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        coerced = []
+        for value in values:
+            try:
+                pa.scalar(value, type=arrow_type)
+                coerced.append(value)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                coerced.append(None)
+        return pa.array(coerced, type=arrow_type)
+
+class ParquetChunkWriter:
+    # Buffers Column Lists and Flushes Them as Parquet Row Groups
+    # Without a schema One is Inferred From the First Chunk; Schema Columns a Row Lacks Are Null
+    # index_columns=(timestamp_column, type_column or None, source_column or None) Records an index_block
+    # per Row Group
+    def __init__(self, path, pa, pq, schema=None, row_group_size=PARQUET_ROW_GROUP_SIZE, index_columns=None):
+        self.path = path
+        self.pa = pa
+        self.pq = pq
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.index_columns = index_columns
+        self.blocks = []
+        self.writer = None
+        self.columns = None
+
+    def append(self, row):
+        if self.columns is None:
+            self.columns = {name: [] for name in row}
+        for name, value in row.items():
+            self.columns[name].append(value)
+        if len(next(iter(self.columns.values()))) >= self.row_group_size:
+            self.flush()
 
+    def flush(self):
+        if not self.columns or not next(iter(self.columns.values())):
+            return
+        pa = self.pa
+        if self.schema is None:
+            self.schema = pa.Table.from_pydict(self.columns).schema
+        rows = len(next(iter(self.columns.values())))
+        arrays = [coerce_arrow_column(self.columns.get(field.name, [None] * rows), field.type, pa)
+                  for field in self.schema]
+        table = pa.Table.from_arrays(arrays, schema=self.schema)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, self.schema, compression='zstd')
+        self.writer.write_table(table, row_group_size=len(table))
+        if self.index_columns:
+            timestamp_column, type_column, source_column = self.index_columns
+            self.blocks.append(index_block({'row_group': len(self.blocks)}, self.columns[timestamp_column],
+                                           self.columns[type_column] if type_column else None,
+                                           self.columns[source_column] if source_column else None))
+        self.columns = {name: [] for name in self.columns}
+
+    def close(self, metadata=None):
+        self.flush()
+        if self.writer is None:
+            return
+        if metadata:
+            self.writer.add_key_value_metadata(metadata)
+        self.writer.close()
+        self.writer = None
+
+    def abort(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+def write_merged_parquet(output_path, records, get_summary):
+    # Columnar Output Directory:
+    #   messages.parquet      Fixed Columns for Every Message, Summary in the File Metadata
+    #   types/<MSGTYPE>.parquet  Decoded tlog Fields per Message Type, Keyed by Message Index
+    #   index.json            Row Group Blocks of Both, for LogQuery
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.join(output_path, MERGED_TYPES_DIR), exist_ok=True)
+    messages_schema = pa.schema([
+        ('msgtype', pa.dictionary(pa.int32(), pa.string())),
+        ('log_source', pa.dictionary(pa.int8(), pa.string())),
+        ('timestamp', pa.float64()),
+        ('timestamp_raw', pa.uint64()),
+        ('system_id', pa.int16()),
+        ('component_id', pa.int16()),
+        ('sequence', pa.int16()),
+        ('payload_length', pa.int16()),
+    ])
+    messages = ParquetChunkWriter(os.path.join(output_path, MERGED_MESSAGES_FILE), pa, pq, messages_schema,
+                                  index_columns=('timestamp', 'msgtype', 'log_source'))
+    type_writers = {}
+
+    try:
+        for index, record in enumerate(records):
+            msgtype, source, timestamp = record[0], record[1], record[2]
+            messages.append({
+                'msgtype': msgtype,
+                'log_source': source,
+                'timestamp': None if timestamp is None else float(timestamp),
+                'timestamp_raw': timestamp if type(timestamp) is int else None,
+                'system_id': None if record[3] == MISSING else record[3],
+                'component_id': None if record[4] == MISSING else record[4],
+                'sequence': None if record[5] == MISSING else record[5],
+                'payload_length': None if record[6] == MISSING else record[6],
+            })
+
+            if record[7]:
+                writer = type_writers.get(msgtype)
+                if writer is None:
+                    writer = type_writers[msgtype] = ParquetChunkWriter(
+                        os.path.join(output_path, MERGED_TYPES_DIR, f"{msgtype}.parquet"), pa, pq,
+                        type_file_schema(msgtype, pa), row_group_size=TYPE_ROW_GROUP_SIZE,
+                        index_columns=('_timestamp', None, None))
+                row = {'_message_index': index, '_timestamp': timestamp,
+                       '_system_id': None if record[3] == MISSING else record[3],
+                       '_component_id': None if record[4] == MISSING else record[4]}
+                for name, value in zip(record[7], record[8]):
+                    if isinstance(value, JSON_SCALARS):
+                        row[name] = value
+                writer.append(row)
+
+        for writer in type_writers.values():
+            writer.close()
+        messages.close({SUMMARY_METADATA_KEY: json.dumps(get_summary(), default=str)})
+        write_merged_index(os.path.join(output_path, MERGED_INDEX_FILE), {
+            'format': 'parquet',
+            'blocks': messages.blocks,
+            'types': {msgtype: {'file': os.path.join(MERGED_TYPES_DIR, f"{msgtype}.parquet"),
+                                'blocks': writer.blocks}
+                      for msgtype, writer in type_writers.items()}
+        })
+    finally:
+        for writer in list(type_writers.values()) + [messages]:
+            writer.abort()
+
+def read_merged_summary(output_path):
+    # Parquet Keeps the Summary in the Footer; JSON Outputs End With It, so Only the Tail is Read
+    if os.path.isdir(output_path):
+        import pyarrow.parquet as pq
+        metadata = pq.ParquetFile(os.path.join(output_path, MERGED_MESSAGES_FILE)).metadata.metadata
+        return json.loads(metadata[SUMMARY_METADATA_KEY.encode()])
+    marker = b'\n  "summary": '
+    with open(output_path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        tail_size = 1 << 16
         while True:
-            try:
-                msg = mlog.recv_match(blocking=False)
-                if msg is None:
-                    break
+            f.seek(max(size - tail_size, 0))
+            tail = f.read()
+            position = tail.rfind(marker)
+            if position >= 0:
+                return json.JSONDecoder().raw_decode(tail[position + len(marker):].decode())[0]
+            if tail_size >= size:
+                raise ValueError(f"No Summary in {output_path}")
+            tail_size *= 4
+
+def scan_tlog_frames(buf, size, crc_extra, stats=None, allowed_ids=None, accept_unknown=False):
+    # Yields (usec, msgid, sysid, compid, seq, length, payload_start, frame_start, frame_end) per tlog Record
+    # Records Failing the Marker or CRC Check Resync on the Next Marker Whose Preceding
+    # 8 Bytes Can Hold a Timestamp; Disallowed Message IDs Are Skipped After Framing
+    valid = corrupt = unknown_msgid = resynced = skipped_bytes = filtered = 0
+    last_end = 0
+    pos = 0
+    crc_extra = reverse_crc_extra(crc_extra)
+
+    try:
+        while pos + TLOG_TIMESTAMP_SIZE < size:
+            start = pos + TLOG_TIMESTAMP_SIZE
+            status, msgid, sysid, compid, seq, length, payload_start, end = \
+                check_frame(buf, start, size, crc_extra, accept_unknown)
+
+            if status is FRAME_VALID:
+                if pos != last_end:
+                    resynced += 1
+                    skipped_bytes += pos - last_end
+                pos = last_end = end
+                if allowed_ids is not None and msgid not in allowed_ids:
+                    filtered += 1
+                    continue
+                valid += 1
+                yield TLOG_TIMESTAMP.unpack_from(buf, start - TLOG_TIMESTAMP_SIZE)[0], \
+                    msgid, sysid, compid, seq, length, payload_start, start, end
+                continue
+
+            if status is FRAME_UNKNOWN:
+                unknown_msgid += 1
+            else:
+                corrupt += 1
+
+            # Bad Record: Next Candidate is the Nearest Marker at Least One Timestamp Past pos + 1
+            start = next_marker(buf, pos + 1 + TLOG_TIMESTAMP_SIZE)
+            if start < 0:
+                break
+            pos = start - TLOG_TIMESTAMP_SIZE
+
+        # Trailing Bytes After the Last Valid Record
+        skipped_bytes += size - last_end
+    finally:
+        if stats is not None:
+            stats['valid'] += valid
+            stats['corrupt'] += corrupt
+            stats['unknown_msgid'] += unknown_msgid
+            stats['resynced'] += resynced
+            stats['skipped_bytes'] += skipped_bytes
+            stats['filtered'] = stats.get('filtered', 0) + filtered
+
+def decode_text(value):
+    # char[] Fields End at the First NUL and Decode as ASCII, Matching pymavlink's Message Classes
+    return value.split(b'\x00', 1)[0].decode('ascii', errors='replace')
+
+class TlogDecoder:
+    # Decodes Payloads Straight From the Dialect's Precompiled Structs, Skipping Message Objects
+    # One Extractor per Message ID Is Built on First Use and Cached
+    # Array Fields Are Dropped Here Since Merged Outputs Only Keep Scalar Fields
+    def __init__(self, msgtypes=None):
+        self.msg_map = mavlink_dialect.mavlink_map
+        self.extractors = {}
+        self.allowed_ids = None
+        if msgtypes is not None:
+            wanted = {name.upper() for name in msgtypes}
+            self.allowed_ids = {msgid for msgid, msg_class in self.msg_map.items()
+                                if msg_class.msgname in wanted}
+
+    def build_extractor(self, msgid):
+        msg_class = self.msg_map.get(msgid)
+        if msg_class is None:
+            return f"UNKNOWN_{msgid}", None, None, 0, None, ()
+
+        # Unpacked Tuple Index of Each Field, in Declaration (_fieldnames) Order
+        # lengths/array_lengths Are in Wire Order, fieldtypes in Declaration Order
+        names = []
+        indices = []
+        text_fields = []
+        for i, (name, order) in enumerate(zip(msg_class.fieldnames, msg_class.orders)):
+            if msg_class.lengths[order] > 1:
+                continue
+            if msg_class.fieldtypes[i] == 'char':
+                text_fields.append(len(names))
+            names.append(name)
+            indices.append(sum(msg_class.lengths[:order]))
+
+        if len(indices) == 1:
+            index = indices[0]
+            getter = lambda values: (values[index],)
+        elif indices:
+            getter = itemgetter(*indices)
+        else:
+            getter = lambda values: ()
+        return msg_class.msgname, tuple(names), msg_class.unpacker, msg_class.unpacker.size, getter, \
+            tuple(text_fields)
+
+    def decode(self, buf, msgid, payload_start, length):
+        # Returns (msgtype, field_names, field_values)
+        extractor = self.extractors.get(msgid)
+        if extractor is None:
+            extractor = self.extractors[msgid] = self.build_extractor(msgid)
+        msgtype, names, unpacker, unpacked_size, getter, text_fields = extractor
+
+        if unpacker is None:
+            # Unknown Message IDs Have No Layout to Decode; Only Their Type Name is Kept
+            return msgtype, (), []
+
+        # MAVLink 2 Truncates Trailing Zero Bytes; Pad Back to the Full Payload
+        if length >= unpacked_size:
+            values = unpacker.unpack_from(buf, payload_start)
+        else:
+            values = unpacker.unpack(buf[payload_start:payload_start + length] + bytes(unpacked_size - length))
+        values = list(getter(values))
+        for i in text_fields:
+            values[i] = decode_text(values[i])
+        return msgtype, names, values
+
+def iter_tlog_messages(file_path, stats=None, msgtypes=None):
+    # Fast Path: mmap Record Scan With Cached Per-Type Struct Extractors
+    # msgtypes Optionally Limits Decoding to an Allowlist of Message Type Names
+    decoder = TlogDecoder(msgtypes)
+    decode = decoder.decode
+    crc_extra = get_crc_extra_table()
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for usec, msgid, sysid, compid, seq, length, payload_start, _, _ in \
+                    scan_tlog_frames(buf, size, crc_extra, stats, decoder.allowed_ids):
+                msgtype, field_names, field_values = decode(buf, msgid, payload_start, length)
+                yield (msgtype, 'tlog', usec * 1.0e-6, sysid, compid, seq, length, field_names, field_values)
+
+def iter_tlog_frames(file_path, stats=None):
+    # Yields (usec, frame_bytes) for Each Valid tlog Record, e.g. to Replay a Flight Over a Socket
+    crc_extra = get_crc_extra_table()
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for usec, _, _, _, _, _, _, start, end in scan_tlog_frames(buf, size, crc_extra, stats):
+                yield usec, buf[start:end]
+
+class MavlinkStreamParser:
+    # Incremental Frame Parser for Live Byte Streams (UDP Datagrams or TCP Chunks)
+    # Only an Unfinished Trailing Frame is Kept Between feed() Calls, so Memory Stays Bounded
+    def __init__(self, stats=None, msgtypes=None):
+        self.buffer = bytearray()
+        self.stats = new_frame_stats() if stats is None else stats
+        self.decoder = TlogDecoder(msgtypes)
+        self.crc_extra = reverse_crc_extra(get_crc_extra_table())
+
+    def feed(self, data, timestamp=None, source='live'):
+        # Returns Message Records for Every Complete Frame; timestamp Defaults to the Receive Time
+        buf = self.buffer
+        buf += data
+        stats = self.stats
+        crc_extra = self.crc_extra
+        allowed_ids = self.decoder.allowed_ids
+        timestamp = time.time() if timestamp is None else timestamp
+        size = len(buf)
+        records = []
+        pos = 0
+
+        while True:
+            start = next_marker(buf, pos)
+            if start < 0:
+                stats['skipped_bytes'] += size - pos
+                pos = size
+                break
 
-                if msg.get_type() == 'BAD_DATA':
+            status, msgid, sysid, compid, seq, length, payload_start, end = check_frame(buf, start, size, crc_extra)
+            if status is FRAME_INCOMPLETE:  # Wait for the Rest of the Frame
+                pos = start
+                break
+
+            if status is FRAME_VALID:
+                if start != pos:
+                    stats['resynced'] += 1
+                    stats['skipped_bytes'] += start - pos
+                pos = end
+                if allowed_ids is not None and msgid not in allowed_ids:
+                    stats['filtered'] = stats.get('filtered', 0) + 1
                     continue
+                stats['valid'] += 1
+                msgtype, field_names, field_values = self.decoder.decode(buf, msgid, payload_start, length)
+                records.append((msgtype, source, timestamp, sysid, compid, seq, length,
+                                field_names, field_values))
+                continue
+
+            # Rejected Candidate: Resync One Byte After Its Marker
+            stats[status] += 1
+            stats['skipped_bytes'] += start + 1 - pos
+            pos = start + 1
+
+        del buf[:pos]
+        return records
+
+def iter_tlog_messages_mavutil(file_path):
+    # Original pymavlink Path, Kept as the Benchmark Baseline
+    mlog = mavutil.mavlink_connection(file_path)
+
+    while True:
+        try:
+            msg = mlog.recv_match(blocking=False)
+            if msg is None:
+                break
 
-                msg_data = {
-                    'msgtype': msg.get_type(),
-                    'log_source': 'tlog'
-                }
-
-                # Message Fields Addition
-                if hasattr(msg, '_fieldnames'):
-                    for field in msg._fieldnames:
-                        try:
-                            value = getattr(msg, field)
-                            if isinstance(value, bytes):
-                                try:
-                                    value = value.decode('utf-8', errors='replace')
-                                except:
-                                    value = ''.join(format(b, '02x') for b in value)
-                            msg_data[field] = value
-                        except:
-                            continue
-
-                if hasattr(msg, '_timestamp'):
-                    msg_data['timestamp'] = msg._timestamp
-
-                messages.append(msg_data)
-                msg_count += 1
-
-                if msg_count % 1000 == 0:
-                    print(f"Processed {msg_count} Messages From tlog...", end='\r')
-
-            except Exception as e:
+            if msg.get_type() == 'BAD_DATA':
                 continue
 
-        print(f"\nCompleted Processing tlog: {msg_count} Valid Messages")
+            # Message Fields Addition
+            field_names = []
+            field_values = []
+            if hasattr(msg, '_fieldnames'):
+                for field in msg._fieldnames:
+                    try:
+                        value = getattr(msg, field)
+                        if isinstance(value, bytes):
+                            try:
+                                value = value.decode('utf-8', errors='replace')
+                            except:
+                                value = ''.join(format(b, '02x') for b in value)
+                        field_names.append(field)
+                        field_values.append(value)
+                    except:
+                        continue
+
+            yield (msg.get_type(), 'tlog', getattr(msg, '_timestamp', None),
+                   MISSING, MISSING, MISSING, MISSING, tuple(field_names), field_values)
+
+        except Exception as e:
+            continue
+
+def process_tlog_file(file_path, stats=None, msgtypes=None):
+    messages = []
+    try:
+        append = messages.append
+        for record in iter_tlog_messages(file_path, stats, msgtypes):
+            append(record)
+
+            if len(messages) % PROGRESS_INTERVAL == 0:
+                print(f"Processed {len(messages)} Messages From tlog...", end='\r')
+
+        print(f"\nCompleted Processing tlog: {len(messages)} Valid Messages")
         return messages
 
     except Exception as e:
         print(f"\nError Processing tlog File: {e}")
         return messages
 
-def merge_log_files(directory_path):
+class SequenceTracker:
+    # Lost Frames per (Source, sysid, compid) From MAVLink Sequence Numbers; Records Must Arrive in
+    # File Order, Since Merging by Timestamp Reorders Frames (rlog Timestamps Are Raw Payload Bytes)
+    def __init__(self, max_events=MAX_SEQUENCE_EVENTS):
+        self.max_events = max_events
+        self.state = {}  # (source, sysid, compid) -> [sequence, backward_steps]
+        self.loss = defaultdict(int)
+        self.gaps = 0
+        self.events = []
+        self.positions = defaultdict(int)  # source -> records seen
+        self.last_timestamp = {}  # source -> timestamp
+
+    def add(self, source, sysid, compid, sequence, timestamp=None):
+        position = self.positions[source]
+        self.positions[source] = position + 1
+        if timestamp is not None:
+            self.last_timestamp[source] = timestamp
+        if sequence is None or sequence == MISSING or sysid is None or sysid == MISSING:
+            return
+
+        stream = (source, sysid, compid)
+        state = self.state.get(stream)
+        if state is None:
+            self.state[stream] = [sequence, 0]
+            return
+        # Steps of Less Than Half the Sequence Space Are Forward; Larger Ones Are Late or Duplicate
+        # Frames, Unless They Persist Long Enough to Mean the Counter Jumped
+        step = (sequence - state[0]) % SEQUENCE_MODULUS
+        if 0 < step < SEQUENCE_MODULUS // 2:
+            if step > 1:
+                self.loss[stream] += step - 1
+                self.gaps += 1
+                if len(self.events) < self.max_events:
+                    # Frames Without a Timestamp Take Their Source's Last One (None Before Any)
+                    self.events.append({'type': 'sequence_gap', 'source': source, 'stream': f"{sysid}/{compid}",
+                                        'time': self.last_timestamp.get(source), 'position': position,
+                                        'lost': step - 1, 'from_sequence': state[0], 'to_sequence': sequence})
+            state[0], state[1] = sequence, 0
+        elif step:
+            state[1] += 1
+            if state[1] >= SEQUENCE_RESYNC:
+                state[0], state[1] = sequence, 0
+
+    def track(self, records):
+        # Passes Merge Records (msgtype, source, timestamp, sysid, compid, seq, ...) Through Unchanged
+        add = self.add
+        for record in records:
+            add(record[1], record[3], record[4], record[5], record[2])
+            yield record
+
+    def combine(self, other):
+        for stream, lost in other.loss.items():
+            self.loss[stream] += lost
+        self.gaps += other.gaps
+        self.events.extend(other.events[:self.max_events - len(self.events)])
+        return self
+
+    def summary(self):
+        return {
+            'gaps': self.gaps,
+            'loss': {f"{source} {sysid}/{compid}": lost for (source, sysid, compid), lost in self.loss.items()},
+            'events': self.events,
+            'truncated': self.gaps > len(self.events)
+        }
+
+def reorder_messages(records, buffer_size=REORDER_BUFFER_SIZE, stats=None):
+    # Re-Sorts a Mostly Time-Ordered Stream With a Bounded Min-Heap
+    # Yields (sort_key, record); Keys Never Decrease, so Streams Can Be heapq.merge'd
+    # Missing Timestamps Inherit the Previous Timestamp to Stay in Place
+    heap = []
+    counter = 0
+    last_timestamp = 0
+    last_key = None
+    late = 0
+
+    try:
+        for record in records:
+            timestamp = record[2]
+            if timestamp is None:
+                timestamp = last_timestamp
+            else:
+                last_timestamp = timestamp
+
+            heapq.heappush(heap, (timestamp, counter, record))
+            counter += 1
+
+            if len(heap) > buffer_size:
+                key, _, record = heapq.heappop(heap)
+                # Frames Later Than the Buffer Can Absorb Are Emitted in Arrival Position
+                if last_key is not None and key < last_key:
+                    late += 1
+                    key = last_key
+                last_key = key
+                yield key, record
+
+        while heap:
+            key, _, record = heapq.heappop(heap)
+            if last_key is not None and key < last_key:
+                late += 1
+                key = last_key
+            last_key = key
+            yield key, record
+    finally:
+        if stats is not None:
+            stats['late'] = stats.get('late', 0) + late
+
+def merge_message_streams(*streams, buffer_size=REORDER_BUFFER_SIZE, stats=None):
+    # K-Way Merge of Per-Source Record Streams in O(Sources x Buffer) Memory
+    # Ties Keep Stream Order, Matching a Stable Sort of the Concatenated Sources
+    ordered = [reorder_messages(stream, buffer_size, stats) for stream in streams]
+    for key, record in heapq.merge(*ordered, key=itemgetter(0)):
+        yield record
+
+def check_deadline(records, deadline, label):
+    # Cooperative Per-Pair Timeout, Checked Every DEADLINE_CHECK_INTERVAL Records
+    if deadline is None:
+        yield from records
+        return
+    for count, record in enumerate(records):
+        if count % DEADLINE_CHECK_INTERVAL == 0 and time.monotonic() > deadline:
+            raise TimeoutError(f"{label} Exceeded Its Time Limit")
+        yield record
+
+def open_source_stream(source, file_path, stats, tlog_types=None):
+    if source == 'tlog':
+        return iter_tlog_messages(file_path, stats, tlog_types)
+    return iter_rlog_messages(file_path, stats)
+
+def spool_log_messages(source, file_path, spool_path, buffer_size=REORDER_BUFFER_SIZE, timeout=None,
+                       tlog_types=None):
+    # Parses One Log (Run in a Worker) and Writes Its Reordered (key, record) Stream to Disk
+    # Returns (frame_stats, seconds, SequenceTracker of the File-Order Stream)
+    start = time.monotonic()
+    deadline = start + timeout if timeout else None
+    stats = new_frame_stats()
+    sequences = SequenceTracker()
+    records = check_deadline(sequences.track(open_source_stream(source, file_path, stats, tlog_types)), deadline,
+                             source.upper())
+    with open(spool_path, 'wb') as f:
+        chunk = []
+        for item in reorder_messages(records, buffer_size, stats):
+            chunk.append(item)
+            if len(chunk) >= SPOOL_CHUNK_SIZE:
+                pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+                chunk = []
+        if chunk:
+            pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return stats, time.monotonic() - start, sequences
+
+def iter_spooled_messages(spool_path):
+    with open(spool_path, 'rb') as f:
+        while True:
+            try:
+                chunk = pickle.load(f)
+            except EOFError:
+                return
+            yield from chunk
+
+def resolve_output_format(output_format):
+    # Parquet Needs pyarrow; Fall Back to JSON When It Isn't Installed
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown Output Format: {output_format}")
+    if output_format == 'parquet':
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            print("pyarrow Not Installed, Writing JSON Output")
+            return 'json'
+    return output_format
+
+def merge_log_pair(tlog_file, rlog_file, output_dir, buffer_size=REORDER_BUFFER_SIZE, timeout=None,
+                   spools=None, log=print, output_format='parquet', tlog_types=None):
+    # Merges One tlog/rlog Pair; Returns 'success', 'partial' or 'failed'
+    # With spools=(tlog_spool, rlog_spool, frame_stats, sequences), Merges Already-Parsed Spool Files
+    # tlog_types Limits tlog Decoding to an Allowlist of Message Types (None Keeps All)
+    base_name = os.path.splitext(tlog_file)[0]
+    deadline = time.monotonic() + timeout if timeout else None
+
+    log(f"\nProcessing Pair: {os.path.basename(tlog_file)}")
+    log(f"TLOG Size: {os.path.getsize(tlog_file)} Bytes")
+    log(f"RLOG Size: {os.path.getsize(rlog_file)} Bytes")
+
+    output_file = merged_output_path(output_dir, base_name, output_format)
+    temp_file = output_file + '.tmp'
+
+    try:
+        log(f"Saving Merged Data To: {output_file}")
+
+        # Stream Both Parsers Through a Timestamp Merge Straight to Disk
+        if spools is None:
+            frame_stats = new_frame_stats()
+            sequences = SequenceTracker()
+            merged = merge_message_streams(
+                sequences.track(iter_tlog_messages(tlog_file, frame_stats, tlog_types)),
+                sequences.track(iter_rlog_messages(rlog_file, frame_stats)),
+                buffer_size=buffer_size,
+                stats=frame_stats
+            )
+        else:
+            tlog_spool, rlog_spool, frame_stats, sequences = spools
+            merged = (record for key, record in heapq.merge(
+                iter_spooled_messages(tlog_spool), iter_spooled_messages(rlog_spool), key=itemgetter(0)))
+        merged = check_deadline(merged, deadline, 'Pair')
+
+        # Summary of Messages, Accumulated While Streaming
+        source_counts = defaultdict(int)
+        type_counts = defaultdict(lambda: {'tlog': 0, 'rlog': 0})
+
+        def counted_records():
+            for record in merged:
+                source_counts[record[1]] += 1
+                type_counts[record[0]][record[1]] += 1
+                yield record
+
+        def get_summary():
+            return {
+                'total_messages': sum(source_counts.values()),
+                'tlog_messages': source_counts['tlog'],
+                'rlog_messages': source_counts['rlog'],
+                'message_types': dict(type_counts),
+                'sequence_gaps': sequences.summary()
+            }
+
+        try:
+            if output_format == 'parquet':
+                write_merged_parquet(temp_file, counted_records(), get_summary)
+            else:
+                write_merged_json(temp_file, map(record_to_dict, counted_records()), get_summary)
+        except TimeoutError as e:
+            log(f"Error: {str(e)}, Skipping Pair")
+            return 'failed'
+        except Exception as e:
+            log(f"Error Saving Merged File: {str(e)}")
+            return 'failed'
+
+        tlog_count = source_counts['tlog']
+        rlog_count = source_counts['rlog']
+        log(f"Found {tlog_count} TLOG Messages and {rlog_count} RLOG Messages")
+        print_frame_stats(frame_stats, log)
+        log(f"Merged {tlog_count + rlog_count} Total Messages by Timestamp "
+            f"({frame_stats.get('late', 0)} Beyond the Reorder Buffer)")
+
+        if not tlog_count and not rlog_count:
+            log("No Valid Messages Found in Either File")
+            return 'failed'
+
+        if os.path.isdir(output_file):
+            shutil.rmtree(output_file)
+        os.replace(temp_file, output_file)
+        if os.path.exists(temp_file + JSON_INDEX_SUFFIX):
+            os.replace(temp_file + JSON_INDEX_SUFFIX, output_file + JSON_INDEX_SUFFIX)
+        log(f"Successfully Saved Merged File")
+
+        if not tlog_count or not rlog_count:
+            log("Messages Found in Only One File")
+            return 'partial'
+        return 'success'
+
+    except Exception as e:
+        log(f"Error Processing Files: {str(e)}")
+        return 'failed'
+
+    finally:
+        remove_temp_output(temp_file)
+
+def remove_temp_output(temp_file):
+    if os.path.isdir(temp_file):
+        shutil.rmtree(temp_file)
+    elif os.path.exists(temp_file):
+        os.remove(temp_file)
+    if os.path.exists(temp_file + JSON_INDEX_SUFFIX):
+        os.remove(temp_file + JSON_INDEX_SUFFIX)
+
+def merge_log_pair_task(tlog_file, rlog_file, output_dir, buffer_size, timeout, spools=None,
+                        output_format='parquet', tlog_types=None):
+    # Worker Entry Point: Collects Log Lines so the Parent Prints Each Pair's Output Together
+    lines = []
+    status = merge_log_pair(tlog_file, rlog_file, output_dir, buffer_size, timeout, spools, lines.append,
+                            output_format, tlog_types)
+    return status, lines
+
+def fast_file_hash(file_path, size=None):
+    # Hashes the Size Plus the First and Last Blocks; Enough to Tell Appended or Replaced Logs Apart
+    size = os.path.getsize(file_path) if size is None else size
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(FAST_HASH_BLOCK))
+        if size > FAST_HASH_BLOCK:
+            f.seek(max(FAST_HASH_BLOCK, size - FAST_HASH_BLOCK))
+            digest.update(f.read(FAST_HASH_BLOCK))
+    return digest.hexdigest()
+
+def file_fingerprint(file_path, previous=None):
+    # Reuses the Previous Hash When Size and mtime Are Unchanged, so Unchanged Files Are Never Read
+    stat = os.stat(file_path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+        fingerprint['hash'] = previous['hash']
+    else:
+        fingerprint['hash'] = fast_file_hash(file_path, stat.st_size)
+    return fingerprint
+
+def load_manifest(output_dir):
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'pairs': {}}
+    manifest.setdefault('pairs', {})
+    return manifest
+
+def save_manifest(output_dir, manifest):
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+def pair_is_current(entry, fingerprints, output_dir, output_format, tlog_types=None):
+    # Content Hashes Decide; a Touched but Unchanged File Still Counts as Current
+    if not entry or entry.get('parser_version') != PARSER_VERSION:
+        return False
+    if entry.get('output_format') != output_format or entry.get('tlog_types') != tlog_types:
+        return False
+    if not os.path.exists(os.path.join(output_dir, entry.get('output', ''))):
+        return False
+    return all(entry.get(source, {}).get('hash') == fingerprints[source]['hash'] for source in LOG_SOURCES)
+
+def merge_log_files(directory_path, buffer_size=REORDER_BUFFER_SIZE, workers=None, timeout=None,
+                    split_pairs=None, output_format='parquet', force=False, tlog_types=None):
+    # workers=None Uses All Cores, workers=1 Merges Serially In-Process
+    # split_pairs Runs Each Pair's Two Parsers in Separate Workers (Default: When Pairs < Workers)
+    # output_format='parquet' Writes <name>_merged.parquet/ Directories, 'json' the Legacy Files
+    # Pairs Unchanged Since the Last Run (Per the Manifest) Are Skipped Unless force=True
+    # tlog_types Decodes Only the Listed tlog Message Types (e.g. ['HEARTBEAT', 'STATUSTEXT'])
     print(f"\nChecking Directory: {directory_path}")
+    output_format = resolve_output_format(output_format)
+    if tlog_types is not None:
+        tlog_types = sorted({name.upper() for name in tlog_types})
 
     if not os.path.exists(directory_path):
         print(f"Directory Does Not Exist: {directory_path}")
@@ -166,9 +1248,8 @@ def merge_log_files(directory_path):
         print(f"Error Creating Output Directory: {str(e)}")
         return
 
-    successful_merges = 0
-    partial_merges = []
-    failed_merges = []
+    results = {'success': [], 'partial': [], 'failed': [], 'skipped': []}
+    manifest = load_manifest(output_dir)
 
     # Find All Log Files
     tlog_files = glob.glob(os.path.join(directory_path, '*.tlog'))
@@ -180,88 +1261,72 @@ def merge_log_files(directory_path):
         print("No Log Files Found")
         return
 
+    pairs = []
+    fingerprints = {}
     for tlog_file in tlog_files:
-        base_name = os.path.splitext(tlog_file)[0]
-        rlog_file = base_name + '.rlog'
-
+        rlog_file = os.path.splitext(tlog_file)[0] + '.rlog'
         if not os.path.exists(rlog_file):
             print(f"\nNo Matching .rlog File Found For {os.path.basename(tlog_file)}")
-            failed_merges.append(os.path.basename(tlog_file))
+            results['failed'].append(os.path.basename(tlog_file))
             continue
 
-        print(f"\nProcessing Pair: {os.path.basename(tlog_file)}")
-        print(f"TLOG Size: {os.path.getsize(tlog_file)} Bytes")
-        print(f"RLOG Size: {os.path.getsize(rlog_file)} Bytes")
-
+        # Skip Pairs Whose Inputs Hash the Same as When Their Output Was Written
+        name = os.path.basename(tlog_file)
+        entry = manifest['pairs'].get(name)
         try:
-            # Process Files
-            tlog_messages = process_tlog_file(tlog_file)
-            rlog_messages = parse_rlog_binary(rlog_file)
-
-            print(f"Found {len(tlog_messages)} TLOG Messages and {len(rlog_messages)} RLOG Messages")
-
-            if not tlog_messages and not rlog_messages:
-                print("No Valid Messages Found in Either File")
-                failed_merges.append(os.path.basename(tlog_file))
-                continue
-            elif not tlog_messages or not rlog_messages:
-                print("Messages Found in Only One File")
-                partial_merges.append(os.path.basename(tlog_file))
-
-            # Combine and Sort Messages
-            merged_messages = tlog_messages + rlog_messages
-            print(f"Combined Into {len(merged_messages)} Total Messages")
-
-            try:
-                merged_messages.sort(key=lambda x: x.get('timestamp', 0))
-                print("Successfully Sorted Messages by Timestamp")
-            except Exception as e:
-                print(f"Warning: Could Not Sort Messages by Timestamp: {str(e)}")
-
-            # Summary of Messages
-            summary = {
-                'total_messages': len(merged_messages),
-                'tlog_messages': len(tlog_messages),
-                'rlog_messages': len(rlog_messages),
-                'message_types': defaultdict(lambda: {'tlog': 0, 'rlog': 0})
+            fingerprints[tlog_file] = {
+                source: file_fingerprint(file_path, (entry or {}).get(source))
+                for source, file_path in (('tlog', tlog_file), ('rlog', rlog_file))
             }
+        except OSError as e:
+            print(f"\nError Reading {name}: {str(e)}")
+            results['failed'].append(name)
+            continue
+        if not force and pair_is_current(entry, fingerprints[tlog_file], output_dir, output_format, tlog_types):
+            results['skipped'].append(name)
+            continue
+        pairs.append((tlog_file, rlog_file))
 
-            for msg in merged_messages:
-                msg_type = msg.get('msgtype', 'unknown')
-                source = msg.get('log_source', 'unknown')
-                summary['message_types'][msg_type][source] += 1
-
-            summary['message_types'] = dict(summary['message_types'])
+    if results['skipped']:
+        print(f"Skipping {len(results['skipped'])} Unchanged Pairs")
 
-            # Merged Data Saved as JSON
-            output_file = os.path.join(output_dir, f"{os.path.basename(base_name)}_merged.json")
-            print(f"Saving Merged Data To: {output_file}")
+    def record_result(tlog_file, status):
+        # Only Completed Outputs Enter the Manifest; Failed Pairs Are Retried Next Run
+        name = os.path.basename(tlog_file)
+        results[status].append(name)
+        if status == 'failed':
+            manifest['pairs'].pop(name, None)
+            return
+        base_name = os.path.splitext(tlog_file)[0]
+        manifest['pairs'][name] = {
+            **fingerprints[tlog_file],
+            'output': os.path.basename(merged_output_path(output_dir, base_name, output_format)),
+            'output_format': output_format,
+            'tlog_types': tlog_types,
+            'parser_version': PARSER_VERSION,
+            'status': status,
+            'merged_at': datetime.now().isoformat(timespec='seconds')
+        }
 
-            output_data = {
-                'summary': summary,
-                'messages': [
-                    {k: v for k, v in msg.items() if isinstance(v, (str, int, float, bool, type(None)))}
-                    for msg in merged_messages
-                ]
-            }
+    workers = workers or os.cpu_count() or 1
+    if split_pairs is None:
+        split_pairs = len(pairs) < workers
 
-            try:
-                with open(output_file, 'w') as f:
-                    json.dump(output_data, f, indent=2, default=str)
-                print(f"Successfully Saved Merged File")
-                successful_merges += 1
-            except Exception as e:
-                print(f"Error Saving Merged File: {str(e)}")
-                failed_merges.append(os.path.basename(tlog_file))
+    try:
+        run_pairs(pairs, output_dir, buffer_size, workers, timeout, split_pairs, output_format, tlog_types,
+                  record_result)
+    finally:
+        save_manifest(output_dir, manifest)
 
-        except Exception as e:
-            print(f"Error Processing Files: {str(e)}")
-            failed_merges.append(os.path.basename(tlog_file))
+    successful_merges = len(results['success']) + len(results['partial'])
+    partial_merges = results['partial']
+    failed_merges = results['failed']
 
     print("\nMerge Process Complete:")
     print(f"Fully Successful Merges: {successful_merges} File Pairs")
     print(f"Partial Merges: {len(partial_merges)} File Pairs")
     print(f"Failed Merges: {len(failed_merges)} File Pairs")
+    print(f"Unchanged (Skipped): {len(results['skipped'])} File Pairs")
 
     if partial_merges:
         print("\nPartial Merge Files:")
@@ -274,10 +1339,140 @@ def merge_log_files(directory_path):
             print(f"- {file}")
 
     print(f"\nMerged Files Can Be Found In: {output_dir}")
+    return results
+
+def terminate_executor(executor):
+    # A Running Call Can't Be Cancelled, so a Stuck Worker is Only Freed by Killing the Pool's Processes
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+def run_pairs(pairs, output_dir, buffer_size, workers, timeout, split_pairs, output_format, tlog_types,
+              record_result):
+    # Merges Each Pair Serially or in a Process Pool, Reporting Every Outcome Through record_result
+    # In the Pool a Task Still Running HARD_TIMEOUT_GRACE Past Its Timeout Fails, and the Pool is Recycled
+    # (Other Running Tasks Are Resubmitted); Serial Merges Rely on the Cooperative Check Alone
+    if workers == 1 or not pairs:
+        for tlog_file, rlog_file in pairs:
+            status = merge_log_pair(tlog_file, rlog_file, output_dir, buffer_size, timeout,
+                                    output_format=output_format, tlog_types=tlog_types)
+            record_result(tlog_file, status)
+        return
+
+    print(f"Merging {len(pairs)} Pairs With {workers} Worker Processes")
+    with tempfile.TemporaryDirectory(dir=output_dir) as spool_dir:
+        # Tasks Are (stage, tlog_file, rlog_file, source, spool_path, timeout, function, args)
+        tasks = deque()
+        spooled = defaultdict(dict)
+
+        for tlog_file, rlog_file in pairs:
+            if split_pairs:
+                for source, file_path in (('tlog', tlog_file), ('rlog', rlog_file)):
+                    spool_path = os.path.join(spool_dir, os.path.basename(file_path) + '.spool')
+                    tasks.append(('spool', tlog_file, rlog_file, source, spool_path, timeout, spool_log_messages,
+                                  (source, file_path, spool_path, buffer_size, timeout, tlog_types)))
+            else:
+                tasks.append(('merge', tlog_file, rlog_file, None, None, timeout, merge_log_pair_task,
+                              (tlog_file, rlog_file, output_dir, buffer_size, timeout, None, output_format,
+                               tlog_types)))
+
+        def finish(task, result, error):
+            stage, tlog_file, rlog_file, source, spool_path = task[:5]
+            name = os.path.basename(tlog_file)
+
+            if stage == 'merge':
+                if error is None:
+                    status, lines = result
+                    print("\n".join(lines))
+                else:
+                    print(f"\nError Processing Pair {name}: {str(error)}")
+                    status = 'failed'
+                record_result(tlog_file, status)
+                return
+
+            # Parse Stage Finished; Merge Once Both Sources of the Pair Are Spooled
+            parts = spooled[tlog_file]
+            if error is None:
+                parts[source] = (spool_path,) + result
+            else:
+                print(f"\nError Parsing {source.upper()} For {name}: {str(error)}")
+                parts[source] = None
+            if len(parts) < 2:
+                return
+
+            del spooled[tlog_file]
+            if parts['tlog'] is None or parts['rlog'] is None:
+                record_result(tlog_file, 'failed')
+                return
+
+            frame_stats = combine_frame_stats(parts['rlog'][1], parts['tlog'][1])
+            remaining = None
+            if timeout:
+                remaining = max(timeout - max(parts['tlog'][2], parts['rlog'][2]), 1e-3)
+            tasks.append(('merge', tlog_file, rlog_file, None, None, remaining, merge_log_pair_task,
+                          (tlog_file, rlog_file, output_dir, buffer_size, remaining,
+                           (parts['tlog'][0], parts['rlog'][0], frame_stats,
+                            parts['tlog'][3].combine(parts['rlog'][3])),
+                           output_format, tlog_types)))
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        pending = {}  # future -> (task, hard deadline or None)
+        try:
+            while tasks or pending:
+                # At Most One Task per Worker, so Each Task Starts When Submitted and Its Deadline Holds
+                while tasks and len(pending) < workers:
+                    task = tasks.popleft()
+                    task_timeout, function, args = task[5:]
+                    deadline = time.monotonic() + task_timeout + HARD_TIMEOUT_GRACE if task_timeout else None
+                    pending[executor.submit(function, *args)] = (task, deadline)
+
+                deadlines = [deadline for _, deadline in pending.values() if deadline is not None]
+                wait_timeout = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+                done, _ = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+                finished = []
+                for future in done:
+                    task, _ = pending.pop(future)
+                    try:
+                        finished.append((task, future.result(), None))
+                    except Exception as e:
+                        finished.append((task, None, e))
+
+                now = time.monotonic()
+                overdue = [future for future, (_, deadline) in pending.items()
+                           if deadline is not None and now > deadline]
+                if overdue:
+                    stopped = [pending.pop(future)[0] for future in overdue]
+                    interrupted = [task for task, _ in pending.values()]
+                    pending.clear()
+                    terminate_executor(executor)
+                    executor = ProcessPoolExecutor(max_workers=workers)
+
+                    # Killed Merges Leave Their Temp Output Behind; Interrupted Tasks Run Again From the Start
+                    for task in stopped + interrupted:
+                        if task[0] == 'merge':
+                            base_name = os.path.splitext(task[1])[0]
+                            remove_temp_output(merged_output_path(output_dir, base_name, output_format) + '.tmp')
+                    tasks.extendleft(reversed(interrupted))
+                    for task in stopped:
+                        finished.append((task, None, TimeoutError(
+                            f"Worker Still Running {task[5] + HARD_TIMEOUT_GRACE:.0f} s After Start, Stopped")))
+
+                for task, result, error in finished:
+                    finish(task, result, error)
+        finally:
+            if pending:
+                terminate_executor(executor)
+            else:
+                executor.shutdown()
 
-# Directory Path
-directory_path = '/content/sample_data'
+if __name__ == '__main__':
+    # Directory Path
+    directory_path = '/content/sample_data'
 
-# Process and Merge Files
-print("Starting Log File Merge Process...")
-merge_log_files(directory_path)
+    # Process and Merge Files
+    print("Starting Log File Merge Process...")
+    merge_log_files(directory_path)
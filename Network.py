@@ -1,11 +1,22 @@
+import os
+import numpy as np
 import pandas as pd
 import networkx as nx
-from itertools import combinations
-import pandas as pd
+from itertools import combinations, islice
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+# Dijkstra Runs From Many Sources at Once; Each Source Holds a Distance and a Predecessor Row,
+# so Chunks Are Sized to Keep Those Rows Within This Many Bytes
+ROUTING_MEMORY = 256 * 2**20
+NO_PREDECESSOR = -9999  # scipy.sparse.csgraph Marker for Unreached Nodes and the Source Itself
+FAILURE_CHUNK = 64  # Failed Links per Worker Task
 
 # Step 1: Load Network from File
 def load_network(csv_path):
-    df = pd.read_csv("/Users/matthewkolakowski/Documents/network_data.csv")
+    df = pd.read_csv(csv_path)
     G = nx.DiGraph()  # Use DiGraph to model bi-directional links
     for _, row in df.iterrows():
         # Add both directions since the network is bi-directional
@@ -17,145 +28,474 @@ def load_network(csv_path):
 def find_shortest_path(graph, source, destination):
     return nx.dijkstra_path(graph, source, destination, weight='weight')
 
-# Step 3: Load Traffic Data
-    def load_traffic(csv_path):
-        return pd.read_csv(csv_path)
-
-    # Step 4: Apply Traffic Flow and Model Traffic Load
-    def model_traffic_load(graph, traffic_df):
-        link_load = {edge: 0 for edge in graph.edges()}
-        for _, demand in traffic_df.iterrows():
-            path = find_shortest_path(graph, demand['Source'], demand['Destination'])
-            # Add demand to each link in the path
-            for i in range(len(path)-1):
-                link_load[(path[i], path[i+1])] += demand['Demand']
-        return link_load
-    return link_load
+class NetworkArrays:
+    # Compact CSR Copy of a Graph for Routing: Nodes and Edges Are Numbered in graph Order,
+    # and Edge i Runs From edge_source[i] to edge_target[i]
+    def __init__(self, graph):
+        self.nodes = list(graph.nodes())
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        self.edges = list(graph.edges())
+        n_edges = len(self.edges)
+        self.edge_source = np.fromiter((self.node_index[u] for u, _ in self.edges), dtype=np.int64, count=n_edges)
+        self.edge_target = np.fromiter((self.node_index[v] for _, v in self.edges), dtype=np.int64, count=n_edges)
+        self.weight = np.fromiter((data.get('weight', 1) for _, _, data in graph.edges(data=True)),
+                                  dtype=np.float64, count=n_edges)
+        self.capacity = np.fromiter((data.get('capacity', np.inf) for _, _, data in graph.edges(data=True)),
+                                    dtype=np.float64, count=n_edges)
+        # Explicitly Stored Zero Weights Still Count as Edges in csgraph
+        n = len(self.nodes)
+        self.matrix = csr_matrix((self.weight, (self.edge_source, self.edge_target)), shape=(n, n))
 
-# Step 5: Determine Worst Case Failure
-def worst_case_failure(graph, traffic_df):
-    original_graph = graph.copy()
-    worst_case = {'link': None, 'unroutable': float('inf'), 'over_capacity': {}}
-    for edge in original_graph.edges():
-        graph = original_graph.copy()
-        graph.remove_edge(*edge)
-        link_load = model_traffic_load(graph, traffic_df)
-        over_capacity = {e: load for e, load in link_load.items() if load > graph[e[0]][e[1]]['capacity']}
-        unroutable = sum(1 for load in over_capacity.values())
-        
-        # Check if this failure scenario is worse than the previous worst case
-        if unroutable < worst_case['unroutable'] or \
-           (unroutable == worst_case['unroutable'] and len(over_capacity) > len(worst_case['over_capacity'])):
-            worst_case = {'link': edge, 'unroutable': unroutable, 'over_capacity': over_capacity}
-    
-    return worst_case
-
-# Usage Example
-network_csv = '/Users/matthewkolakowski/Documents/network_data.csv'
-
-# Define load_traffic function
-def load_traffic(csv_path):
-    return pd.read_csv(csv_path)
+        # (Source, Target) -> Edge Number, by Binary Search Over Sorted Keys
+        keys = self.edge_source * n + self.edge_target
+        self.key_order = np.argsort(keys)
+        self.sorted_keys = keys[self.key_order]
+        # CSR Stores Entries in (Source, Target) Order, so Edge i's Weight is matrix.data[matrix_position[i]]
+        self.matrix.sort_indices()
+        self.matrix_position = np.empty(n_edges, dtype=np.int64)
+        self.matrix_position[self.key_order] = np.arange(n_edges)
 
-# Load network and traffic
+    def edge_ids(self, sources, targets):
+        keys = sources.astype(np.int64) * len(self.nodes) + targets
+        return self.key_order[np.searchsorted(self.sorted_keys, keys)]
 
-# Define model_traffic_load function
-def model_traffic_load(graph, traffic_df):
-    link_load = {edge: 0 for edge in graph.edges()}
-    for _, demand in traffic_df.iterrows():
-        path = find_shortest_path(graph, demand['Source'], demand['Destination'])
-        # Add demand to each link in the path
-        for i in range(len(path)-1):
-            link_load[(path[i], path[i+1])] += demand['Demand']
-    return link_load
-
-G = load_network(network_csv)
-traffic_csv = '/Users/matthewkolakowski/Documents/traffic_data.csv'
-traffic_df = load_traffic(traffic_csv)
-
-# Model traffic load
-link_load = model_traffic_load(G, traffic_df)
-print("Link Load:")
-for link, load in link_load.items():
-    print(f"{link}: {load} units")
-
-# Determine worst case failure
-wcf = worst_case_failure(G, traffic_df)
-print("\nWorst Case Failure:")
-print(f"Link: {wcf['link']}")
-print(f"Unroutable: {wcf['unroutable']}")
-print(f"Link Loads during WCF:")
-
-# Define model_traffic_load function
-def model_traffic_load(graph, traffic_df):
-    link_load = {edge: 0 for edge in graph.edges()}
-    for _, demand in traffic_df.iterrows():
-        path = find_shortest_path(graph, demand['Source'], demand['Destination'])
-        # Add demand to each link in the path
-        for i in range(len(path)-1):
-            link_load[(path[i], path[i+1])] += demand['Demand']
-    return link_load
+    def node_ids(self, names):
+        # Node Numbers for a Column of Node Names; -1 for Names Not in the Graph
+        return np.fromiter((self.node_index.get(name, -1) for name in names), dtype=np.int64, count=len(names))
 
-# Load network and traffic
+def trace_paths(arrays, predecessors, rows, sources, targets):
+    # Walks Every Demand's Path Back From Its Destination Together, One Hop per Step
+    # Returns (Demand Positions, Edge Numbers), One Pair per Edge on Each Path
+    demand_parts, edge_parts = [], []
+    active = np.flatnonzero(targets != sources)
+    current = targets[active]
+    while len(active):
+        previous = predecessors[rows[active], current]
+        demand_parts.append(active)
+        edge_parts.append(arrays.edge_ids(previous, current))
+        keep = previous != sources[active]
+        active, current = active[keep], previous[keep]
+    if not demand_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(demand_parts), np.concatenate(edge_parts)
 
-def load_traffic(csv_path):
-    return pd.read_csv(csv_path)
+def route_from_sources(arrays, matrix, sources, targets, positions):
+    # Shortest Paths for the Demands at positions (sources/targets Are Node Numbers per Demand)
+    # Returns (Path Costs for positions, Demand Positions, Edge Numbers), One Pair per Path Edge
+    cost = np.full(len(positions), np.inf)
+    unique_sources, source_rows = np.unique(sources[positions], return_inverse=True)
+    chunk = max(1, ROUTING_MEMORY // (12 * max(len(arrays.nodes), 1)))
+    demand_parts, edge_parts = [], []
+    for start in range(0, len(unique_sources), chunk):
+        distances, predecessors = dijkstra(matrix, directed=True, indices=unique_sources[start:start + chunk],
+                                           return_predecessors=True)
+        in_chunk = np.flatnonzero((source_rows >= start) & (source_rows < start + chunk))
+        rows = source_rows[in_chunk] - start
+        chunk_positions = positions[in_chunk]
+        cost[in_chunk] = distances[rows, targets[chunk_positions]]
 
-traffic_csv = '/Users/matthewkolakowski/Documents/traffic_data.csv'
+        # Only Reachable Destinations Have Paths to Trace
+        reachable = np.isfinite(cost[in_chunk])
+        chunk_positions, rows = chunk_positions[reachable], rows[reachable]
+        demand_positions, edges = trace_paths(arrays, predecessors, rows, sources[chunk_positions],
+                                              targets[chunk_positions])
+        demand_parts.append(chunk_positions[demand_positions])
+        edge_parts.append(edges)
 
-G = load_network(network_csv)
-traffic_df = load_traffic(traffic_csv)
+    if not demand_parts:
+        return cost, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return cost, np.concatenate(demand_parts), np.concatenate(edge_parts)
 
-# Model traffic load
-link_load = model_traffic_load(G, traffic_df)
-print("Link Load:")
-for link, load in link_load.items():
-    print(f"{link}: {load} units")
+def route_demands(graph, traffic_df, arrays=None):
+    # Routes Every Demand on Its Shortest Path With One Dijkstra Tree per Distinct Source
+    # Returns a Dict With:
+    #   link_load: Load per Edge, Aligned With arrays.edges
+    #   demand_index, edge_index: Every (Demand Row Position, Edge Number) Pair on a Path
+    #   cost: Path Cost per Demand (inf When Unroutable)
+    #   unroutable: Demand Rows With an Unknown Endpoint or No Path
+    arrays = arrays or NetworkArrays(graph)
+    sources = arrays.node_ids(traffic_df['Source'].tolist())
+    targets = arrays.node_ids(traffic_df['Destination'].tolist())
+    demand = traffic_df['Demand'].to_numpy()
+    cost = np.full(len(traffic_df), np.inf)
+    known = np.flatnonzero((sources >= 0) & (targets >= 0))
 
+    cost[known], demand_index, edge_index = route_from_sources(arrays, arrays.matrix, sources, targets, known)
+    link_load = np.zeros(len(arrays.edges), dtype=np.result_type(demand.dtype, np.int64))
+    np.add.at(link_load, edge_index, demand[demand_index])
+    return {
+        'arrays': arrays,
+        'sources': sources,
+        'targets': targets,
+        'demand': demand,
+        'link_load': link_load,
+        'demand_index': demand_index,
+        'edge_index': edge_index,
+        'cost': cost,
+        'unroutable': traffic_df[~np.isfinite(cost)]
+    }
 
-# Determine worst case failure
-wcf = worst_case_failure(G, traffic_df)
+def incidence_index(keys, size):
+    # Groups Incidence Pairs by Key: Pairs order[ptr[k]:ptr[k + 1]] Have Key k
+    order = np.argsort(keys, kind='stable')
+    return np.searchsorted(keys[order], np.arange(size + 1)), order
 
-for link, load in wcf['over_capacity'].items():
-    print(f"{link}: {load} units")
+def incidence_pairs(ptr, order, keys):
+    # Pair Numbers for Every Key in keys, Without a Python Loop Over Keys
+    starts = ptr[keys]
+    lengths = ptr[keys + 1] - starts
+    offsets = np.cumsum(lengths) - lengths
+    return order[np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())]
 
-print("\nWorst Case Failure:")
-print(f"Link: {wcf['link']}")
-print(f"Unroutable: {wcf['unroutable']}")
-print(f"Link Loads during WCF:")
+# Step 3: Load Traffic Data
 def load_traffic(csv_path):
     return pd.read_csv(csv_path)
 
-traffic_csv = '/Users/matthewkolakowski/Documents/traffic_data.csv'
+# Step 4: Apply Traffic Flow and Model Traffic Load
+def model_traffic_load(graph, traffic_df):
+    routing = route_demands(graph, traffic_df)
+    if len(routing['unroutable']):
+        print(f"Unroutable Demands: {len(routing['unroutable'])}")
+    return dict(zip(routing['arrays'].edges, routing['link_load'].tolist()))
 
-# Load network and traffic
-G = load_network(network_csv)
-traffic_df = load_traffic(traffic_csv)
+# Step 5: Determine Worst Case Failure
+class FailureModel:
+    # Baseline Routing Plus Link -> Demand and Demand -> Link Indexes, so a Failure Only Reroutes the
+    # Demands Whose Paths Cross the Failed Links; Everything Else Keeps Its Baseline Load
+    def __init__(self, graph, traffic_df):
+        routing = route_demands(graph, traffic_df)
+        self.arrays = routing['arrays']
+        self.sources = routing['sources']
+        self.targets = routing['targets']
+        self.demand = routing['demand']
+        self.link_load = routing['link_load']
+        self.baseline_unroutable = ~np.isfinite(routing['cost'])
+        self.demand_index = routing['demand_index']
+        self.edge_index = routing['edge_index']
+        self.link_ptr, self.link_order = incidence_index(self.edge_index, len(self.arrays.edges))
+        self.demand_ptr, self.demand_order = incidence_index(self.demand_index, len(self.demand))
 
-# Define model_traffic_load function
-def model_traffic_load(graph, traffic_df):
-    link_load = {edge: 0 for edge in graph.edges()}
-    for _, demand in traffic_df.iterrows():
-        path = find_shortest_path(graph, demand['Source'], demand['Destination'])
-        # Add demand to each link in the path
-        for i in range(len(path)-1):
-            link_load[(path[i], path[i+1])] += demand['Demand']
-    return link_load
-
-# Model traffic load
-link_load = model_traffic_load(G, traffic_df)
-print("Link Load:")
-for link, load in link_load.items():
-    print(f"{link}: {load} units")
-
-for link, load in wcf['over_capacity'].items():
-    print(f"{link}: {load} units")
-
-# Determine worst case failure
-wcf = worst_case_failure(G, traffic_df)
-print("\nWorst Case Failure:")
-print(f"Link: {wcf['link']}")
-print(f"Unroutable: {wcf['unroutable']}")
-print(f"Link Loads during WCF:")
-for link, load in wcf['over_capacity'].items():
-    print(f"{link}: {load} units")
\ No newline at end of file
+    def link_demands(self, edges):
+        # Demand Positions Routed Over Any of edges
+        return np.unique(self.demand_index[incidence_pairs(self.link_ptr, self.link_order, edges)])
+
+    def demand_links(self, demands):
+        # (Demand Positions, Edge Numbers) of Every Baseline Path Edge of demands
+        pairs = incidence_pairs(self.demand_ptr, self.demand_order, demands)
+        return self.demand_index[pairs], self.edge_index[pairs]
+
+    def evaluate(self, failed_edges, matrix=None):
+        # Link Loads With failed_edges Down: Only Affected Demands Are Rerouted, on a Copy of the
+        # Weights With the Failed Edges at inf (matrix May Be Passed In to Reuse One Copy)
+        failed_edges = np.asarray(failed_edges, dtype=np.int64)
+        affected = self.link_demands(failed_edges)
+        link_load = self.link_load.copy()
+        old_demands, old_edges = self.demand_links(affected)
+        np.subtract.at(link_load, old_edges, self.demand[old_demands])
+
+        matrix = self.arrays.matrix.copy() if matrix is None else matrix
+        positions = self.arrays.matrix_position[failed_edges]
+        weights = matrix.data[positions].copy()
+        matrix.data[positions] = np.inf
+        try:
+            cost, new_demands, new_edges = route_from_sources(self.arrays, matrix, self.sources, self.targets,
+                                                              affected)
+        finally:
+            matrix.data[positions] = weights
+        np.add.at(link_load, new_edges, self.demand[new_demands])
+
+        unroutable = self.baseline_unroutable.copy()
+        unroutable[affected[~np.isfinite(cost)]] = True
+        return link_load, unroutable, affected
+
+    def summarize(self, failed_edges, link_load, unroutable, affected):
+        edges = self.arrays.edges
+        excess = link_load - self.arrays.capacity
+        over = np.flatnonzero(excess > 0)
+        return {
+            'link': edges[failed_edges[0]] if len(failed_edges) == 1 else [edges[e] for e in failed_edges],
+            'unroutable': self.demand[unroutable].sum().item(),
+            'unroutable_demands': int(unroutable.sum()),
+            'overload': excess[over].sum().item(),
+            'rerouted': len(affected),
+            'over_capacity': {edges[e]: link_load[e].item() for e in over}
+        }
+
+# Each Worker Process Builds Its Failure Model Once
+FAILURE_MODEL = None
+
+def init_failure_worker(model):
+    global FAILURE_MODEL
+    FAILURE_MODEL = model
+
+def evaluate_failure_chunk(scenarios):
+    # One Weight Copy per Chunk; evaluate Restores It After Every Scenario
+    matrix = FAILURE_MODEL.arrays.matrix.copy()
+    results = []
+    for failed_edges in scenarios:
+        failed_edges = np.asarray(failed_edges, dtype=np.int64)
+        results.append(FAILURE_MODEL.summarize(failed_edges, *FAILURE_MODEL.evaluate(failed_edges, matrix)))
+    return results
+
+def evaluate_scenarios(model, scenarios, executor=None):
+    # Summaries in Scenario Order, Chunked Across executor's Workers (In-Process Without One)
+    chunks = [scenarios[i:i + FAILURE_CHUNK] for i in range(0, len(scenarios), FAILURE_CHUNK)]
+    if executor is None:
+        init_failure_worker(model)
+        return [result for chunk in chunks for result in evaluate_failure_chunk(chunk)]
+
+    results = [None] * len(chunks)
+    pending = {executor.submit(evaluate_failure_chunk, chunk): i for i, chunk in enumerate(chunks)}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[pending.pop(future)] = future.result()
+    return [result for chunk in results for result in chunk]
+
+def failure_pool(model, workers=None):
+    # Worker Pool That Receives the Model Once per Process; None When Running Serially
+    # workers=None Uses All Cores, workers=1 Runs Serially In-Process
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_failure_worker, initargs=(model,))
+
+def run_failure_scenarios(model, scenarios, workers=None):
+    # Evaluates Each Scenario (a List of Failed Edge Numbers) and Returns Summaries in Scenario Order
+    if len(scenarios) <= FAILURE_CHUNK:
+        workers = 1
+    executor = failure_pool(model, workers)
+    if executor is None:
+        return evaluate_scenarios(model, scenarios)
+    with executor:
+        return evaluate_scenarios(model, scenarios, executor)
+
+def failure_rank(result):
+    # Worse Failures Strand More Demand, Then Overload Links by More, Then Overload More Links
+    return (result['unroutable'], result['overload'], len(result['over_capacity']))
+
+# ============================================================
+# FAILURE SCENARIOS
+# ============================================================
+
+# Scenarios Are (Name, Failed Edge Numbers) Pairs; Links Fail in Both Directions, as load_network
+# Models Each CSV Row as a Pair of Directed Edges
+
+def network_links(arrays):
+    # (Endpoints, Edge Numbers) per Bidirectional Link, in Edge Order
+    links = {}
+    for e, (u, v) in enumerate(arrays.edges):
+        links.setdefault(frozenset((u, v)), ((u, v), []))[1].append(e)
+    return list(links.values())
+
+def link_scenarios(model):
+    return [(f"Link {u}-{v}", edges) for (u, v), edges in network_links(model.arrays)]
+
+def node_scenarios(model):
+    # Every Edge Into or Out of the Node; Demands To or From It Become Unroutable
+    arrays = model.arrays
+    incident = {}
+    for e in range(len(arrays.edges)):
+        for node in {arrays.edge_source[e], arrays.edge_target[e]}:
+            incident.setdefault(node, []).append(e)
+    return [(f"Node {arrays.nodes[node]}", edges) for node, edges in sorted(incident.items())]
+
+def srlg_scenarios(model, srlgs):
+    # srlgs Maps Group Name -> (Start, End) Links That Share a Risk (Conduit, Card, Site...)
+    links = {frozenset(endpoints): edges for endpoints, edges in network_links(model.arrays)}
+    scenarios = []
+    for name, group in srlgs.items():
+        edges = []
+        for u, v in group:
+            if frozenset((u, v)) not in links:
+                raise ValueError(f"SRLG {name}: Unknown Link {u}-{v}")
+            edges.extend(links[frozenset((u, v))])
+        scenarios.append((f"SRLG {name}", edges))
+    return scenarios
+
+def k_link_scenarios(model, k, keep=None):
+    # Every Combination of k Links That Carry Traffic, Generated Lazily; Adding an Idle Link to a
+    # Failure Changes Nothing, so Those Combinations Are Covered by Smaller Ones
+    # keep(volume) Says Whether a Combination Whose Links' Affected Demand Volumes Sum to volume Could
+    # Still Matter (the Sum Bounds the Combination's Own Volume); Links Are Then Tried Heaviest First,
+    # so Once the Heaviest Completion of a Prefix Fails keep, Every Later Sibling Does Too
+    ptr = model.link_ptr
+    loaded = [(endpoints, edges) for endpoints, edges in network_links(model.arrays)
+              if any(ptr[e + 1] > ptr[e] for e in edges)]
+
+    def scenario(combo):
+        # Named in Link Order Whatever Order the Links Were Tried In
+        combo = sorted(combo)
+        return (' + '.join(f"{u}-{v}" for _, (u, v), _ in combo), [e for _, _, edges in combo for e in edges])
+
+    loaded = [(i, endpoints, edges) for i, (endpoints, edges) in enumerate(loaded)]
+    if keep is None:
+        for combo in combinations(loaded, k):
+            yield scenario(combo)
+        return
+
+    volumes = np.array([model.demand[model.link_demands(np.asarray(edges, dtype=np.int64))].sum()
+                        for _, _, edges in loaded])
+    order = np.argsort(-volumes, kind='stable')
+    loaded = [loaded[i] for i in order]
+    volumes = volumes[order].tolist()
+    volume_sum = np.concatenate([[0.0], np.cumsum(volumes)]).tolist()
+    combo = []
+
+    def extend(start, volume):
+        remaining = k - len(combo)
+        if not remaining:
+            yield scenario(combo)
+            return
+        for i in range(start, len(loaded) - remaining + 1):
+            if not keep(volume + volume_sum[i + remaining] - volume_sum[i]):
+                break
+            combo.append(loaded[i])
+            yield from extend(i + 1, volume + volumes[i])
+            combo.pop()
+
+    yield from extend(0, 0.0)
+
+def prune_scenarios(model, scenarios, seen=None):
+    # Drops Scenarios No Demand Crosses (Same Result as No Failure) and Repeats of an Edge Set
+    # Already Listed (e.g. an SRLG of One Link, or a Degree-One Node and Its Link); Yields
+    # (Name, Sorted Edges, Affected Demand Positions) so Bounds Reuse the Demand Lookup
+    seen = set() if seen is None else seen
+    for name, edges in scenarios:
+        key = frozenset(edges)
+        if key in seen:
+            continue
+        edges = sorted(key)
+        affected = model.link_demands(np.asarray(edges, dtype=np.int64))
+        if not len(affected):
+            continue
+        seen.add(key)
+        yield name, edges, affected
+
+class FailureBound:
+    # Upper Bounds on a Scenario's failure_rank From the Demand Volume Crossing Its Failed Edges:
+    # Rerouting Can Strand at Most That Volume and Add at Most That Much to Any Link
+    def __init__(self, model):
+        self.model = model
+        self.baseline_unroutable = model.demand[model.baseline_unroutable].sum().item()
+        self.headroom = np.sort(model.arrays.capacity - model.link_load)
+        self.headroom_sum = np.concatenate([[0.0], np.cumsum(self.headroom)])
+
+    def affected_volume(self, edges):
+        return self.model.demand[self.model.link_demands(np.asarray(edges, dtype=np.int64))].sum().item()
+
+    def volume_rank(self, volume):
+        # Nondecreasing in volume, so Any Larger Volume Also Bounds the Rank
+        over = int(np.searchsorted(self.headroom, volume))
+        return (self.baseline_unroutable + volume, over * volume - self.headroom_sum[over], over)
+
+    def rank(self, affected):
+        # affected: Demand Positions Crossing the Failed Edges (FailureModel.link_demands)
+        return self.volume_rank(self.model.demand[affected].sum().item())
+
+def rank_failure_scenarios(model, scenarios, top=None, workers=None, k=1):
+    # Summaries (With a 'scenario' Name) Worst First. With top, Only the top Worst Are Returned and
+    # Scenarios Are Evaluated in Decreasing Bound Order Until No Remaining One Can Enter the top
+    # k > 1 Adds Every Combination of 2..k Loaded Links, Enumerated Lazily After the Listed Scenarios;
+    # With top, Combinations Whose Summed Link Volumes Can't Enter It Are Skipped Without Being Built
+    bound = FailureBound(model)
+    seen = set()
+    listed = sorted(((name, edges, bound.rank(affected))
+                     for name, edges, affected in prune_scenarios(model, scenarios, seen)),
+                    key=itemgetter(2), reverse=True)
+
+    workers = 1 if len(listed) <= FAILURE_CHUNK and k < 2 else workers or os.cpu_count() or 1
+    round_size = FAILURE_CHUNK * workers
+    results = []
+
+    def cutoff():
+        # Rank of the top-th Worst so Far; It Only Rises as Results Come In
+        return failure_rank(results[top - 1]) if top is not None and len(results) >= top else None
+
+    def keep(volume):
+        limit = cutoff()
+        return limit is None or bound.volume_rank(volume) > limit
+
+    def batches():
+        for start in range(0, len(listed), round_size):
+            yield listed[start:start + round_size]
+        # Combinations Are Pulled a Round at a Time, so Each Round Enumerates Against the Latest Cutoff.
+        # They Are All Distinct and Loaded, so Only Repeats of a Listed Scenario Are Dropped
+        combos = ((name, sorted(edges)) for size in range(2, k + 1)
+                  for name, edges in k_link_scenarios(model, size, keep) if frozenset(edges) not in seen)
+        while True:
+            batch = [(name, edges, bound.rank(model.link_demands(np.asarray(edges, dtype=np.int64))))
+                     for name, edges in islice(combos, round_size)]
+            if not batch:
+                return
+            yield batch
+
+    executor = failure_pool(model, workers)
+    try:
+        for batch in batches():
+            limit = cutoff()
+            if limit is not None:
+                batch = [scenario for scenario in batch if scenario[2] > limit]
+                if not batch:
+                    continue
+            summaries = evaluate_scenarios(model, [edges for _, edges, _ in batch], executor)
+            for (name, _, _), summary in zip(batch, summaries):
+                summary['scenario'] = name
+            results = sorted(results + summaries, key=failure_rank, reverse=True)[:top]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return results
+
+def failure_scenario_analysis(graph, traffic_df, k=1, nodes=True, srlgs=None, top=None, workers=None, model=None):
+    # Single Links, Every Combination of 2..k Loaded Links, Single Nodes (nodes=True) and
+    # Shared-Risk Link Groups (srlgs: Name -> [(Start, End), ...]), Ranked Worst First
+    model = model or FailureModel(graph, traffic_df)
+    scenarios = link_scenarios(model)
+    if nodes:
+        scenarios += node_scenarios(model)
+    if srlgs:
+        scenarios += srlg_scenarios(model, srlgs)
+    return rank_failure_scenarios(model, scenarios, top, workers, k)
+
+def link_failure_analysis(graph, traffic_df, workers=None, model=None):
+    # Every Single Link Failure (Both Directions), Worst First
+    return failure_scenario_analysis(graph, traffic_df, nodes=False, workers=workers, model=model)
+
+def worst_case_failure(graph, traffic_df, workers=None):
+    results = failure_scenario_analysis(graph, traffic_df, nodes=False, top=1, workers=workers)
+    if not results:
+        return {'scenario': None, 'link': None, 'unroutable': 0, 'unroutable_demands': 0, 'overload': 0,
+                'rerouted': 0, 'over_capacity': {}}
+    return results[0]
+
+if __name__ == '__main__':
+    # Usage Example
+    network_csv = '/Users/matthewkolakowski/Documents/network_data.csv'
+    traffic_csv = '/Users/matthewkolakowski/Documents/traffic_data.csv'
+
+    # Load network and traffic
+    G = load_network(network_csv)
+    traffic_df = load_traffic(traffic_csv)
+
+    # Model traffic load
+    link_load = model_traffic_load(G, traffic_df)
+    print("Link Load:")
+    for link, load in link_load.items():
+        print(f"{link}: {load} units")
+
+    # Determine worst case failure
+    wcf = worst_case_failure(G, traffic_df)
+    print("\nWorst Case Failure:")
+    print(f"Link: {wcf['scenario']}")
+    print(f"Unroutable: {wcf['unroutable']} units ({wcf['unroutable_demands']} demands)")
+    print(f"Link Loads during WCF:")
+    for link, load in wcf['over_capacity'].items():
+        print(f"{link}: {load} units")
+
+    # Rank Link Pair, Node and Shared-Risk Failures
+    srlgs = {'Conduit C-G': [('C', 'G'), ('I', 'G')]}
+    print("\nWorst Failure Scenarios:")
+    for result in failure_scenario_analysis(G, traffic_df, k=2, srlgs=srlgs, top=5):
+        print(f"{result['scenario']}: Unroutable {result['unroutable']} units, "
+              f"Overload {result['overload']} units on {len(result['over_capacity'])} links")
@@ -12,85 +12,850 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import PageBreak
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.charts.barcharts import VerticalBarChart
 import io
-
-def analyze_timestamp_gaps(timestamps):
-    if not timestamps:
+import math
+import hashlib
+import pickle
+from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from FleetStore import (FLEET_DB_FILE, fleet_connect, record_flight, remove_flight, fleet_flights, fleet_metric,
+                        fleet_top_types)
+from Logs import (MERGED_MESSAGES_FILE, MERGED_TYPES_DIR, RAW_TIMESTAMP_SOURCES, SUMMARY_METADATA_KEY,
+                  SequenceTracker, fast_file_hash, read_merged_summary)
+
+# Only the Columns and Message Types the Analyses Below Read
+MESSAGE_COLUMNS = ['msgtype', 'log_source', 'timestamp', 'system_id', 'component_id', 'sequence']
+TYPE_COLUMNS = {'HEARTBEAT': ['system_status', 'custom_mode']}
+ERROR_KEYWORDS = ['ERROR', 'FAIL', 'WARN']
+
+# Gap Quantiles Reported Overall and per Message Type
+GAP_PERCENTILES = [0.5, 0.99]
+# Streaming Gap Quantiles Come From Log-Spaced Histogram Bins, so Estimates Are Within About One
+# Bin's Relative Width (~4%) of the Exact Lower-Rank Quantile; Gaps Under GAP_HISTOGRAM_MIN Count as Zero
+GAP_HISTOGRAM_MIN = 1e-6
+GAP_HISTOGRAM_DECADES = 12
+GAP_HISTOGRAM_BINS_PER_DECADE = 64
+
+# Anomaly Detection; Streams Are Keyed by Log Source, Since tlog and rlog Carry the Same Frames
+# A Rate Drop is a Gap Over RATE_DROP_FACTOR Times a Type's Smoothed Gap, Once RATE_WARMUP Messages Are Seen
+RATE_DROP_FACTOR = 5.0
+RATE_WARMUP = 20
+RATE_SMOOTHING = 0.05
+HEARTBEAT_TIMEOUT = 3.0  # Seconds Without a HEARTBEAT From a sysid/compid
+REGRESSION_COALESCE = 4096  # Regressions Within This Many Messages of the Last Extend One Event
+MAX_ANOMALY_EVENTS = 1000  # Events Kept per Log; Counts Cover All of Them
+ANOMALY_TYPES = ['rate_drop', 'heartbeat_loss', 'sequence_gap', 'timestamp_regression']
+ANOMALY_REPORT_ROWS = 20
+
+# Per-File Analyses Are Cached Next to the Merged Logs, Keyed by the Merged File's Fingerprint
+# Bump ANALYSIS_VERSION Whenever a Change Alters the Analysis Dict
+ANALYSIS_VERSION = 7
+ANALYSIS_CACHE_DIR = '.analysis_cache'
+
+# Charts Are Rendered to PNG Bytes (in Worker Processes When Analyzing in Parallel), or Drawn
+# Directly as ReportLab Vector Graphics; PNGs Are Cached by a Hash of Their Inputs
+# Bump CHART_VERSION Whenever a Change Alters How Charts Are Drawn
+CHART_FORMATS = ('png', 'vector')
+CHART_DPI = 300
+CHART_VERSION = 2
+CHART_CACHE_DIR = '.chart_cache'
+# Least Recently Used PNGs Are Evicted Past Either Limit After Each Run
+CHART_CACHE_MAX_BYTES = 256 * 2**20
+CHART_CACHE_MAX_AGE = 30 * 24 * 3600  # Seconds
+FLEET_CHARTS_DIR = 'fleet_charts'
+MAX_CHART_LABELS = 60  # Larger Fleets Are Drawn as Trend Lines, Labelling Every nth Flight
+FILE_CHART_SIZE = (7, 3)
+OVERVIEW_CHART_SIZE = (15, 6)
+PDF_CHART_SIZE = (7, 3)
+
+def gap_quantiles(gaps):
+    # Lower-Rank Quantiles by Partitioning In Place; gaps Must Be a Scratch Array
+    kth = [int(q * (len(gaps) - 1)) for q in GAP_PERCENTILES]
+    gaps.partition(kth)
+    return [float(gaps[k]) for k in kth]
+
+def gap_summary(gaps):
+    if len(gaps) == 0:
         return {
             'max_gap': 0,
             'min_gap': 0,
             'mean_gap': 0,
             'std_gap': 0
         }
-
-    timestamps = sorted(timestamps)
-    gaps = np.diff(timestamps)
-
-    return {
-        'max_gap': float(np.max(gaps)) if len(gaps) > 0 else 0,
-        'min_gap': float(np.min(gaps)) if len(gaps) > 0 else 0,
-        'mean_gap': float(np.mean(gaps)) if len(gaps) > 0 else 0,
-        'std_gap': float(np.std(gaps)) if len(gaps) > 0 else 0
+    summary = {
+        'max_gap': float(np.max(gaps)),
+        'min_gap': float(np.min(gaps)),
+        'mean_gap': float(np.mean(gaps)),
+        'std_gap': float(np.std(gaps))
     }
+    summary['p50_gap'], summary['p99_gap'] = gap_quantiles(gaps)
+    return summary
 
-def analyze_system_status(heartbeats):
-    status_counts = defaultdict(int)
-    mode_counts = defaultdict(int)
-
-    for hb in heartbeats:
-        if 'system_status' in hb:
-            status_counts[hb['system_status']] += 1
-        if 'custom_mode' in hb:
-            mode_counts[hb['custom_mode']] += 1
-
-    return {
-        'status_distribution': dict(status_counts),
-        'mode_distribution': dict(mode_counts),
-        'total_heartbeats': len(heartbeats)
+def analyze_timestamp_gaps(timestamps):
+    return gap_summary(np.diff(np.sort(np.asarray(timestamps, dtype=np.float64))))
+
+def analyze_timing_arrays(timestamps, type_ids, type_names):
+    # Timing Analysis on Typed Arrays: timestamps (float64, NaN When Missing) and Integer
+    # type_ids Indexing type_names. Returns (timing_analysis, message_rates)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    type_ids = np.asarray(type_ids)
+    timed = ~np.isnan(timestamps)
+    if not timed.all():
+        timestamps = timestamps[timed]
+        type_ids = type_ids[timed]
+    if not len(timestamps):
+        return {}, {}
+
+    # One Float Sort for the Whole Log (Skipped When Already in Order, as Merged Logs Usually Are),
+    # Then a Stable Integer Sort Groups It by Type While Keeping Each Type's Timestamps in Order
+    if len(timestamps) > 1 and not np.all(timestamps[1:] >= timestamps[:-1]):
+        order = np.argsort(timestamps, kind='stable')
+        ordered = timestamps[order]
+        ordered_types = type_ids[order]
+    else:
+        ordered = timestamps
+        ordered_types = type_ids
+    # 16-Bit Codes Let NumPy Use a Linear-Time Radix Sort
+    if len(type_names) <= np.iinfo(np.uint16).max:
+        ordered_types = ordered_types.astype(np.uint16, copy=False)
+    grouped = ordered[np.argsort(ordered_types, kind='stable')]
+
+    # Type Segments of the Grouped Array Follow From the Per-Type Counts
+    counts = np.bincount(ordered_types, minlength=len(type_names))
+    ends = np.cumsum(counts)
+    starts = ends - counts
+
+    # Within-Type Gaps: Each Type's Segment of Diffs Excludes the Boundary Diff
+    gaps = np.diff(grouped)
+
+    message_rates = {}
+    type_gaps = {}
+    for type_id in np.flatnonzero(counts > 1).tolist():
+        name = type_names[type_id]
+        start, end = int(starts[type_id]), int(ends[type_id])
+        count = end - start
+        duration = grouped[end - 1] - grouped[start]
+        message_rates[name] = count / duration if duration > 0 else 0
+        segment = gaps[start:end - 1]
+        max_gap = float(segment.max())
+        p50, p99 = gap_quantiles(segment)
+        type_gaps[name] = {
+            'count': count,
+            'p50_gap': p50,
+            'p99_gap': p99,
+            'max_gap': max_gap
+        }
+
+    start_time, end_time = float(ordered[0]), float(ordered[-1])
+    duration = end_time - start_time
+    timing_analysis = {
+        'start_time': start_time,
+        'end_time': end_time,
+        'duration_seconds': duration,
+        'message_rate': len(ordered) / duration if duration > 0 else 0,
+        'timestamp_gaps': gap_summary(np.diff(ordered)),
+        'type_gaps': type_gaps
     }
+    return timing_analysis, message_rates
+
+class MessageReducer(ABC):
+    # One Online Analysis Step: add() Sees Each Message Exactly Once, update() Writes Results
+    # Into the Analysis Dict; State Grows With the Number of Message Types, Not Messages
+    @abstractmethod
+    def add(self, msg):
+        pass
+
+    def add_columns(self, batch):
+        # Columnar Counterpart of add() for a MessageColumns Batch; Reducers Without One See Each
+        # Row as a Message Dict (Without Decoded Fields)
+        for msg in batch.iter_messages():
+            self.add(msg)
+
+    @abstractmethod
+    def update(self, analyses):
+        pass
+
+class MessageColumns:
+    # One Batch of Messages as Typed Arrays: Integer Codes Into type_names/source_names, float64
+    # Timestamps (NaN When Missing), int64 IDs (-1 When Missing) and Decoded Field Frames per Type
+    def __init__(self, frame, types=None):
+        self.type_codes, self.type_names = category_codes(frame['msgtype'])
+        self.source_codes, self.source_names = category_codes(frame['log_source'])
+        self.timestamps = frame['timestamp'].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.system_ids, self.component_ids, self.sequences = [
+            frame[column].to_numpy(dtype=np.int64, na_value=-1) if column in frame
+            else np.full(len(frame), -1, dtype=np.int64)
+            for column in ('system_id', 'component_id', 'sequence')]
+        self.types = types or {}
+
+    def __len__(self):
+        return len(self.type_codes)
+
+    def type_counts(self):
+        return np.bincount(self.type_codes, minlength=len(self.type_names))
+
+    def iter_messages(self):
+        for type_id, source_id, timestamp, sysid, compid, sequence in zip(
+                self.type_codes.tolist(), self.source_codes.tolist(), self.timestamps.tolist(),
+                self.system_ids.tolist(), self.component_ids.tolist(), self.sequences.tolist()):
+            yield {
+                'msgtype': self.type_names[type_id],
+                'log_source': self.source_names[source_id],
+                'timestamp': None if timestamp != timestamp else timestamp,
+                'system_id': None if sysid < 0 else sysid,
+                'component_id': None if compid < 0 else compid,
+                'sequence': None if sequence < 0 else sequence
+            }
+
+class TypeSourceReducer(MessageReducer):
+    # Message Counts per Type and Source
+    def __init__(self):
+        self.counts = defaultdict(lambda: defaultdict(int))
+        self.total = 0
+
+    def add(self, msg):
+        self.counts[msg.get('msgtype', 'unknown')][msg.get('log_source', 'unknown')] += 1
+        self.total += 1
+
+    def add_columns(self, batch):
+        # One bincount Over (Type, Source) Pairs
+        if not len(batch):
+            return
+        n_sources = max(len(batch.source_names), 1)
+        pair_counts = np.bincount(batch.type_codes.astype(np.int64) * n_sources + batch.source_codes,
+                                  minlength=len(batch.type_names) * n_sources).reshape(-1, n_sources)
+        for type_id, source_id in zip(*np.nonzero(pair_counts)):
+            type_sources = self.counts[batch.type_names[type_id]]
+            type_sources[batch.source_names[source_id]] += int(pair_counts[type_id, source_id])
+        self.total += len(batch)
+
+    def message_types(self):
+        return {msg_type: {'count': sum(sources.values()), 'sources': dict(sources)}
+                for msg_type, sources in self.counts.items()}
+
+    def source_distribution(self):
+        sources = defaultdict(int)
+        for type_sources in self.counts.values():
+            for source, count in type_sources.items():
+                sources[source] += count
+        return dict(sources)
+
+    def update(self, analyses):
+        msg_types = self.message_types()
+        analyses['message_distribution'] = {
+            'message_types': msg_types,
+            'total_messages': self.total,
+            'unique_message_types': len(msg_types)
+        }
+        analyses['communication_stats']['source_distribution'] = self.source_distribution()
+
+class GapHistogram:
+    # Streaming Gap Distribution in O(1) Memory; Adds One Gap or a NumPy Array of Them
+    SIZE = GAP_HISTOGRAM_DECADES * GAP_HISTOGRAM_BINS_PER_DECADE + 2  # Plus the Zero and Overflow Bins
+
+    def __init__(self):
+        self.counts = np.zeros(self.SIZE, dtype=np.int64)
+        self.max_gap = None
+
+    def add(self, gap):
+        if gap < GAP_HISTOGRAM_MIN:
+            self.counts[0] += 1
+            return
+        self.counts[min(int(math.log10(gap / GAP_HISTOGRAM_MIN) * GAP_HISTOGRAM_BINS_PER_DECADE) + 1,
+                        self.SIZE - 1)] += 1
+        if self.max_gap is None or gap > self.max_gap:
+            self.max_gap = gap
+
+    def add_many(self, gaps):
+        positive = gaps[gaps >= GAP_HISTOGRAM_MIN]
+        self.counts[0] += len(gaps) - len(positive)
+        if len(positive):
+            bins = (np.log10(positive / GAP_HISTOGRAM_MIN) * GAP_HISTOGRAM_BINS_PER_DECADE).astype(np.int64) + 1
+            self.counts += np.bincount(np.minimum(bins, self.SIZE - 1), minlength=self.SIZE)
+            batch_max = float(positive.max())
+            if self.max_gap is None or batch_max > self.max_gap:
+                self.max_gap = batch_max
+
+    def quantiles(self):
+        # Lower-Rank GAP_PERCENTILES, Each at Its Bin's Geometric Midpoint (Capped at the Largest Gap)
+        cumulative = np.cumsum(self.counts)
+        total = int(cumulative[-1])
+        if not total:
+            return [0.0] * len(GAP_PERCENTILES)
+        values = []
+        for q in GAP_PERCENTILES:
+            bin_index = int(np.searchsorted(cumulative, int(q * (total - 1)), side='right'))
+            if bin_index == 0:
+                values.append(0.0)
+                continue
+            value = GAP_HISTOGRAM_MIN * 10 ** ((bin_index - 0.5) / GAP_HISTOGRAM_BINS_PER_DECADE)
+            values.append(float(min(value, self.max_gap)))
+        return values
+
+class TimestampReducer(MessageReducer):
+    # Overall and Per-Type Timing
+    # By Default Gap Stats Stream Over Arrival Order (Welford Mean/Std, GapHistogram Quantiles), so
+    # Memory Stays at O(Types); exact_gaps Instead Keeps Timestamps and Type IDs in Typed Arrays
+    # (12 Bytes per Message) for analyze_timing_arrays' Exact Sorted Quantiles
+    def __init__(self, exact_gaps=False):
+        self.exact_gaps = exact_gaps
+        self.count = 0
+        self.timestamps = array('d')
+        self.type_ids = array('I')
+        self.type_index = {}
+        self.type_names = []
+        self.start_time = None
+        self.end_time = None
+        self.last = None
+        self.gap_count = 0
+        self.gap_mean = 0.0
+        self.gap_m2 = 0.0
+        self.min_gap = None
+        self.max_gap = None
+        self.gap_histogram = GapHistogram()
+        self.per_type = {}  # msgtype -> [count, first, last, previous, GapHistogram]
+
+    def type_id(self, msg_type):
+        type_id = self.type_index.get(msg_type)
+        if type_id is None:
+            type_id = self.type_index[msg_type] = len(self.type_names)
+            self.type_names.append(msg_type)
+        return type_id
+
+    def add(self, msg):
+        timestamp = msg.get('timestamp')
+        if timestamp is None:
+            return
+        self.count += 1
+        msg_type = msg.get('msgtype', 'unknown')
 
-def analyze_source_distribution(messages):
-    sources = defaultdict(int)
-    for msg in messages:
-        sources[msg.get('log_source', 'unknown')] += 1
-    return dict(sources)
+        if self.exact_gaps:
+            self.timestamps.append(timestamp)
+            self.type_ids.append(self.type_id(msg_type))
+            return
+
+        if self.last is None:
+            self.start_time = self.end_time = timestamp
+        else:
+            self.start_time = min(self.start_time, timestamp)
+            self.end_time = max(self.end_time, timestamp)
+            gap = timestamp - self.last
+            self.gap_count += 1
+            delta = gap - self.gap_mean
+            self.gap_mean += delta / self.gap_count
+            self.gap_m2 += delta * (gap - self.gap_mean)
+            self.min_gap = gap if self.min_gap is None else min(self.min_gap, gap)
+            self.max_gap = gap if self.max_gap is None else max(self.max_gap, gap)
+            self.gap_histogram.add(gap)
+        self.last = timestamp
+
+        entry = self.per_type.get(msg_type)
+        if entry is None:
+            self.per_type[msg_type] = [1, timestamp, timestamp, timestamp, GapHistogram()]
+        else:
+            entry[0] += 1
+            if timestamp < entry[1]:
+                entry[1] = timestamp
+            elif timestamp > entry[2]:
+                entry[2] = timestamp
+            entry[4].add(timestamp - entry[3])
+            entry[3] = timestamp
+
+    def add_columns(self, batch):
+        timed = ~np.isnan(batch.timestamps)
+        timestamps = batch.timestamps[timed]
+        type_codes = batch.type_codes[timed]
+        if not len(timestamps):
+            return
+        self.count += len(timestamps)
+
+        if self.exact_gaps:
+            type_ids = np.array([self.type_id(name) for name in batch.type_names], dtype=np.uint32)
+            self.timestamps.frombytes(timestamps.tobytes())
+            self.type_ids.frombytes(type_ids[type_codes].tobytes())
+            return
+
+        # Overall Gaps in Arrival Order, Merged Into the Running Welford Stats (Chan et al.)
+        gaps = np.diff(timestamps) if self.last is None else np.diff(timestamps, prepend=self.last)
+        if len(gaps):
+            count = self.gap_count + len(gaps)
+            batch_mean = float(gaps.mean())
+            delta = batch_mean - self.gap_mean
+            self.gap_m2 += float(((gaps - batch_mean) ** 2).sum()) + \
+                delta * delta * self.gap_count * len(gaps) / count
+            self.gap_mean += delta * len(gaps) / count
+            self.gap_count = count
+            self.min_gap = float(gaps.min()) if self.min_gap is None else min(self.min_gap, float(gaps.min()))
+            self.max_gap = float(gaps.max()) if self.max_gap is None else max(self.max_gap, float(gaps.max()))
+            self.gap_histogram.add_many(gaps)
+        first, last = float(timestamps.min()), float(timestamps.max())
+        self.start_time = first if self.start_time is None else min(self.start_time, first)
+        self.end_time = last if self.end_time is None else max(self.end_time, last)
+        self.last = float(timestamps[-1])
+
+        # Per-Type Gaps: a Stable Sort Groups Each Type's Timestamps in Arrival Order
+        grouped = timestamps[np.argsort(type_codes, kind='stable')]
+        counts = np.bincount(type_codes, minlength=len(batch.type_names))
+        ends = np.cumsum(counts)
+        for type_id in np.flatnonzero(counts).tolist():
+            segment = grouped[ends[type_id] - counts[type_id]:ends[type_id]]
+            name = batch.type_names[type_id]
+            entry = self.per_type.get(name)
+            if entry is None:
+                entry = self.per_type[name] = [0, float(segment.min()), float(segment.max()), None, GapHistogram()]
+            else:
+                entry[1] = min(entry[1], float(segment.min()))
+                entry[2] = max(entry[2], float(segment.max()))
+            entry[4].add_many(np.diff(segment) if entry[3] is None else np.diff(segment, prepend=entry[3]))
+            entry[0] += len(segment)
+            entry[3] = float(segment[-1])
+
+    def online_timing(self):
+        rates = {}
+        type_gaps = {}
+        for msg_type, (count, first, last, _, histogram) in self.per_type.items():
+            if count > 1:
+                duration = last - first
+                rates[msg_type] = count / duration if duration > 0 else 0
+                p50, p99 = histogram.quantiles()
+                type_gaps[msg_type] = {
+                    'count': count,
+                    'p50_gap': p50,
+                    'p99_gap': p99,
+                    'max_gap': float(histogram.max_gap or 0.0)
+                }
+        if not self.count:
+            return {}, rates
+
+        gaps = {'max_gap': 0, 'min_gap': 0, 'mean_gap': 0, 'std_gap': 0}
+        if self.gap_count:
+            gaps = {
+                'max_gap': float(self.max_gap),
+                'min_gap': float(self.min_gap),
+                'mean_gap': float(self.gap_mean),
+                'std_gap': float(np.sqrt(self.gap_m2 / self.gap_count))
+            }
+            gaps['p50_gap'], gaps['p99_gap'] = self.gap_histogram.quantiles()
+        duration = self.end_time - self.start_time
+        timing_analysis = {
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'duration_seconds': duration,
+            'message_rate': self.count / duration if duration > 0 else 0,
+            'timestamp_gaps': gaps,
+            'type_gaps': type_gaps
+        }
+        return timing_analysis, rates
+
+    def timing(self):
+        # Returns (timing_analysis, message_rates)
+        if self.exact_gaps:
+            return analyze_timing_arrays(np.frombuffer(self.timestamps, dtype=np.float64),
+                                         np.frombuffer(self.type_ids, dtype=np.uint32), self.type_names)
+        return self.online_timing()
+
+    def message_rates(self):
+        return self.timing()[1]
+
+    def update(self, analyses):
+        timing_analysis, message_rates = self.timing()
+        if timing_analysis:
+            analyses['timing_analysis'] = timing_analysis
+        analyses['communication_stats']['message_rates'] = message_rates
+
+class HeartbeatReducer(MessageReducer):
+    def __init__(self):
+        self.status_counts = defaultdict(int)
+        self.mode_counts = defaultdict(int)
+        self.total = 0
+
+    def add(self, msg):
+        if msg.get('msgtype') != 'HEARTBEAT':
+            return
+        self.total += 1
+        if 'system_status' in msg:
+            self.status_counts[msg['system_status']] += 1
+        if 'custom_mode' in msg:
+            self.mode_counts[msg['custom_mode']] += 1
+
+    def add_columns(self, batch):
+        # Every HEARTBEAT Counts; Status and Mode Come From the Decoded (tlog) HEARTBEAT Fields
+        if 'HEARTBEAT' in batch.type_names:
+            self.total += int(np.count_nonzero(batch.type_codes == batch.type_names.index('HEARTBEAT')))
+        heartbeats = batch.types.get('HEARTBEAT')
+        if heartbeats is None:
+            return
+        for column, counts in (('system_status', self.status_counts), ('custom_mode', self.mode_counts)):
+            if column in heartbeats:
+                for value, count in heartbeats[column].dropna().astype(int).value_counts(sort=False).items():
+                    counts[int(value)] += int(count)
+
+    def summary(self):
+        return {
+            'status_distribution': dict(self.status_counts),
+            'mode_distribution': dict(self.mode_counts),
+            'total_heartbeats': self.total
+        }
 
-def calculate_message_rates(messages):
-    msg_times = defaultdict(list)
+    def update(self, analyses):
+        if self.total:
+            analyses['system_status'] = self.summary()
+
+class ErrorReducer(MessageReducer):
+    # Message Types Whose Names Contain an Error Keyword; the Match is Cached per Type
+    def __init__(self):
+        self.error_types = defaultdict(int)
+        self.is_error = {}
+
+    def add(self, msg):
+        msg_type = msg.get('msgtype', '')
+        is_error = self.is_error.get(msg_type)
+        if is_error is None:
+            is_error = self.is_error[msg_type] = any(err in msg_type.upper() for err in ERROR_KEYWORDS)
+        if is_error:
+            self.error_types[msg.get('msgtype', 'unknown')] += 1
+
+    def add_columns(self, batch):
+        for type_id, count in enumerate(batch.type_counts().tolist()):
+            msg_type = batch.type_names[type_id]
+            if count and any(err in msg_type.upper() for err in ERROR_KEYWORDS):
+                self.error_types[msg_type] += count
+
+    def summary(self):
+        return {
+            'total_errors': sum(self.error_types.values()),
+            'error_types': dict(self.error_types)
+        }
 
+    def update(self, analyses):
+        analyses['error_analysis'] = self.summary()
+
+class AnomalyDetector:
+    # Single-Pass Detector; State is a Few Numbers per Stream (Source + Message Type, or
+    # Source + sysid/compid), so Memory Doesn't Grow With Log Length
+    # Sequence Gaps Are Only Tracked With track_sequences, for Input in File Order; Merged Logs Are in
+    # Timestamp Order and Carry Gaps Counted Before the Merge in Their Summary (See merge_sequence_gaps)
+    # RAW_TIMESTAMP_SOURCES Skip the Time-Based Checks, Since Their Timestamps Are Raw Payload Bytes
+    def __init__(self, max_events=MAX_ANOMALY_EVENTS, track_sequences=False):
+        self.max_events = max_events
+        self.events = []
+        self.event_counts = dict.fromkeys(ANOMALY_TYPES, 0)
+        self.type_gaps = {}  # (source, msgtype) -> [count, last, smoothed_gap]
+        self.last_heartbeat = {}  # (source, sysid, compid) -> timestamp
+        self.sequences = SequenceTracker(max_events) if track_sequences else None
+        self.last_timestamp = {}  # source -> timestamp
+        self.source_counts = defaultdict(int)
+        self.open_regression = {}  # source -> (event, message_count)
+
+    def emit(self, kind, source, stream, time, **detail):
+        self.event_counts[kind] += 1
+        event = {'type': kind, 'source': source, 'stream': stream, 'time': time, **detail}
+        if len(self.events) < self.max_events:
+            self.events.append(event)
+        return event
+
+    def add(self, msg_type, source, timestamp, sysid=None, compid=None, sequence=None):
+        vehicle = None if sysid is None else (source, sysid, compid)
+        if self.sequences is not None:
+            self.sequences.add(source, sysid, compid, sequence, timestamp)
+
+        if timestamp is None or source in RAW_TIMESTAMP_SOURCES:
+            return
+
+        self.source_counts[source] += 1
+        last = self.last_timestamp.get(source)
+        self.last_timestamp[source] = timestamp
+        if last is not None and timestamp < last:
+            # Once Merged, a Clock Step Interleaves Old and New Timestamps; Report It as One Episode
+            count = self.source_counts[source]
+            episode = self.open_regression.get(source)
+            if episode is not None and count - episode[1] <= REGRESSION_COALESCE:
+                episode[0]['count'] += 1
+                episode[0]['step'] = min(episode[0]['step'], timestamp - last)
+            else:
+                episode = [self.emit('timestamp_regression', source, source, timestamp, previous=last,
+                                     step=timestamp - last, count=1), count]
+                self.open_regression[source] = episode
+            episode[1] = count
+            return
+
+        key = (source, msg_type)
+        entry = self.type_gaps.get(key)
+        if entry is None:
+            self.type_gaps[key] = [1, timestamp, None]
+        elif timestamp >= entry[1]:
+            gap = timestamp - entry[1]
+            smoothed = entry[2]
+            if smoothed is None:
+                smoothed = gap
+            elif entry[0] >= RATE_WARMUP and smoothed > 0 and gap > RATE_DROP_FACTOR * smoothed:
+                self.emit('rate_drop', source, msg_type, entry[1], end=timestamp, gap=gap,
+                          expected_rate=1 / smoothed)
+                # Clamp so One Outage Doesn't Mask the Next
+                gap = RATE_DROP_FACTOR * smoothed
+            entry[2] = smoothed + RATE_SMOOTHING * (gap - smoothed)
+            entry[0] += 1
+            entry[1] = timestamp
+
+        if msg_type == 'HEARTBEAT' and vehicle is not None:
+            last = self.last_heartbeat.get(vehicle)
+            self.last_heartbeat[vehicle] = timestamp
+            if last is not None and timestamp - last > HEARTBEAT_TIMEOUT:
+                self.emit('heartbeat_loss', source, f"{sysid}/{compid}", last, end=timestamp,
+                          gap=timestamp - last)
+
+    def summary(self):
+        anomalies = {
+            'total_events': sum(self.event_counts.values()),
+            'event_counts': dict(self.event_counts),
+            'events': self.events,
+            'truncated': sum(self.event_counts.values()) > len(self.events),
+            'sequence_loss': {}
+        }
+        if self.sequences is not None:
+            merge_sequence_gaps(anomalies, self.sequences.summary(), self.max_events)
+        return anomalies
+
+def merge_sequence_gaps(anomalies, sequence_gaps, max_events=MAX_ANOMALY_EVENTS):
+    # Folds a SequenceTracker Summary (Merged Logs Keep One Under summary['sequence_gaps']) Into an
+    # Anomaly Summary; Events Stay in Time Order, With Untimed Gaps Last
+    if not sequence_gaps:
+        return anomalies
+    anomalies['event_counts']['sequence_gap'] += sequence_gaps['gaps']
+    anomalies['total_events'] += sequence_gaps['gaps']
+    anomalies['sequence_loss'].update(sequence_gaps['loss'])
+    events = sorted(anomalies['events'] + sequence_gaps['events'],
+                    key=lambda event: (event['time'] is None, event['time'] or 0))
+    anomalies['events'] = events[:max_events]
+    anomalies['truncated'] = anomalies['total_events'] > len(anomalies['events'])
+    return anomalies
+
+class AnomalyReducer(MessageReducer):
+    def __init__(self):
+        self.detector = AnomalyDetector()
+
+    def add(self, msg):
+        self.detector.add(msg.get('msgtype', 'unknown'), msg.get('log_source', 'unknown'), msg.get('timestamp'),
+                          msg.get('system_id'), msg.get('component_id'), msg.get('sequence'))
+
+    def add_columns(self, batch):
+        feed_anomaly_columns(self.detector, batch.type_codes, batch.type_names, batch.source_codes,
+                             batch.source_names, batch.timestamps, batch.system_ids, batch.component_ids,
+                             batch.sequences)
+
+    def update(self, analyses):
+        analyses['anomalies'] = self.detector.summary()
+
+def feed_anomaly_columns(detector, type_codes, type_names, source_codes, source_names, timestamps, sysids,
+                         compids, sequences):
+    # Feeds Column Arrays Through an AnomalyDetector in File Order; Missing Values Are NaN / -1
+    add = detector.add
+    for type_id, source_id, timestamp, sysid, compid, sequence in zip(
+            type_codes.tolist(), source_codes.tolist(), timestamps.tolist(),
+            sysids.tolist(), compids.tolist(), sequences.tolist()):
+        add(type_names[type_id], source_names[source_id], None if timestamp != timestamp else timestamp,
+            None if sysid < 0 else sysid, None if compid < 0 else compid, None if sequence < 0 else sequence)
+
+def detect_anomalies(type_codes, type_names, source_codes, source_names, timestamps, sysids, compids, sequences,
+                     track_sequences=False):
+    detector = AnomalyDetector(track_sequences=track_sequences)
+    feed_anomaly_columns(detector, type_codes, type_names, source_codes, source_names, timestamps, sysids,
+                         compids, sequences)
+    return detector.summary()
+
+def default_reducers(exact_gaps=False):
+    # exact_gaps Trades O(Messages) Memory for Exact Gap Quantiles (See TimestampReducer)
+    return [TypeSourceReducer(), TimestampReducer(exact_gaps), HeartbeatReducer(), ErrorReducer(),
+            AnomalyReducer()]
+
+def run_reducers(messages, reducers):
+    # Single Pass; messages May Be Any Iterable, Including a Streamed File
+    adds = [reducer.add for reducer in reducers]
     for msg in messages:
-        if 'timestamp' in msg:
-            msg_times[msg.get('msgtype', 'unknown')].append(msg['timestamp'])
+        for add in adds:
+            add(msg)
+    return reducers
 
-    rates = {}
-    for msg_type, timestamps in msg_times.items():
-        if len(timestamps) > 1:
-            duration = max(timestamps) - min(timestamps)
-            rates[msg_type] = len(timestamps) / duration if duration > 0 else 0
+def analyze_messages(messages, reducers=None):
+    return collect_analyses(run_reducers(messages, default_reducers() if reducers is None else reducers))
 
-    return rates
+def collect_analyses(reducers):
+    analyses = {
+        'message_distribution': {},
+        'timing_analysis': {},
+        'system_status': {},
+        'communication_stats': {},
+        'error_analysis': {}
+    }
+    for reducer in reducers:
+        reducer.update(analyses)
+    return analyses
 
-def analyze_errors(messages):
-    error_msgs = [msg for msg in messages if
-                 any(err in msg.get('msgtype', '').upper()
-                     for err in ['ERROR', 'FAIL', 'WARN'])]
+def analyze_system_status(heartbeats):
+    return run_reducers(heartbeats, [HeartbeatReducer()])[0].summary()
 
-    error_types = defaultdict(int)
-    for msg in error_msgs:
-        error_types[msg.get('msgtype', 'unknown')] += 1
+def analyze_source_distribution(messages):
+    return run_reducers(messages, [TypeSourceReducer()])[0].source_distribution()
 
-    return {
-        'total_errors': len(error_msgs),
-        'error_types': dict(error_types)
-    }
+def calculate_message_rates(messages):
+    return run_reducers(messages, [TimestampReducer()])[0].message_rates()
 
-def save_plot_to_bytes(fig):
+def analyze_errors(messages):
+    return run_reducers(messages, [ErrorReducer()])[0].summary()
+
+def save_plot_to_bytes(fig, dpi=CHART_DPI):
     buf = io.BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight', dpi=300)
+    fig.savefig(buf, format='png', bbox_inches='tight', dpi=dpi)
     buf.seek(0)
     return buf
 
-def generate_pdf_report(all_analyses, output_path):
+def chart_cache_key(*inputs):
+    digest = hashlib.blake2b(repr((CHART_VERSION,) + inputs).encode(), digest_size=16)
+    return digest.hexdigest()
+
+def render_bar_chart(labels, values, title, ylabel, color, figsize=FILE_CHART_SIZE, chart_format='png',
+                     dpi=CHART_DPI, cache_dir=None):
+    # PNG Bytes, or a ReportLab Drawing When chart_format='vector'; Takes Plain Lists so PNGs Can Be
+    # Rendered in Worker Processes, and Reuses the PNG in cache_dir When the Inputs Are Unchanged
+    if chart_format == 'vector':
+        return bar_chart_drawing(labels, values, title, ylabel, color)
+
+    labels = [str(label) for label in labels]
+    values = [float(value) for value in values]
+    cache_path = None
+    if cache_dir:
+        key = chart_cache_key(labels, values, title, ylabel, color, tuple(figsize), dpi)
+        cache_path = os.path.join(cache_dir, key + '.png')
+        try:
+            with open(cache_path, 'rb') as f:
+                png = f.read()
+            # mtime Marks Last Use, for prune_chart_cache
+            os.utime(cache_path)
+            return png
+        except OSError:
+            pass
+
+    fig = plt.figure(figsize=figsize)
+    if len(labels) > MAX_CHART_LABELS:
+        # Thousands of Bar Patches Are Slow to Draw and Unreadable; a Trend Line Shows the Same Values
+        plt.plot(range(len(labels)), values, color=color, linewidth=1)
+    else:
+        plt.bar(range(len(labels)), values, color=color)
+    step = -(-len(labels) // MAX_CHART_LABELS) or 1
+    plt.xticks(range(0, len(labels), step), labels[::step], rotation=45, ha='right')
+    plt.title(title)
+    plt.ylabel(ylabel)
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    png = save_plot_to_bytes(fig, dpi).getvalue()
+    plt.close(fig)
+
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(png)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"Could not cache chart {title}: {e}")
+    return png
+
+def prune_chart_cache(cache_dir, max_bytes=CHART_CACHE_MAX_BYTES, max_age=CHART_CACHE_MAX_AGE):
+    # Removes Cached Charts Unused for max_age Seconds, Then the Least Recently Used Until the
+    # Cache Fits in max_bytes; Returns the Number of Files Removed
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return 0
+    entries = []
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort(reverse=True)
+
+    now = datetime.now().timestamp()
+    removed = 0
+    total = 0
+    for mtime, size, path in entries:
+        total += size
+        if now - mtime > max_age or total > max_bytes:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+def bar_chart_drawing(labels, values, title, ylabel, color, size=PDF_CHART_SIZE):
+    # Vector Counterpart of render_bar_chart, Drawn at Its Size on the Page
+    width, height = size[0] * inch, size[1] * inch
+    drawing = Drawing(width, height)
+    chart = VerticalBarChart()
+    chart.x, chart.y = 50, 60
+    chart.width, chart.height = width - 60, height - 85
+    chart.data = [[float(value) for value in values] or [0]]
+    chart.bars[0].fillColor = colors.toColor(color)
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.visibleGrid = True
+    chart.valueAxis.gridStrokeColor = colors.lightgrey
+    chart.valueAxis.labels.fontSize = 7
+    step = -(-len(labels) // MAX_CHART_LABELS) or 1
+    chart.categoryAxis.categoryNames = [str(label) if i % step == 0 else '' for i, label in enumerate(labels)] or ['']
+    chart.categoryAxis.labels.angle = 45
+    chart.categoryAxis.labels.boxAnchor = 'ne'
+    chart.categoryAxis.labels.fontSize = 7
+    drawing.add(chart)
+    drawing.add(String(width / 2, height - 12, title, fontSize=10, textAnchor='middle'))
+    drawing.add(String(10, height - 12, ylabel, fontSize=7))
+    return drawing
+
+def chart_flowable(chart, size=PDF_CHART_SIZE):
+    if isinstance(chart, Drawing):
+        return chart
+    return Image(io.BytesIO(chart), width=size[0]*inch, height=size[1]*inch)
+
+def render_overview_chart(all_analyses, chart_format='png', dpi=CHART_DPI, cache_dir=None):
+    file_names = list(all_analyses.keys())
+    message_counts = [analysis['message_distribution']['total_messages']
+                      for analysis in all_analyses.values()]
+    return render_bar_chart(file_names, message_counts, 'Total Messages per Log File', 'Number of Messages',
+                            'skyblue', OVERVIEW_CHART_SIZE, chart_format, dpi, cache_dir)
+
+def render_file_charts(file_name, analysis, chart_format='png', dpi=CHART_DPI, cache_dir=None):
+    # Per-File Charts as [(Heading, PNG Bytes or Drawing)]
+    charts = []
+    sorted_msgs = sorted(analysis['message_distribution']['message_types'].items(),
+                         key=lambda x: x[1]['count'],
+                         reverse=True)[:10]
+    if sorted_msgs:
+        charts.append(("Message Types", render_bar_chart(
+            [msg_type for msg_type, _ in sorted_msgs], [info['count'] for _, info in sorted_msgs],
+            f'Top 10 Message Types: {file_name}', 'Number of Messages', 'lightcoral', FILE_CHART_SIZE,
+            chart_format, dpi, cache_dir)))
+
+    type_gaps = analysis.get('timing_analysis', {}).get('type_gaps')
+    if type_gaps:
+        top_gaps = top_type_gaps(type_gaps)
+        charts.append(("Gaps by Message Type", render_bar_chart(
+            [msg_type for msg_type, _ in top_gaps], [gaps['p99_gap'] for _, gaps in top_gaps],
+            f'p99 Gap by Message Type: {file_name}', 'Seconds', 'mediumpurple', FILE_CHART_SIZE,
+            chart_format, dpi, cache_dir)))
+    return charts
+
+def generate_pdf_report(all_analyses, output_path, charts=None, fleet_charts=None, chart_format='png',
+                        dpi=CHART_DPI, cache_dir=None, file_charts=False):
+    # file_charts Adds Each File's Message Type and Gap Charts to Its Section; charts Maps File Names
+    # to Pre-Rendered render_file_charts Output, and Missing Ones Are Rendered Here
+    # fleet_charts Are generate_comparative_visualizations Output; Without Them the PDF Opens With
+    # a Message Count Chart of all_analyses
     doc = SimpleDocTemplate(
         output_path,
         pagesize=letter,
@@ -121,25 +886,13 @@ def generate_pdf_report(all_analyses, output_path):
     print("Generating visualizations for PDF...")
 
     try:
-        # 1. Message Count Comparison
-        plt.figure(figsize=(15, 6))
-        file_names = list(all_analyses.keys())
-        message_counts = [analysis['message_distribution']['total_messages']
-                         for analysis in all_analyses.values()]
-
-        plt.bar(range(len(file_names)), message_counts, color='skyblue')
-        plt.xticks(range(len(file_names)), file_names, rotation=45, ha='right')
-        plt.title('Total Messages per Log File')
-        plt.ylabel('Number of Messages')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-
-        # Save Plot to Buffer for Adding to PDF
-        buf = save_plot_to_bytes(plt.gcf())
-        elements.append(Paragraph("Message Distribution", heading_style))
-        elements.append(Image(buf, width=7*inch, height=3*inch))
-        elements.append(Spacer(1, 20))
-        plt.close()
+        # 1. Fleet Comparison
+        if fleet_charts is None:
+            fleet_charts = [("Message Distribution", render_overview_chart(all_analyses, chart_format, dpi, cache_dir))]
+        for heading, chart in fleet_charts:
+            elements.append(Paragraph(heading, heading_style))
+            elements.append(chart_flowable(chart))
+            elements.append(Spacer(1, 20))
 
         # Individual File Analysis
         elements.append(Paragraph("Individual File Analysis", heading_style))
@@ -183,12 +936,41 @@ def generate_pdf_report(all_analyses, output_path):
             elements.append(table)
             elements.append(Spacer(1, 20))
 
+            # Per-File Charts (Optional)
+            section_charts = charts.get(file_name) if charts else None
+            if section_charts is None and file_charts:
+                section_charts = render_file_charts(file_name, analysis, chart_format, dpi, cache_dir)
+            for heading, chart in section_charts or []:
+                elements.append(Paragraph(heading, heading_style))
+                elements.append(chart_flowable(chart))
+                elements.append(Spacer(1, 20))
+
             # Timing Analysis
             if 'timing_analysis' in analysis and analysis['timing_analysis']:
                 ta = analysis['timing_analysis']
                 elements.append(Paragraph("Timing Analysis:", heading_style))
                 elements.append(Paragraph(f"Duration: {ta['duration_seconds']:.2f} seconds", normal_style))
                 elements.append(Paragraph(f"Average Message Rate: {ta['message_rate']:.2f} msgs/sec", normal_style))
+                elements.append(Spacer(1, 10))
+
+                # Per-Type Gap Percentiles Table
+                if ta.get('type_gaps'):
+                    elements.append(Paragraph("Gaps by Message Type (Top 10 by p99, Seconds):", heading_style))
+                    gap_data = [['Message Type', 'p50', 'p99', 'Max']]
+                    gap_data.extend([[msg_type, f"{gaps['p50_gap']:.4f}", f"{gaps['p99_gap']:.4f}",
+                                      f"{gaps['max_gap']:.4f}"]
+                                     for msg_type, gaps in top_type_gaps(ta['type_gaps'])])
+                    gap_table = Table(gap_data, colWidths=[2.5*inch, 1*inch, 1*inch, 1*inch])
+                    gap_table.setStyle(TableStyle([
+                        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+                    ]))
+                    elements.append(gap_table)
                 elements.append(Spacer(1, 20))
 
             # Communication Stats
@@ -198,6 +980,31 @@ def generate_pdf_report(all_analyses, output_path):
                 elements.append(Paragraph(f"{source}: {count} messages", normal_style))
             elements.append(Spacer(1, 20))
 
+            # Anomaly Event Table
+            an = analysis.get('anomalies')
+            if an:
+                elements.append(Paragraph("Anomalies:", heading_style))
+                counts = ", ".join(f"{kind}: {count}" for kind, count in an['event_counts'].items())
+                elements.append(Paragraph(f"Total Events: {an['total_events']} ({counts})", normal_style))
+                if an['events']:
+                    elements.append(Spacer(1, 10))
+                    event_data = [['Time', 'Event', 'Stream', 'Detail']]
+                    event_data.extend([[format_event_time(event), event['type'], f"{event['source']} {event['stream']}",
+                                        Paragraph(describe_anomaly(event), normal_style)]
+                                       for event in an['events'][:ANOMALY_REPORT_ROWS]])
+                    event_table = Table(event_data, colWidths=[1.2*inch, 1.4*inch, 1.4*inch, 2.5*inch])
+                    event_table.setStyle(TableStyle([
+                        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                        ('FONTSIZE', (0, 1), (-1, -1), 8),
+                        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+                    ]))
+                    elements.append(event_table)
+                elements.append(Spacer(1, 20))
+
             # Add Page Breaks Between Files
             if idx < len(all_analyses) - 1:
                 elements.append(PageBreak())
@@ -216,6 +1023,22 @@ def generate_pdf_report(all_analyses, output_path):
                 f.write(generate_report(analysis))
                 f.write("\n" + "="*50 + "\n")
 
+def format_event_time(event):
+    # Sequence Gaps Before a Source's First Timestamp Have No Time
+    return "-" if event['time'] is None else f"{event['time']:.3f}"
+
+def describe_anomaly(event):
+    if event['type'] == 'rate_drop':
+        return f"No {event['stream']} for {event['gap']:.2f} s (Expected {event['expected_rate']:.1f}/s)"
+    if event['type'] == 'heartbeat_loss':
+        return f"No HEARTBEAT for {event['gap']:.2f} s"
+    if event['type'] == 'sequence_gap':
+        return f"{event['lost']} Frames Lost (Sequence {event['from_sequence']} to {event['to_sequence']})"
+    return f"Timestamp Stepped Back {-event['step']:.3f} s ({event['count']} Messages)"
+
+def top_type_gaps(type_gaps, limit=10):
+    return sorted(type_gaps.items(), key=lambda x: x[1]['p99_gap'], reverse=True)[:limit]
+
 def generate_report(analysis):
     report = []
 
@@ -243,6 +1066,11 @@ def generate_report(analysis):
         report.append("- Timestamp Gaps:")
         for key, value in ta['timestamp_gaps'].items():
             report.append(f"  - {key}: {value:.4f} seconds")
+        if ta.get('type_gaps'):
+            report.append("- Gaps by Message Type (Top 10 by p99):")
+            for msg_type, gaps in top_type_gaps(ta['type_gaps']):
+                report.append(f"  - {msg_type}: p50 {gaps['p50_gap']:.4f} s, p99 {gaps['p99_gap']:.4f} s, "
+                              f"max {gaps['max_gap']:.4f} s")
 
     # Communication Stats
     cs = analysis['communication_stats']
@@ -260,216 +1088,277 @@ def generate_report(analysis):
         for error_type, count in ea['error_types'].items():
             report.append(f"  - {error_type}: {count}")
 
-    return "\n".join(report)
+    # Anomalies
+    an = analysis.get('anomalies')
+    if an:
+        report.append("\nAnomalies:")
+        report.append(f"- Total Events: {an['total_events']}")
+        for kind, count in an['event_counts'].items():
+            report.append(f"  - {kind}: {count}")
+        if an['sequence_loss']:
+            report.append("- Frames Lost by Sequence Number:")
+            for stream, lost in an['sequence_loss'].items():
+                report.append(f"  - {stream}: {lost}")
+        if an['events']:
+            report.append(f"- First {min(len(an['events']), ANOMALY_REPORT_ROWS)} Events:")
+            for event in an['events'][:ANOMALY_REPORT_ROWS]:
+                report.append(f"  - {format_event_time(event)} {event['type']} [{event['source']} {event['stream']}]: "
+                              f"{describe_anomaly(event)}")
 
-def analyze_log_data(data):
-    messages = data['messages']
-    summary = data['summary']
-
-    analyses = {
-        'message_distribution': {},
-        'timing_analysis': {},
-        'system_status': {},
-        'communication_stats': {},
-        'error_analysis': {},
-        'raw_data': {
-            'timestamps': [],
-            'message_types': [],
-            'sources': []
-        }
-    }
-
-    # Extract Raw Data for Plotting
-    for msg in messages:
-        if 'timestamp' in msg:
-            analyses['raw_data']['timestamps'].append(msg['timestamp'])
-            analyses['raw_data']['message_types'].append(msg.get('msgtype', 'unknown'))
-            analyses['raw_data']['sources'].append(msg.get('log_source', 'unknown'))
-
-    # Message Distribution Analysis
-    msg_types = defaultdict(lambda: {'count': 0, 'sources': defaultdict(int)})
-    for msg in messages:
-        msg_type = msg.get('msgtype', 'unknown')
-        source = msg.get('log_source', 'unknown')
-        msg_types[msg_type]['count'] += 1
-        msg_types[msg_type]['sources'][source] += 1
-
-    analyses['message_distribution'] = {
-        'message_types': dict(msg_types),
-        'total_messages': len(messages),
-        'unique_message_types': len(msg_types)
-    }
-
-    # Timing Analysis
-    timestamps = analyses['raw_data']['timestamps']
-    if timestamps:
-        analyses['timing_analysis'] = {
-            'start_time': min(timestamps),
-            'end_time': max(timestamps),
-            'duration_seconds': max(timestamps) - min(timestamps),
-            'message_rate': len(timestamps) / (max(timestamps) - min(timestamps)),
-            'timestamp_gaps': analyze_timestamp_gaps(timestamps)
-        }
-
-    # System Status Analysis
-    heartbeats = [msg for msg in messages if msg.get('msgtype') == 'HEARTBEAT']
-    if heartbeats:
-        analyses['system_status'] = analyze_system_status(heartbeats)
+    return "\n".join(report)
 
-    # Communication Statistics
-    analyses['communication_stats'] = {
-        'source_distribution': analyze_source_distribution(messages),
-        'message_rates': calculate_message_rates(messages)
-    }
+def load_merged_parquet(output_path, columns=MESSAGE_COLUMNS, type_columns=TYPE_COLUMNS):
+    # Reads Only the Requested Columns, and Only the Per-Type Files the Analyses Need
+    import pyarrow.parquet as pq
 
-    # Error Analysis
-    analyses['error_analysis'] = analyze_errors(messages)
+    messages_file = pq.ParquetFile(os.path.join(output_path, MERGED_MESSAGES_FILE))
+    summary = json.loads(messages_file.metadata.metadata[SUMMARY_METADATA_KEY.encode()])
+    frame = messages_file.read(columns=columns).to_pandas()
 
-    return analyses
-
-def generate_comparative_visualizations(all_analyses):
-    # Matplotlib's Default Style
-    plt.style.use('default')
+    types = {}
+    for msg_type, fields in type_columns.items():
+        type_file = os.path.join(output_path, MERGED_TYPES_DIR, f"{msg_type}.parquet")
+        if not os.path.exists(type_file):
+            continue
+        available = pq.ParquetFile(type_file).schema_arrow.names
+        types[msg_type] = pq.read_table(type_file, columns=[f for f in fields if f in available]).to_pandas()
 
-    # Adjust Figure Parameters for Readability
-    plt.rcParams.update({
-        'figure.autolayout': True,
-        'font.size': 10,
-        'axes.labelsize': 12,
-        'axes.titlesize': 14
-    })
+    return {'columns': frame, 'types': types, 'summary': summary}
 
-    # 1. Message Count Comparison
-    plt.figure(figsize=(15, 6))
-    file_names = list(all_analyses.keys())
-    message_counts = [analysis['message_distribution']['total_messages']
-                     for analysis in all_analyses.values()]
+def load_merged_log(file_path):
+    if file_path.endswith('.parquet'):
+        return load_merged_parquet(file_path)
+    with open(file_path, 'r') as f:
+        return json.load(f)
 
-    plt.bar(range(len(file_names)), message_counts, color='skyblue')
-    plt.xticks(range(len(file_names)), file_names, rotation=45, ha='right')
-    plt.title('Total Messages per Log File')
-    plt.ylabel('Number of Messages')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.show()
-
-    # 2. Message Type Distribution
-    plt.figure(figsize=(15, 6))
-    all_message_types = set()
-    for analysis in all_analyses.values():
-        all_message_types.update(analysis['message_distribution']['message_types'].keys())
-
-    top_types = []
-    for msg_type in all_message_types:
-        total_count = sum(analysis['message_distribution']['message_types'].get(msg_type, {'count': 0})['count']
-                         for analysis in all_analyses.values())
-        top_types.append((msg_type, total_count))
-
-    top_types.sort(key=lambda x: x[1], reverse=True)
-    top_10_types = top_types[:10]
-
-    plt.bar(range(len(top_10_types)), [t[1] for t in top_10_types], color='lightcoral')
-    plt.xticks(range(len(top_10_types)), [t[0] for t in top_10_types], rotation=45, ha='right')
-    plt.title('Top 10 Message Types Across All Logs')
-    plt.ylabel('Total Message Count')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.show()
-
-    # 3. Source Distribution
-    plt.figure(figsize=(15, 6))
-    x = range(len(file_names))
-
-    for file_name, analysis in all_analyses.items():
-        sources = analysis['communication_stats']['source_distribution']
-        tlog_count = sources.get('tlog', 0)
-        rlog_count = sources.get('rlog', 0)
-
-        plt.bar(file_names.index(file_name), tlog_count, label='TLOG' if file_name == file_names[0] else "",
-                color='lightblue', alpha=0.8)
-        plt.bar(file_names.index(file_name), rlog_count, bottom=tlog_count,
-                label='RLOG' if file_name == file_names[0] else "", color='lightgreen', alpha=0.8)
-
-    plt.xticks(x, file_names, rotation=45, ha='right')
-    plt.title('Message Source Distribution')
-    plt.ylabel('Number of Messages')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.show()
+def iter_merged_json_messages(file_path):
+    # Streams the Message List With ijson When Installed, Otherwise Loads the Whole File
+    try:
+        import ijson
+    except ImportError:
+        yield from load_merged_log(file_path)['messages']
+        return
+    with open(file_path, 'rb') as f:
+        yield from ijson.items(f, 'messages.item', use_float=True)
 
-    # 4. Duration Comparison
-    plt.figure(figsize=(15, 6))
-    durations = [analysis['timing_analysis'].get('duration_seconds', 0)
-                for analysis in all_analyses.values()]
+def merged_log_fingerprint(file_path):
+    # Parquet Outputs Are Fingerprinted by messages.parquet, Whose Footer Holds the Summary
+    if os.path.isdir(file_path):
+        file_path = os.path.join(file_path, MERGED_MESSAGES_FILE)
+    return f"{ANALYSIS_VERSION}:{fast_file_hash(file_path)}"
 
-    plt.bar(range(len(file_names)), durations, color='mediumseagreen')
-    plt.xticks(range(len(file_names)), file_names, rotation=45, ha='right')
-    plt.title('Log Duration Comparison')
-    plt.ylabel('Duration (seconds)')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.show()
+def analysis_cache_path(file_path):
+    directory, file_name = os.path.split(os.path.normpath(file_path))
+    return os.path.join(directory, ANALYSIS_CACHE_DIR, file_name + '.pkl')
 
-    # 5. Message Rates
-    plt.figure(figsize=(15, 6))
-    rates = [analysis['timing_analysis'].get('message_rate', 0)
-             for analysis in all_analyses.values()]
+def load_cached_analysis(file_path, fingerprint):
+    try:
+        with open(analysis_cache_path(file_path), 'rb') as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if cached.get('fingerprint') != fingerprint:
+        return None
+    return cached['analysis']
+
+def save_cached_analysis(file_path, fingerprint, analysis):
+    cache_path = analysis_cache_path(file_path)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        pickle.dump({'fingerprint': fingerprint, 'analysis': analysis}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, cache_path)
+
+def analyze_merged_log(file_path, use_cache=True):
+    # Returns (analysis, from_cache, fingerprint); Unchanged Merged Files Are Not Reloaded
+    fingerprint = merged_log_fingerprint(file_path)
+    if use_cache:
+        analysis = load_cached_analysis(file_path, fingerprint)
+        if analysis is not None:
+            return analysis, True, fingerprint
+
+    if file_path.endswith('.parquet'):
+        analysis = analyze_log_data(load_merged_parquet(file_path))
+    else:
+        analysis = analyze_messages(iter_merged_json_messages(file_path))
+        if 'anomalies' in analysis:
+            merge_sequence_gaps(analysis['anomalies'], read_merged_summary(file_path).get('sequence_gaps'))
+    if use_cache:
+        try:
+            save_cached_analysis(file_path, fingerprint, analysis)
+        except OSError as e:
+            print(f"Could not cache analysis for {os.path.basename(file_path)}: {e}")
+    return analysis, False, fingerprint
+
+def category_codes(series):
+    # Integer Codes and Names for a Column; Parquet Dictionary Columns Arrive as Categoricals
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), [str(name) for name in series.cat.categories]
+    codes, names = pd.factorize(series.fillna('unknown'))
+    return codes, [str(name) for name in names]
+
+def analyze_log_columns(data, reducers=None):
+    # Columnar Counterpart of analyze_messages: the Same Reducers, Fed Typed Arrays
+    reducers = default_reducers() if reducers is None else reducers
+    batch = MessageColumns(data['columns'], data.get('types'))
+    for reducer in reducers:
+        reducer.add_columns(batch)
+    return collect_analyses(reducers)
 
-    plt.bar(range(len(file_names)), rates, color='mediumpurple')
-    plt.xticks(range(len(file_names)), file_names, rotation=45, ha='right')
-    plt.title('Message Rate Comparison')
-    plt.ylabel('Messages per Second')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.show()
+def analyze_log_data(data):
+    analysis = analyze_log_columns(data) if 'columns' in data else analyze_messages(data['messages'])
+    if 'anomalies' in analysis:
+        merge_sequence_gaps(analysis['anomalies'], data.get('summary', {}).get('sequence_gaps'))
+    return analysis
+
+def generate_comparative_visualizations(conn, output_dir=None, chart_format='png', dpi=CHART_DPI, cache_dir=None):
+    # Fleet Comparison Charts From Aggregate Queries Over Every Flight in the Store; Returns
+    # [(Heading, PNG Bytes or Drawing)] and Saves the PNGs to output_dir When Given
+    flight_charts = [
+        ('total_messages', 'Total Messages per Flight', 'Number of Messages', 'skyblue'),
+        ('rlog_share', 'RLOG Share of Messages per Flight', 'Fraction of Messages', 'lightgreen'),
+        ('duration_seconds', 'Flight Duration Comparison', 'Duration (seconds)', 'mediumseagreen'),
+        ('message_rate', 'Message Rate Comparison', 'Messages per Second', 'mediumpurple'),
+        ('p99_gap', 'p99 Timestamp Gap per Flight', 'Seconds', 'orange'),
+        ('anomaly_events', 'Anomaly Events per Flight', 'Events', 'indianred'),
+    ]
+
+    # Per-Flight Metrics, in Flight Order
+    charts = []
+    for metric, title, ylabel, color in flight_charts:
+        values = fleet_metric(conn, metric)
+        charts.append((title, render_bar_chart(
+            values['file_name'].tolist(), values['value'].fillna(0).tolist(), title, ylabel, color,
+            OVERVIEW_CHART_SIZE, chart_format, dpi, cache_dir)))
+
+    # Message Type Totals Across the Fleet
+    top_types = fleet_top_types(conn)
+    charts.insert(1, ('Top 10 Message Types Across All Flights', render_bar_chart(
+        top_types['msgtype'].tolist(), top_types['count'].tolist(), 'Top 10 Message Types Across All Flights',
+        'Total Message Count', 'lightcoral', OVERVIEW_CHART_SIZE, chart_format, dpi, cache_dir)))
+
+    if output_dir and chart_format == 'png':
+        os.makedirs(output_dir, exist_ok=True)
+        for title, png in charts:
+            file_name = ''.join(c if c.isalnum() else '_' for c in title.lower()).strip('_') + '.png'
+            with open(os.path.join(output_dir, file_name), 'wb') as f:
+                f.write(png)
+    return charts
+
+def analyze_log_task(file_path, use_cache=True, chart_format='png', dpi=CHART_DPI, cache_dir=None,
+                     file_charts=False):
+    # Worker Entry Point: Analysis, Text Report and (With file_charts) Rendered Charts for One Merged File
+    # Vector Drawings Don't Pickle, so the Parent Draws Those When Building the PDF
+    analysis, from_cache, fingerprint = analyze_merged_log(file_path, use_cache)
+    charts = None
+    if file_charts and chart_format == 'png':
+        charts = render_file_charts(os.path.basename(file_path), analysis, chart_format, dpi, cache_dir)
+    return analysis, from_cache, generate_report(analysis), charts, fingerprint
+
+def run_analyses(merged_files, use_cache, workers, task_options, record_result):
+    # Analyzes Each File Serially or in a Process Pool, Reporting Every Outcome Through record_result
+    if workers == 1 or len(merged_files) < 2:
+        for file_path in merged_files:
+            try:
+                record_result(file_path, analyze_log_task(file_path, use_cache, *task_options))
+            except Exception as e:
+                record_result(file_path, e)
+        return
 
-def analyze_all_logs(directory_path):
-    # Retrieve Merged JSON Files
-    merged_files = glob.glob(os.path.join(directory_path, '*_merged.json'))
+    print(f"Analyzing {len(merged_files)} Files With {workers} Worker Processes")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(analyze_log_task, file_path, use_cache, *task_options): file_path
+                   for file_path in merged_files}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = pending.pop(future)
+                try:
+                    record_result(file_path, future.result())
+                except Exception as e:
+                    record_result(file_path, e)
+
+def analyze_all_logs(directory_path, use_cache=True, workers=None, chart_format='png', dpi=CHART_DPI,
+                     fleet_db=None, file_charts=False):
+    # workers=None Uses All Cores, workers=1 Analyzes Serially In-Process
+    # chart_format='vector' Draws PDF Charts as ReportLab Graphics; PNGs Render at dpi
+    # file_charts Adds Per-File Message Type and Gap Charts to the PDF (Off by Default: Two Renders per File)
+    # Each Flight is Added to the Fleet Store (fleet_db, Default <directory>/fleet.sqlite), and the
+    # Comparison Charts Cover Every Flight Stored There; Flights Whose Merged Files Are Gone Are Dropped
+    if chart_format not in CHART_FORMATS:
+        raise ValueError(f"Unknown Chart Format: {chart_format}")
+    # Retrieve Merged Parquet Directories and Legacy JSON Files
+    merged_files = sorted(glob.glob(os.path.join(directory_path, '*_merged.parquet')) +
+                          glob.glob(os.path.join(directory_path, '*_merged.json')))
 
     if not merged_files:
         print(f"No merged log files found in {directory_path}")
         return
 
     print(f"Found {len(merged_files)} merged log files")
-
-    # Store Analyses
-    all_analyses = {}
-
-    # Process File
-    for file_path in merged_files:
-        file_name = os.path.basename(file_path)
-        print(f"\nAnalyzing: {file_name}")
-
-        try:
-            # Analyze Data
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-
-            analysis = analyze_log_data(data)
-            all_analyses[file_name] = analysis
-
-            # Generate Individual Reports for Each JSON
-            report = generate_report(analysis)
+    workers = min(workers or os.cpu_count() or 1, len(merged_files))
+    cache_dir = os.path.join(directory_path, CHART_CACHE_DIR) if use_cache else None
+    chart_options = (chart_format, dpi, cache_dir)
+    conn = fleet_connect(fleet_db or os.path.join(directory_path, FLEET_DB_FILE))
+    try:
+        # Drop Flights Whose Merged Files Were Deleted Since They Were Stored
+        current = {os.path.basename(file_path) for file_path in merged_files}
+        for file_name in fleet_flights(conn)['file_name']:
+            if file_name not in current:
+                remove_flight(conn, file_name)
+
+        # Store Analyses
+        results = {}
+        cached_count = 0
+
+        def record_result(file_path, result):
+            nonlocal cached_count
+            file_name = os.path.basename(file_path)
+            print(f"\nAnalyzing: {file_name}")
+            if isinstance(result, Exception):
+                print(f"Error analyzing {file_name}: {result}")
+                return
+
+            # Reuse the Cached Analysis When the Merged File is Unchanged
+            analysis, from_cache, report, charts, fingerprint = result
+            cached_count += from_cache
+            results[file_name] = (analysis, charts)
+            record_flight(conn, file_name, analysis, fingerprint)
+
+            # Generate Individual Reports for Each Merged File
             print(report)
 
-        except Exception as e:
-            print(f"Error analyzing {file_name}: {e}")
-            continue
-
-    if all_analyses:
-        # Comparative Visualizations
-        print("\nGenerating comparative visualizations...")
-        generate_comparative_visualizations(all_analyses)
-
-        # Generate PDF
-        print("\nGenerating PDF report...")
-        output_pdf = os.path.join(directory_path, 'mavlink_analysis_report.pdf')
-        generate_pdf_report(all_analyses, output_pdf)
-
+        run_analyses(merged_files, use_cache, workers, chart_options + (file_charts,), record_result)
+
+        if cached_count:
+            print(f"\nReused {cached_count} cached analyses")
+
+        # Keep File Order Stable Regardless of Completion Order
+        all_analyses = {}
+        charts = {}
+        for file_path in merged_files:
+            file_name = os.path.basename(file_path)
+            if file_name in results:
+                all_analyses[file_name], charts[file_name] = results[file_name]
+
+        if all_analyses:
+            # Comparative Visualizations
+            print("\nGenerating comparative visualizations...")
+            fleet_charts = generate_comparative_visualizations(
+                conn, os.path.join(directory_path, FLEET_CHARTS_DIR), *chart_options)
+
+            # Generate PDF From the Charts the Workers Rendered
+            print("\nGenerating PDF report...")
+            output_pdf = os.path.join(directory_path, 'mavlink_analysis_report.pdf')
+            generate_pdf_report(all_analyses, output_pdf, charts, fleet_charts, *chart_options, file_charts)
+
+        if cache_dir:
+            prune_chart_cache(cache_dir)
+    finally:
+        conn.close()
     return all_analyses
 
-# Run Analysis
-directory_path = '/content/sample_data/merged_logs'
-all_analyses = analyze_all_logs(directory_path)
+if __name__ == '__main__':
+    # Run Analysis
+    directory_path = '/content/sample_data/merged_logs'
+    all_analyses = analyze_all_logs(directory_path)
@@ -3,16 +3,114 @@ Risk Parity Portfolio Builder
 A Streamlit App for constructing and analyzing risk parity portfolios.
 """
 
-import streamlit as st
-import pandas as pd
-import numpy as np
+from __future__ import annotations
+
+import hashlib
+import importlib
+import os
+import pickle
+import sys
+import threading
+import time
 import warnings
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+import streamlit as st
 
 warnings.filterwarnings("ignore")
 
+_RUN_START = time.perf_counter()
+
+# Seconds before cached prices (and results derived from them) go stale
+PRICE_TTL = 3600
+
+# ============== LAZY IMPORTS ==============
+
+# Heavy modules in the order they are first needed; imported in the background on app start
+PREWARM_MODULES = [
+    "numpy",
+    "pandas",
+    "plotly.graph_objects",
+    "plotly.express",
+    "plotly.subplots",
+    "yfinance",
+    "scipy.cluster.hierarchy",
+    "riskfolio",
+]
+
+
+@st.cache_resource(show_spinner=False)
+def get_import_profile() -> dict:
+    """Module name -> import timing, shared by every session and rerun in the process."""
+    return {}
+
+
+_IMPORT_PROFILE = get_import_profile()
+
+
+def import_timed(name: str):
+    """Import a module, recording how long the first import took and on which thread."""
+    # import_module (not a sys.modules lookup) so a module still being
+    # imported by the pre-warm thread is waited on rather than returned half-initialized
+    already_loaded = name in sys.modules
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    if already_loaded:
+        return module
+
+    _IMPORT_PROFILE.setdefault(name, {
+        "Module": name,
+        "Seconds": time.perf_counter() - start,
+        "Thread": threading.current_thread().name,
+    })
+    return module
+
+
+class LazyModule:
+    """Module proxy that defers the real import until the first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = import_timed(self._name)
+        return getattr(self._module, attr)
+
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+px = LazyModule("plotly.express")
+go = LazyModule("plotly.graph_objects")
+_plotly_subplots = LazyModule("plotly.subplots")
+
+
+def make_subplots(*args, **kwargs):
+    """Deferred plotly.subplots.make_subplots."""
+    return _plotly_subplots.make_subplots(*args, **kwargs)
+
+
+def _prewarm_imports(modules: list):
+    for name in modules:
+        try:
+            import_timed(name)
+        except Exception as e:
+            _IMPORT_PROFILE[name] = {"Module": name, "Seconds": float("nan"), "Thread": f"failed: {e}"}
+
+
+@st.cache_resource(show_spinner=False)
+def start_import_prewarm() -> threading.Thread:
+    """Start importing the heavy modules once per process while the first page renders."""
+    thread = threading.Thread(
+        target=_prewarm_imports,
+        args=(PREWARM_MODULES,),
+        name="import-prewarm",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
 # Page config
 st.set_page_config(
     page_title="Risk Parity Portfolio Builder",
@@ -21,6 +119,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Kick off background imports before anything heavy is needed
+start_import_prewarm()
+
 # Custom CSS for cleaner styling
 st.markdown("""
 <style>
@@ -74,10 +175,10 @@ def generate_sample_data(tickers: list, days: int = 504) -> pd.DataFrame:
     return pd.DataFrame(prices, index=dates)
 
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=PRICE_TTL)
 def fetch_data(tickers: list, period: str = "2y") -> pd.DataFrame:
     """Fetch historical price data from Yahoo Finance with fallback."""
-    import yfinance as yf
+    yf = import_timed("yfinance")
     
     period_days = {"1y": 252, "2y": 504, "3y": 756, "5y": 1260}
     
@@ -127,7 +228,7 @@ def build_risk_parity_portfolio(returns: pd.DataFrame, min_return: float = None)
         risk_contrib: DataFrame of risk contributions
         port: Portfolio object for further analysis
     """
-    import riskfolio as rp
+    rp = import_timed("riskfolio")
     
     # Create portfolio object
     port = rp.Portfolio(returns=returns)
@@ -163,11 +264,142 @@ def build_risk_parity_portfolio(returns: pd.DataFrame, min_return: float = None)
     return weights, risk_contrib, port
 
 
-def plot_weights_comparison(weights_rp, weights_constrained, title_suffix=""):
+ALLOCATION_METHODS = {
+    "Risk Parity (Classic)": "classic",
+    "Hierarchical Risk Parity (HRP)": "hrp",
+    "Hierarchical Equal Risk Contribution (HERC)": "herc",
+}
+
+
+def calculate_risk_contributions(weights: np.ndarray, cov: np.ndarray, index) -> pd.DataFrame:
+    """Calculate volatility risk contributions RC_i = w_i * (Σw)_i / σ_p."""
+    w = np.asarray(weights).flatten()
+    marginal = cov @ w
+    risk_contrib = pd.DataFrame(
+        w * marginal / np.sqrt(w @ marginal),
+        index=index,
+        columns=["Risk Contribution"]
+    )
+    risk_contrib["Risk Contribution %"] = risk_contrib["Risk Contribution"] / risk_contrib["Risk Contribution"].sum() * 100
+    return risk_contrib
+
+
+def correlation_linkage(returns: pd.DataFrame) -> np.ndarray:
+    """Single-linkage clustering on the correlation distance sqrt((1 - ρ) / 2)."""
+    from scipy.cluster.hierarchy import linkage
+    from scipy.spatial.distance import squareform
+
+    corr = np.corrcoef(returns.values, rowvar=False)
+    dist = np.sqrt(np.clip(0.5 * (1 - corr), 0, None))
+    np.fill_diagonal(dist, 0)
+
+    return linkage(squareform(dist, checks=False), method="single")
+
+
+def build_hierarchical_portfolio(returns: pd.DataFrame, method: str = "hrp"):
+    """
+    Build a hierarchical risk parity (HRP) or hierarchical equal risk
+    contribution (HERC) portfolio without a convex solver.
+
+    Assets are quasi-diagonalized by the leaf order of a correlation-distance
+    dendrogram, so every cluster is a contiguous block of the reordered
+    covariance matrix. Cluster variances then come from a 2-D prefix sum in
+    O(1) each, and the whole allocation costs O(N²) after the linkage.
+
+    HRP recursively bisects the ordered assets, splitting weight inversely to
+    the variance of each half's inverse-variance portfolio. HERC follows the
+    dendrogram splits instead, sizing each child cluster so both contribute
+    equal volatility using inverse-volatility portfolios within clusters.
+
+    Returns:
+        weights: DataFrame of portfolio weights
+        risk_contrib: DataFrame of risk contributions
+        link: Linkage matrix of the asset dendrogram
+    """
+    from scipy.cluster.hierarchy import leaves_list
+
+    cov = returns.cov().values
+    n = cov.shape[0]
+
+    link = correlation_linkage(returns)
+    order = leaves_list(link)
+
+    # Within-cluster scaling: inverse variance for HRP, inverse volatility for HERC
+    diag = np.diag(cov)[order]
+    scale = 1 / diag if method == "hrp" else 1 / np.sqrt(diag)
+
+    # Prefix sums of the scaled, reordered covariance for O(1) cluster variances
+    scaled_cov = cov[np.ix_(order, order)] * np.outer(scale, scale)
+    block = np.zeros((n + 1, n + 1))
+    block[1:, 1:] = scaled_cov.cumsum(axis=0).cumsum(axis=1)
+    scale_sum = np.concatenate([[0.0], np.cumsum(scale)])
+
+    def cluster_variance(start, end):
+        total = block[end, end] - block[start, end] - block[end, start] + block[start, start]
+        return total / (scale_sum[end] - scale_sum[start]) ** 2
+
+    ordered_weights = np.zeros(n)
+
+    if method == "hrp":
+        # Recursive bisection, one vectorized pass per level of the tree
+        starts, ends, cluster_w = np.array([0]), np.array([n]), np.array([1.0])
+        while len(starts):
+            leaf = ends - starts == 1
+            ordered_weights[starts[leaf]] = cluster_w[leaf]
+            starts, ends, cluster_w = starts[~leaf], ends[~leaf], cluster_w[~leaf]
+
+            mids = (starts + ends) // 2
+            var_left = cluster_variance(starts, mids)
+            var_right = cluster_variance(mids, ends)
+            alpha = 1 - var_left / (var_left + var_right)
+
+            starts = np.concatenate([starts, mids])
+            ends = np.concatenate([mids, ends])
+            cluster_w = np.concatenate([cluster_w * alpha, cluster_w * (1 - alpha)])
+
+    elif method == "herc":
+        # Contiguous leaf-order span of every dendrogram node
+        position = np.empty(n, dtype=int)
+        position[order] = np.arange(n)
+        node_start = np.concatenate([position, np.zeros(n - 1, dtype=int)])
+        node_end = np.concatenate([position + 1, np.zeros(n - 1, dtype=int)])
+        children = link[:, :2].astype(int)
+        for k, (a, b) in enumerate(children):
+            node_start[n + k] = min(node_start[a], node_start[b])
+            node_end[n + k] = max(node_end[a], node_end[b])
+
+        node_vol = np.sqrt(cluster_variance(node_start, node_end))
+        node_w = np.zeros(2 * n - 1)
+        node_w[-1] = 1.0
+
+        # Top-down: split each cluster's weight for equal risk between its children
+        for k in range(n - 2, -1, -1):
+            a, b = children[k]
+            alpha = node_vol[b] / (node_vol[a] + node_vol[b])
+            node_w[a] = node_w[n + k] * alpha
+            node_w[b] = node_w[n + k] * (1 - alpha)
+
+        ordered_weights[position] = node_w[:n]
+
+    else:
+        raise ValueError(f"Unknown hierarchical method: {method}")
+
+    # Undo the quasi-diagonal ordering
+    w = np.empty(n)
+    w[order] = ordered_weights
+
+    weights = pd.DataFrame(w, index=returns.columns, columns=["weights"])
+    risk_contrib = calculate_risk_contributions(w, cov, returns.columns)
+
+    return weights, risk_contrib, link
+
+
+def plot_weights_comparison(weights_rp, weights_constrained, title_suffix="",
+                            names=("Pure Risk Parity", "Return-Constrained")):
     """Create side-by-side weight comparison charts."""
     fig = make_subplots(
         rows=1, cols=2,
-        subplot_titles=("Pure Risk Parity Weights", "Return-Constrained Weights"),
+        subplot_titles=(f"{names[0]} Weights", f"{names[1]} Weights"),
         specs=[[{"type": "pie"}, {"type": "pie"}]]
     )
     
@@ -204,21 +436,22 @@ def plot_weights_comparison(weights_rp, weights_constrained, title_suffix=""):
     return fig
 
 
-def plot_risk_contributions(risk_rp, risk_constrained):
+def plot_risk_contributions(risk_rp, risk_constrained,
+                            names=("Pure Risk Parity", "Return-Constrained")):
     """Create bar chart comparing risk contributions."""
     fig = go.Figure()
     
     tickers = risk_rp.index.tolist()
     
     fig.add_trace(go.Bar(
-        name="Pure Risk Parity",
+        name=names[0],
         x=tickers,
         y=risk_rp["Risk Contribution %"].values,
         marker_color="#3b82f6"
     ))
     
     fig.add_trace(go.Bar(
-        name="Return-Constrained",
+        name=names[1],
         x=tickers,
         y=risk_constrained["Risk Contribution %"].values,
         marker_color="#f97316"
@@ -321,6 +554,359 @@ def calculate_portfolio_metrics(returns: pd.DataFrame, weights: pd.DataFrame) ->
     }
 
 
+SCENARIO_METHODS = {
+    "Multivariate Normal": "normal",
+    "Student-t (fat tails)": "student_t",
+    "Block Bootstrap": "bootstrap",
+}
+
+
+def simulate_return_paths(
+    returns: pd.DataFrame,
+    n_paths: int = 10000,
+    horizon: int = 252,
+    method: str = "normal",
+    chunk_size: int = 1000,
+    dof: float = 5.0,
+    block_size: int = 20,
+    seed: int = None
+):
+    """
+    Yield chunks of simulated correlated daily return paths.
+
+    Each chunk is an array of shape (paths, horizon, assets). Paths are drawn
+    from a multivariate normal or Student-t fitted to the historical mean and
+    covariance, or by resampling contiguous blocks of historical returns.
+    """
+    rng = np.random.default_rng(seed)
+    hist = returns.values
+    n_obs, n_assets = hist.shape
+
+    mu = hist.mean(axis=0)
+    cov = np.cov(hist, rowvar=False).reshape(n_assets, n_assets)
+
+    # Cholesky factor, with an eigenvalue fallback for near-singular covariances
+    try:
+        chol = np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        eigval, eigvec = np.linalg.eigh(cov)
+        chol = eigvec * np.sqrt(np.clip(eigval, 0, None))
+
+    block_size = max(1, min(block_size, n_obs))
+    n_blocks = -(-horizon // block_size)
+    block_offsets = np.arange(block_size)
+
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+
+        if method == "normal":
+            z = rng.standard_normal((size, horizon, n_assets))
+            yield mu + z @ chol.T
+
+        elif method == "student_t":
+            # Shared chi-square mixing per day gives a multivariate t, rescaled to the sample covariance
+            z = rng.standard_normal((size, horizon, n_assets))
+            mix = np.sqrt(rng.chisquare(dof, (size, horizon, 1)) / dof)
+            scale = np.sqrt((dof - 2) / dof) if dof > 2 else 1.0
+            yield mu + (z @ chol.T) / mix * scale
+
+        elif method == "bootstrap":
+            starts = rng.integers(0, n_obs - block_size + 1, (size, n_blocks))
+            idx = (starts[:, :, None] + block_offsets).reshape(size, -1)[:, :horizon]
+            yield hist[idx]
+
+        else:
+            raise ValueError(f"Unknown scenario method: {method}")
+
+
+def run_stress_test(
+    returns: pd.DataFrame,
+    portfolios: dict,
+    n_paths: int = 10000,
+    horizon: int = 252,
+    method: str = "normal",
+    chunk_size: int = 1000,
+    seed: int = None
+) -> dict:
+    """
+    Evaluate portfolios over simulated return paths.
+
+    Paths are streamed chunk by chunk, so only the per-path terminal return and
+    maximum drawdown of each portfolio are kept in memory.
+
+    Returns:
+        dict mapping portfolio name to arrays of terminal returns and max drawdowns
+    """
+    names = list(portfolios.keys())
+    W = np.column_stack([portfolios[name].values.flatten() for name in names])
+
+    terminal = np.empty((n_paths, len(names)))
+    max_dd = np.empty((n_paths, len(names)))
+
+    row = 0
+    for chunk in simulate_return_paths(returns, n_paths, horizon, method, chunk_size, seed=seed):
+        size = chunk.shape[0]
+
+        # (paths, horizon, portfolios) cumulative wealth
+        wealth = np.cumprod(1 + chunk @ W, axis=1)
+        peaks = np.maximum.accumulate(wealth, axis=1)
+
+        terminal[row:row + size] = wealth[:, -1, :] - 1
+        max_dd[row:row + size] = (wealth / peaks - 1).min(axis=1)
+        row += size
+
+    return {
+        name: {"terminal_returns": terminal[:, i], "max_drawdowns": max_dd[:, i]}
+        for i, name in enumerate(names)
+    }
+
+
+def summarize_stress_test(stress: dict, confidence: float = 0.95) -> pd.DataFrame:
+    """Summarize tail statistics (VaR, CVaR, drawdown quantiles) for each portfolio."""
+    tail = 1 - confidence
+    rows = {}
+
+    for name, sims in stress.items():
+        terminal = sims["terminal_returns"]
+        drawdowns = sims["max_drawdowns"]
+
+        var = -np.quantile(terminal, tail)
+        cvar = -terminal[terminal <= -var].mean()
+
+        rows[name] = {
+            f"VaR ({confidence:.0%})": var,
+            f"CVaR ({confidence:.0%})": cvar,
+            "Median Max Drawdown": np.median(drawdowns),
+            f"Max Drawdown ({confidence:.0%} tail)": np.quantile(drawdowns, tail),
+            "Worst Max Drawdown": drawdowns.min(),
+            "Probability of Loss": (terminal < 0).mean(),
+        }
+
+    return pd.DataFrame(rows).T
+
+
+def plot_stress_distributions(stress: dict):
+    """Create histograms of simulated terminal returns and max drawdowns."""
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=("Simulated Horizon Return", "Simulated Max Drawdown")
+    )
+
+    colors = ["#3b82f6", "#f97316"]
+
+    for i, (name, sims) in enumerate(stress.items()):
+        color = colors[i % len(colors)]
+        fig.add_trace(
+            go.Histogram(
+                x=sims["terminal_returns"] * 100,
+                name=name,
+                marker_color=color,
+                opacity=0.6,
+                nbinsx=80,
+                legendgroup=name
+            ),
+            row=1, col=1
+        )
+        fig.add_trace(
+            go.Histogram(
+                x=sims["max_drawdowns"] * 100,
+                name=name,
+                marker_color=color,
+                opacity=0.6,
+                nbinsx=80,
+                legendgroup=name,
+                showlegend=False
+            ),
+            row=1, col=2
+        )
+
+    fig.update_layout(
+        barmode="overlay",
+        height=400,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.08,
+            xanchor="right",
+            x=1
+        )
+    )
+    fig.update_xaxes(title_text="Return (%)", row=1, col=1)
+    fig.update_xaxes(title_text="Drawdown (%)", row=1, col=2)
+
+    return fig
+
+
+# ============== SHARED RESULT STORE ==============
+
+RESULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".risk_parity_cache")
+RESULT_SWEEP_INTERVAL = 300  # seconds between expired-entry sweeps on put
+
+
+class ResultStore:
+    """
+    Process-wide cache of optimization results, shared by every session.
+
+    Entries live in memory and are mirrored to pickle files so they survive
+    app restarts. An entry expires after `ttl` seconds, matching the price
+    cache, and keys include a hash of the prices themselves, so refreshed
+    market data never serves results solved on stale prices.
+
+    Because keys change whenever prices do, expired entries are rarely read
+    again; they are swept on startup and periodically on put instead.
+    """
+
+    def __init__(self, directory: str, ttl: float = PRICE_TTL,
+                 sweep_interval: float = RESULT_SWEEP_INTERVAL):
+        self.directory = directory
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._last_sweep = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self.sweep()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key: str):
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._memory.get(key)
+
+        if entry is None:
+            try:
+                with open(self._path(key), "rb") as f:
+                    entry = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                return None
+
+        if time.time() - entry["created"] > self.ttl:
+            self.invalidate(key)
+            return None
+
+        with self._lock:
+            self._memory[key] = entry
+        return entry["value"]
+
+    def put(self, key: str, value):
+        """Store value in memory and atomically on disk."""
+        entry = {"created": time.time(), "value": value}
+        with self._lock:
+            self._memory[key] = entry
+            sweep_due = entry["created"] - self._last_sweep > self.sweep_interval
+        if sweep_due:
+            self.sweep()
+
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            # Disk is a best-effort second tier; the in-memory entry still serves
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def invalidate(self, key: str):
+        """Drop key from memory and disk."""
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def sweep(self):
+        """Drop every expired entry from memory and disk."""
+        now = time.time()
+        with self._lock:
+            self._last_sweep = now
+            expired = [key for key, entry in self._memory.items() if now - entry["created"] > self.ttl]
+            for key in expired:
+                del self._memory[key]
+
+        # Files are written once by put, so their mtime is the entry's creation time
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith((".pkl", ".tmp")) and now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def get_or_compute(self, key: str, compute):
+        """
+        Return (value, cache_hit). Concurrent sessions asking for the same key
+        wait for a single computation instead of solving it in parallel.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, True
+
+        lock = self._key_lock(key)
+        try:
+            with lock:
+                value = self.get(key)
+                if value is not None:
+                    return value, True
+                value = compute()
+                self.put(key, value)
+                return value, False
+        finally:
+            # Waiters already hold this lock object; later callers hit the stored value
+            with self._lock:
+                if self._key_locks.get(key) is lock:
+                    del self._key_locks[key]
+
+
+@st.cache_resource(show_spinner=False)
+def get_result_store() -> ResultStore:
+    """The single ResultStore for this process."""
+    return ResultStore(RESULT_STORE_DIR)
+
+
+def result_key(prices: pd.DataFrame, allocation_method: str, min_return: float = None) -> str:
+    """Cache key for a portfolio configuration on a specific price snapshot."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(prices, index=True).values.tobytes())
+    digest.update(repr((list(prices.columns), allocation_method, min_return)).encode())
+    return digest.hexdigest()
+
+
+def build_portfolios(returns: pd.DataFrame, allocation_method: str, min_return: float = None) -> dict:
+    """Solve the pure and (optionally) return-constrained portfolios."""
+    # Pure risk parity (classic or hierarchical)
+    if allocation_method == "classic":
+        weights_rp, risk_rp, port_rp = build_risk_parity_portfolio(returns, min_return=None)
+    else:
+        weights_rp, risk_rp, link_rp = build_hierarchical_portfolio(returns, method=allocation_method)
+
+    # Constrained portfolio (if enabled)
+    if min_return:
+        weights_con, risk_con, port_con = build_risk_parity_portfolio(returns, min_return=min_return)
+    else:
+        weights_con, risk_con = weights_rp.copy(), risk_rp.copy()
+
+    return {
+        "returns": returns,
+        "weights_rp": weights_rp,
+        "risk_rp": risk_rp,
+        "weights_con": weights_con,
+        "risk_con": risk_con,
+    }
+
+
 # ============== MAIN APP ==============
 
 # Header
@@ -349,6 +935,17 @@ with st.sidebar:
         index=1,
         help="Historical data period for estimating covariance"
     )
+
+    # Allocation method
+    st.subheader("Allocation Method")
+    method_label = st.selectbox(
+        "Pure portfolio construction",
+        options=list(ALLOCATION_METHODS.keys()),
+        index=0,
+        help="Classic convex risk parity, or solver-free hierarchical clustering allocations"
+    )
+    allocation_method = ALLOCATION_METHODS[method_label]
+    pure_label = "Pure Risk Parity" if allocation_method == "classic" else method_label.split("(")[-1].rstrip(")")
     
     # Return constraint
     st.subheader("Return Constraint")
@@ -370,7 +967,37 @@ with st.sidebar:
         min_return = min_return_pct / 100
     else:
         min_return = None
-    
+
+    # Monte Carlo stress test
+    st.subheader("Stress Testing")
+    run_stress = st.checkbox(
+        "Run Monte Carlo stress test",
+        value=False,
+        help="Simulate correlated return paths and report drawdown and VaR distributions"
+    )
+
+    if run_stress:
+        scenario_label = st.selectbox(
+            "Scenario model",
+            options=list(SCENARIO_METHODS.keys()),
+            index=0,
+            help="Distribution used to generate the simulated return paths"
+        )
+        n_paths = st.slider(
+            "Number of paths",
+            min_value=1000,
+            max_value=50000,
+            value=10000,
+            step=1000
+        )
+        horizon = st.slider(
+            "Horizon (trading days)",
+            min_value=21,
+            max_value=504,
+            value=252,
+            step=21
+        )
+
     st.divider()
     
     # Run button
@@ -398,23 +1025,19 @@ if run_analysis or "results" in st.session_state:
     
     with st.spinner("Building risk parity portfolio..."):
         try:
-            # Pure risk parity
-            weights_rp, risk_rp, port_rp = build_risk_parity_portfolio(returns, min_return=None)
-            
-            # Constrained portfolio (if enabled)
-            if use_constraint and min_return:
-                weights_con, risk_con, port_con = build_risk_parity_portfolio(returns, min_return=min_return)
-            else:
-                weights_con, risk_con = weights_rp.copy(), risk_rp.copy()
+            # Identical configurations on the same prices are solved once per process
+            constraint = min_return if use_constraint and min_return else None
+            portfolios, cache_hit = get_result_store().get_or_compute(
+                result_key(prices, allocation_method, constraint),
+                lambda: build_portfolios(returns, allocation_method, constraint)
+            )
             
             # Store in session state
             st.session_state["results"] = {
-                "returns": returns,
-                "weights_rp": weights_rp,
-                "risk_rp": risk_rp,
-                "weights_con": weights_con,
-                "risk_con": risk_con,
-                "use_constraint": use_constraint
+                **portfolios,
+                "use_constraint": use_constraint,
+                "pure_label": pure_label,
+                "cache_hit": cache_hit
             }
             
         except Exception as e:
@@ -429,6 +1052,11 @@ if "results" in st.session_state:
     risk_rp = results["risk_rp"]
     weights_con = results["weights_con"]
     risk_con = results["risk_con"]
+    pure_label = results["pure_label"]
+
+    if results.get("cache_hit"):
+        st.caption("⚡ Served from the shared result cache")
+    labels = (pure_label, "Return-Constrained")
     
     # Key insight callout
     st.info("""
@@ -478,11 +1106,11 @@ if "results" in st.session_state:
     if results["use_constraint"]:
         # Comparison view
         st.subheader("⚖️ Weights Comparison")
-        fig_weights = plot_weights_comparison(weights_rp, weights_con)
+        fig_weights = plot_weights_comparison(weights_rp, weights_con, names=labels)
         st.plotly_chart(fig_weights, use_container_width=True)
         
         st.subheader("📊 Risk Contribution Analysis")
-        fig_risk = plot_risk_contributions(risk_rp, risk_con)
+        fig_risk = plot_risk_contributions(risk_rp, risk_con, names=labels)
         st.plotly_chart(fig_risk, use_container_width=True)
         
         st.caption("""
@@ -494,14 +1122,14 @@ if "results" in st.session_state:
     else:
         # Single portfolio view
         st.subheader("📊 Risk Parity Portfolio")
-        fig_single = plot_single_portfolio(weights_rp, risk_rp, "Pure Risk Parity")
+        fig_single = plot_single_portfolio(weights_rp, risk_rp, pure_label)
         st.plotly_chart(fig_single, use_container_width=True)
     
     # Detailed tables
     st.divider()
     st.subheader("📋 Detailed Allocations")
     
-    tab1, tab2 = st.tabs(["Pure Risk Parity", "Return-Constrained"])
+    tab1, tab2 = st.tabs(list(labels))
     
     with tab1:
         col1, col2 = st.columns(2)
@@ -548,6 +1176,39 @@ if "results" in st.session_state:
         else:
             st.info("Enable the return constraint in the sidebar to see the comparison.")
 
+    # Monte Carlo stress test
+    if run_stress:
+        st.divider()
+        st.subheader("🎲 Monte Carlo Stress Test")
+
+        portfolios = {pure_label: weights_rp}
+        if results["use_constraint"]:
+            portfolios["Return-Constrained"] = weights_con
+
+        with st.spinner(f"Simulating {n_paths:,} scenarios..."):
+            stress = run_stress_test(
+                returns,
+                portfolios,
+                n_paths=n_paths,
+                horizon=horizon,
+                method=SCENARIO_METHODS[scenario_label],
+                seed=42
+            )
+
+        summary = summarize_stress_test(stress)
+        st.dataframe(
+            summary.style.format("{:.2%}"),
+            use_container_width=True
+        )
+
+        fig_stress = plot_stress_distributions(stress)
+        st.plotly_chart(fig_stress, use_container_width=True)
+
+        st.caption(f"""
+        {n_paths:,} simulated paths over {horizon} trading days using the {scenario_label.lower()} model.
+        VaR and CVaR are expressed as losses on the horizon return.
+        """)
+
 # Educational footer
 with st.expander("📚 About Risk Parity"):
     st.markdown("""
@@ -582,6 +1243,21 @@ with st.expander("📚 About Risk Parity"):
     - Maillard, S., Roncalli, T., & Teïletche, J. (2010). "The Properties of Equally Weighted Risk Contribution Portfolios"
     """)
 
+# Startup profile
+with st.expander("⏱️ Startup Profile"):
+    prewarm = start_import_prewarm()
+    status = "running" if prewarm.is_alive() else "complete"
+    st.write(f"**Background import pre-warm:** {status}")
+    st.write(f"**This run:** {time.perf_counter() - _RUN_START:.2f} seconds")
+
+    profile = sorted(_IMPORT_PROFILE.values(), key=lambda row: -row["Seconds"])
+    if profile:
+        st.table([
+            {"Module": row["Module"], "Seconds": f"{row['Seconds']:.3f}", "Thread": row["Thread"]}
+            for row in profile
+        ])
+    st.caption("First-import wall time per module. Run `python -X importtime -m streamlit run risk.py` for a full breakdown.")
+
 # Footer
 st.divider()
 st.caption("Built with Streamlit • Data from Yahoo Finance • Optimization via Riskfolio-Lib")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The Modules Live at the Repository Root, Not in a Package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
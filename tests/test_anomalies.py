@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from Logs import (CHECKSUM, MAVLINK_V2_MARKER, TLOG_TIMESTAMP, V2_HEADER, get_crc_extra_table, merge_log_pair,
+                  merged_output_path, x25_crc)
+from UASReport import AnomalyDetector, analyze_all_logs, analyze_merged_log, generate_report
+
+START_USEC = 1_700_000_000_000_000
+
+
+def mavlink_frame(msgid, seq, payload, sysid=1, compid=1):
+    header = V2_HEADER.pack(len(payload), 0, 0, seq, sysid, compid, msgid & 0xFFFF, msgid >> 16)
+    checksum = x25_crc(header + payload + bytes((get_crc_extra_table()[msgid],)))
+    return MAVLINK_V2_MARKER + header + payload + CHECKSUM.pack(checksum)
+
+
+@pytest.fixture
+def short_frame_pair(tmp_path):
+    # rlog Frames With 1-Byte Payloads Carry No Timestamp; Sequence 0 Then 5 Loses 4 Frames
+    rlog_file = tmp_path / 'flight.rlog'
+    rlog_file.write_bytes(mavlink_frame(0, 0, b'\x00') + mavlink_frame(0, 5, b'\x00'))
+    tlog_file = tmp_path / 'flight.tlog'
+    tlog_file.write_bytes(b''.join(TLOG_TIMESTAMP.pack(START_USEC + i * 1_000_000) + mavlink_frame(0, i, bytes(9))
+                                   for i in range(3)))
+    return str(tlog_file), str(rlog_file)
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'json'])
+def test_untimed_sequence_gap(short_frame_pair, tmp_path, output_format):
+    tlog_file, rlog_file = short_frame_pair
+    output_dir = str(tmp_path / 'merged_logs')
+    os.makedirs(output_dir)
+    assert merge_log_pair(tlog_file, rlog_file, output_dir, log=lambda line: None,
+                          output_format=output_format) == 'success'
+
+    output_file = merged_output_path(output_dir, os.path.splitext(tlog_file)[0], output_format)
+    analysis, from_cache, fingerprint = analyze_merged_log(output_file, use_cache=False)
+    anomalies = analysis['anomalies']
+    assert anomalies['event_counts']['sequence_gap'] == 1
+    assert anomalies['sequence_loss'] == {'rlog 1/1': 4}
+    gap, = [event for event in anomalies['events'] if event['type'] == 'sequence_gap']
+    assert gap['time'] is None and gap['lost'] == 4
+
+    assert "- - sequence_gap [rlog 1/1]" in generate_report(analysis)
+
+
+def test_untimed_sequence_gap_pdf(short_frame_pair, tmp_path):
+    tlog_file, rlog_file = short_frame_pair
+    output_dir = str(tmp_path / 'merged_logs')
+    os.makedirs(output_dir)
+    merge_log_pair(tlog_file, rlog_file, output_dir, log=lambda line: None)
+
+    all_analyses = analyze_all_logs(output_dir, workers=1)
+    assert list(all_analyses) == ['flight_merged.parquet']
+    assert os.path.exists(os.path.join(output_dir, 'mavlink_analysis_report.pdf'))
+
+
+def test_rlog_timestamps_raise_no_timing_anomalies():
+    # rlog "Timestamps" Are the First 8 Payload Bytes: Steady for a While, Then Anything at All
+    detector = AnomalyDetector()
+    raw = [i * 1000 for i in range(200)] + [10 ** 15, 5, 10 ** 12, 7]
+    for i, timestamp in enumerate(raw):
+        detector.add('MSG_0', 'rlog', timestamp, 1, 1, i % 256)
+    counts = detector.summary()['event_counts']
+    assert counts['rate_drop'] == counts['timestamp_regression'] == counts['heartbeat_loss'] == 0
@@ -0,0 +1,46 @@
+import os
+import shutil
+
+import pytest
+
+from FleetStore import fleet_connect, fleet_flights
+from LogBenchmark import generate_flight_logs
+from Logs import merge_log_pair
+from UASReport import analyze_all_logs, analyze_merged_log, merged_log_fingerprint
+
+
+@pytest.fixture
+def merged_dir(tmp_path):
+    output_dir = str(tmp_path / 'merged_logs')
+    os.makedirs(output_dir)
+    for seed, name in enumerate(['first', 'second']):
+        generate_flight_logs(str(tmp_path), name, duration=20.0, seed=seed)
+        merge_log_pair(str(tmp_path / f'{name}.tlog'), str(tmp_path / f'{name}.rlog'), output_dir,
+                       log=lambda line: None)
+    return output_dir
+
+
+def stored_flights(directory):
+    conn = fleet_connect(os.path.join(directory, 'fleet.sqlite'))
+    try:
+        return sorted(fleet_flights(conn)['file_name'])
+    finally:
+        conn.close()
+
+
+def test_deleted_flights_leave_the_fleet(merged_dir):
+    analyze_all_logs(merged_dir, workers=1)
+    assert stored_flights(merged_dir) == ['first_merged.parquet', 'second_merged.parquet']
+
+    shutil.rmtree(os.path.join(merged_dir, 'second_merged.parquet'))
+    analyze_all_logs(merged_dir, workers=1)
+    assert stored_flights(merged_dir) == ['first_merged.parquet']
+
+
+def test_fingerprint_returned_with_analysis(merged_dir):
+    file_path = os.path.join(merged_dir, 'first_merged.parquet')
+    for use_cache in (False, True, True):
+        analysis, from_cache, fingerprint = analyze_merged_log(file_path, use_cache)
+        assert fingerprint == merged_log_fingerprint(file_path)
+    assert from_cache
+
@@ -0,0 +1,95 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Logs
+from LogBenchmark import generate_flight_logs
+from LogQuery import MergedLogQuery, load_merged_index
+from Logs import MERGED_MESSAGES_FILE, merge_log_pair, merged_output_path
+
+
+@pytest.fixture(scope='module', params=['parquet', 'json'])
+def merged_flight(request, tmp_path_factory):
+    # Small JSON Blocks so a Short Flight Spans Many of Them
+    directory = tmp_path_factory.mktemp(request.param)
+    generate_flight_logs(str(directory), 'flight', duration=60.0, vehicles=(1, 2), seed=1, link_loss_rate=0.01,
+                         noise_rate=0.01)
+    output_dir = str(directory / 'merged_logs')
+    os.makedirs(output_dir)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(Logs, 'JSON_INDEX_BLOCK', 256)
+        merge_log_pair(str(directory / 'flight.tlog'), str(directory / 'flight.rlog'), output_dir,
+                       log=lambda line: None, output_format=request.param)
+    return merged_output_path(output_dir, str(directory / 'flight'), request.param)
+
+
+def all_messages(path):
+    if os.path.isdir(path):
+        frame = pd.read_parquet(os.path.join(path, MERGED_MESSAGES_FILE))
+        frame[['msgtype', 'log_source']] = frame[['msgtype', 'log_source']].astype(str)
+    else:
+        with open(path) as f:
+            frame = pd.DataFrame(json.load(f)['messages'])
+    frame.index.name = 'message_index'
+    return frame
+
+
+def brute_force(frame, msgtype=None, start=None, end=None, sysid=None, compid=None, source=None):
+    mask = np.ones(len(frame), dtype=bool)
+    for column, value in (('msgtype', msgtype), ('log_source', source), ('system_id', sysid),
+                          ('component_id', compid)):
+        if value is not None:
+            mask &= (frame[column] == value).to_numpy()
+    timestamps = frame['timestamp'].to_numpy(dtype=np.float64, na_value=np.nan)
+    if start is not None:
+        mask &= timestamps >= start
+    if end is not None:
+        mask &= timestamps <= end
+    return frame[mask]
+
+
+def test_queries_match_brute_force(merged_flight):
+    frame = all_messages(merged_flight)
+    log = MergedLogQuery(merged_flight)
+    first, last = log.time_range()
+    queries = [
+        {},
+        {'msgtype': 'ATTITUDE'},
+        {'msgtype': 'HEARTBEAT', 'sysid': 2},
+        {'start': first + 10, 'end': first + 20},
+        {'msgtype': 'GPS_RAW_INT', 'start': first + 5, 'end': first + 35, 'sysid': 1, 'compid': 1},
+        {'source': 'tlog', 'start': first + 50},
+        {'source': 'rlog', 'msgtype': 'MSG_0'},
+        {'msgtype': 'ATTITUDE', 'start': last + 1},
+    ]
+    for query in queries:
+        result = log.query(fields=False, **query)
+        expected = brute_force(frame, **query)
+        assert result.index.tolist() == expected.index.tolist(), query
+        assert result['msgtype'].astype(str).tolist() == expected['msgtype'].tolist(), query
+        assert np.allclose(result['timestamp'].to_numpy(dtype=np.float64, na_value=np.nan),
+                           expected['timestamp'].to_numpy(dtype=np.float64, na_value=np.nan), equal_nan=True)
+
+
+def test_query_fields(merged_flight):
+    log = MergedLogQuery(merged_flight)
+    first, last = log.time_range()
+    attitude = log.query('ATTITUDE', first, first + 10, sysid=1)
+    assert len(attitude) and {'roll', 'pitch', 'yaw'} <= set(attitude.columns)
+    assert attitude['time_boot_ms'].is_monotonic_increasing
+
+
+def test_block_ranges_skip_rlog_payload_timestamps(merged_flight):
+    blocks = load_merged_index(merged_flight)['blocks']
+    assert all(set(block['sources']) <= {'tlog', 'rlog'} for block in blocks)
+    assert all(block['min_timestamp'] == block['sources'].get('tlog', {}).get('min_timestamp') for block in blocks)
+
+    log = MergedLogQuery(merged_flight)
+    first, last = log.time_range()
+    assert last - first < 61
+    if len(blocks) > 1:
+        log.query('ATTITUDE', first + 10, first + 20)
+        assert 0 < log.blocks_read < len(blocks) / 2
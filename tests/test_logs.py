@@ -0,0 +1,135 @@
+import os
+import time
+
+import pytest
+
+import Logs
+from LogBenchmark import generate_flight_logs
+from Logs import (TLOG_TIMESTAMP, MavlinkStreamParser, iter_rlog_frames, iter_rlog_messages, iter_tlog_messages,
+                  mavlink_dialect, new_frame_stats, iter_tlog_messages_mavutil, merge_log_files, merge_log_pair,
+                  merge_log_pair_task, merged_index_path, merged_output_path, parse_rlog_binary, process_tlog_file,
+                  read_merged_summary)
+from LogQuery import load_merged_index
+
+
+@pytest.fixture(scope='module')
+def flight(tmp_path_factory):
+    # Two Vehicles Over a Lossy Link, With Noise Bursts Between rlog Frames
+    directory = str(tmp_path_factory.mktemp('flight'))
+    generated = generate_flight_logs(directory, 'flight', duration=30.0, vehicles=(1, 2), seed=2,
+                                     link_loss_rate=0.02, corruption_rate=0.01, noise_rate=0.05)
+    return directory, generated
+
+
+def test_parse_counts(flight):
+    directory, generated = flight
+    assert generated['noise_bursts'] and generated['lost'] and generated['corrupted']
+    assert len(parse_rlog_binary(generated['rlog'])) == generated['frames']
+    assert len(process_tlog_file(generated['tlog'])) == generated['tlog_frames'] - generated['corrupted']
+
+
+def test_rlog_chunks_match_frame_scan(flight):
+    # The Merge Reads rlog Headers From the Vectorized Chunk Decode; It Must Agree With the Frame Scan
+    directory, generated = flight
+    stats = new_frame_stats()
+    records = list(iter_rlog_messages(generated['rlog'], stats, chunk_size=997))
+    expected = [(f'MSG_{msgid}', 'rlog', timestamp, sysid, compid, seq, length, None, None)
+                for msgid, sysid, compid, seq, length, timestamp in iter_rlog_frames(generated['rlog'])]
+    assert records == expected
+    assert stats['valid'] == generated['frames']
+
+
+def test_stream_parser_matches_frame_scan(flight):
+    # Frames Split Across feed() Calls Wait for Their Remainder; the Result Matches the File Scan
+    directory, generated = flight
+    with open(generated['rlog'], 'rb') as f:
+        data = f.read()
+    parser = MavlinkStreamParser()
+    records = []
+    for i in range(0, len(data), 1000):
+        records.extend(parser.feed(data[i:i + 1000], timestamp=0.0))
+    file_stats = new_frame_stats()
+    frames = list(iter_rlog_frames(generated['rlog'], file_stats))
+    assert [record[3:7] for record in records] == [(sysid, compid, seq, length)
+                                                   for _, sysid, compid, seq, length, _ in frames]
+    assert all(parser.stats[key] == file_stats[key] for key in ('valid', 'corrupt', 'unknown_msgid'))
+
+
+def test_mavlink2_only_messages(tmp_path):
+    # msgid > 255 Only Exists in MAVLink 2; Its CRC_EXTRA Must Come From the v2 Dialect
+    mav = mavlink_dialect.MAVLink(None, srcSystem=1, srcComponent=1)
+    frame = mavlink_dialect.MAVLink_button_change_message(1000, 900, 3).pack(mav)
+    assert mavlink_dialect.MAVLINK_MSG_ID_BUTTON_CHANGE > 255
+    rlog_file = tmp_path / 'v2.rlog'
+    rlog_file.write_bytes(frame)
+    tlog_file = tmp_path / 'v2.tlog'
+    tlog_file.write_bytes(TLOG_TIMESTAMP.pack(1_700_000_000_000_000) + frame)
+
+    stats = new_frame_stats()
+    frames = list(iter_rlog_frames(str(rlog_file), stats))
+    assert [frame[0] for frame in frames] == [mavlink_dialect.MAVLINK_MSG_ID_BUTTON_CHANGE]
+    assert stats['unknown_msgid'] == 0 and stats['corrupt'] == 0
+    record, = iter_tlog_messages(str(tlog_file))
+    assert record[0] == 'BUTTON_CHANGE'
+    assert dict(zip(record[7], record[8]))['state'] == 3
+
+
+def test_tlog_decoder_matches_mavutil(tmp_path):
+    # MAVLink 2 Extension Fields (GPS_RAW_INT alt_ellipsoid, STATUSTEXT id...) Must Survive the Fast Path
+    generated = generate_flight_logs(str(tmp_path), 'clean', duration=20.0, vehicles=(1, 2), seed=3)
+    fast = list(iter_tlog_messages(generated['tlog']))
+    reference = list(iter_tlog_messages_mavutil(generated['tlog']))
+    assert len(fast) == len(reference) == generated['tlog_frames']
+    for record, expected in zip(fast, reference):
+        assert record[0] == expected[0]
+        assert record[2] == pytest.approx(expected[2])
+        assert dict(zip(record[7], record[8])) == dict(zip(expected[7], expected[8]))
+    assert {'alt_ellipsoid', 'yaw'} <= set(next(r[7] for r in fast if r[0] == 'GPS_RAW_INT'))
+    assert {'id', 'chunk_seq'} <= set(next(r[7] for r in fast if r[0] == 'STATUSTEXT'))
+
+
+def test_tlog_in_receive_order(flight):
+    directory, generated = flight
+    timestamps = [record[2] for record in iter_tlog_messages(generated['tlog'])]
+    assert timestamps == sorted(timestamps)
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'json'])
+def test_merge_counts(flight, tmp_path, output_format):
+    directory, generated = flight
+    output_dir = str(tmp_path)
+    assert merge_log_pair(generated['tlog'], generated['rlog'], output_dir, log=lambda line: None,
+                          output_format=output_format) == 'success'
+
+    output_path = merged_output_path(output_dir, os.path.join(directory, 'flight'), output_format)
+    tlog_messages = generated['tlog_frames'] - generated['corrupted']
+    summary = read_merged_summary(output_path)
+    assert summary['rlog_messages'] == generated['frames']
+    assert summary['tlog_messages'] == tlog_messages
+    assert summary['total_messages'] == generated['frames'] + tlog_messages
+    assert os.path.exists(merged_index_path(output_path))
+    assert sum(block['rows'] for block in load_merged_index(output_path)['blocks']) == summary['total_messages']
+
+    # Lost Frames Show as tlog Sequence Gaps; the rlog Has Every Frame
+    loss = summary['sequence_gaps']['loss']
+    assert not any(stream.startswith('rlog') for stream in loss)
+    assert generated['lost'] <= sum(loss.values()) <= generated['lost'] + generated['corrupted']
+
+
+def stuck_merge_task(tlog_file, *args):
+    # Stands In for a Merge That Never Reaches a Cooperative Deadline Check
+    if os.path.basename(tlog_file).startswith('stuck'):
+        time.sleep(600)
+    return merge_log_pair_task(tlog_file, *args)
+
+
+def test_stuck_worker_is_stopped(tmp_path, monkeypatch):
+    for name in ('stuck', 'clean'):
+        generate_flight_logs(str(tmp_path), name, duration=5.0, seed=4)
+    monkeypatch.setattr(Logs, 'merge_log_pair_task', stuck_merge_task)
+    monkeypatch.setattr(Logs, 'HARD_TIMEOUT_GRACE', 0.5)
+    start = time.monotonic()
+    results = merge_log_files(str(tmp_path), workers=2, timeout=2.0, split_pairs=False)
+    assert time.monotonic() - start < 60
+    assert results['failed'] == ['stuck.tlog'] and results['success'] == ['clean.tlog']
+    assert not os.path.exists(os.path.join(str(tmp_path), 'merged_logs', 'stuck_merged.parquet.tmp'))
@@ -0,0 +1,41 @@
+from math import comb
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from Network import FailureModel, failure_rank, failure_scenario_analysis, k_link_scenarios, network_links
+
+
+@pytest.fixture(scope='module')
+def network():
+    rng = np.random.default_rng(5)
+    links = nx.gnm_random_graph(30, 45, seed=4)
+    graph = nx.DiGraph()
+    for u, v in links.edges():
+        weight = rng.random() + 0.01
+        graph.add_edge(f"n{u}", f"n{v}", capacity=25, weight=weight)
+        graph.add_edge(f"n{v}", f"n{u}", capacity=25, weight=weight)
+    nodes = list(graph.nodes())
+    traffic_df = pd.DataFrame({'Source': rng.choice(nodes, 100), 'Destination': rng.choice(nodes, 100),
+                               'Demand': rng.integers(1, 9, 100)})
+    return graph, traffic_df, FailureModel(graph, traffic_df)
+
+
+def test_k_link_scenarios_enumerate_loaded_pairs(network):
+    graph, traffic_df, model = network
+    loaded = [edges for _, edges in network_links(model.arrays)
+              if any(model.link_ptr[e + 1] > model.link_ptr[e] for e in edges)]
+    scenarios = list(k_link_scenarios(model, 2))
+    assert len(scenarios) == comb(len(loaded), 2)
+    assert len({frozenset(edges) for _, edges in scenarios}) == len(scenarios)
+    assert len(list(k_link_scenarios(model, 2, keep=lambda volume: False))) == 0
+
+
+@pytest.mark.parametrize('k', [2, 3])
+def test_top_scenarios_match_full_ranking(network, k):
+    graph, traffic_df, model = network
+    ranking = failure_scenario_analysis(graph, traffic_df, k=k, model=model, workers=1)
+    top = failure_scenario_analysis(graph, traffic_df, k=k, top=5, model=model, workers=1)
+    assert [failure_rank(result) for result in top] == [failure_rank(result) for result in ranking[:5]]